@@ -6,5 +6,5 @@ pip install -r requirements.txt
 
 python manage.py collectstatic --no-input
 python manage.py migrate
-python load_workplace_initiatives.py
+python manage.py load_workplace_initiatives
 python create_superuser.py
\ No newline at end of file
@@ -1,7 +1,23 @@
-from django.contrib import admin
-from django.urls import reverse
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils.html import format_html
-from .models import JobCategory, Position, WageTable, StaffMember, EvaluationCriteria, StaffEvaluation, PromotionRecord
+from .models import JobCategory, Position, WageTable, WageStep, StaffMember, Qualification, StaffQualification, EvaluationCriteria, StaffEvaluation, PromotionRecord
+from .services.staff_importer import StaffImporter, RowError, REQUIRED_COLUMNS, OPTIONAL_COLUMNS
+
+class StaffImportForm(forms.Form):
+    """職員CSVの取り込みフォーム（文字コードは選択肢にあるものだけを受け付ける）"""
+    ENCODING_CHOICES = [
+        ('utf-8-sig', 'UTF-8'),
+        ('cp932', 'Shift_JIS（Excel保存）'),
+    ]
+
+    csv_file = forms.FileField(label='CSVファイル', widget=forms.ClearableFileInput(attrs={'accept': '.csv'}))
+    encoding = forms.ChoiceField(label='文字コード', choices=ENCODING_CHOICES, initial='utf-8-sig')
 
 @admin.register(JobCategory)
 class JobCategoryAdmin(admin.ModelAdmin):
@@ -20,11 +36,66 @@ class WageTableAdmin(admin.ModelAdmin):
     list_display = ['position', 'base_salary_start', 'step_raise_amount', 'max_steps']
     list_filter = ['position__facility', 'position__job_category']
 
+@admin.register(WageStep)
+class WageStepAdmin(admin.ModelAdmin):
+    list_display = ['position', 'step', 'base_salary', 'allowances', 'total_salary']
+    list_filter = ['position__facility', 'step']
+    list_select_related = ['position']
+
 @admin.register(StaffMember)
 class StaffMemberAdmin(admin.ModelAdmin):
     list_display = ['staff_id', 'name', 'facility', 'current_position', 'employment_status', 'hire_date', 'is_active']
     list_filter = ['facility', 'employment_status', 'is_active']
     search_fields = ['staff_id', 'name']
+    change_list_template = 'admin/career_management/staffmember/change_list.html'
+
+    def get_urls(self):
+        urls = [
+            path('import-csv/', self.admin_site.admin_view(self.import_csv_view), name='career_management_staffmember_import_csv'),
+        ]
+        return urls + super().get_urls()
+
+    def import_csv_view(self, request):
+        """職員CSVの一括取り込み画面"""
+        if not self.has_add_permission(request) or not self.has_change_permission(request):
+            raise PermissionDenied
+
+        report = None
+        form = StaffImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            stream = io.TextIOWrapper(
+                form.cleaned_data['csv_file'].file, encoding=form.cleaned_data['encoding'], newline='',
+            )
+            try:
+                report = StaffImporter().import_file(stream)
+            except (UnicodeDecodeError, RowError) as e:
+                self.message_user(request, f'取り込みに失敗しました: {e}', level=messages.ERROR)
+            else:
+                level = messages.WARNING if report.rejected else messages.SUCCESS
+                self.message_user(request, f'取り込み完了: {report.summary()}', level=level)
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': '職員CSVの一括取り込み',
+            'form': form,
+            'required_columns': REQUIRED_COLUMNS,
+            'optional_columns': OPTIONAL_COLUMNS,
+            'report': report,
+        }
+        return TemplateResponse(request, 'admin/career_management/staffmember/import_csv.html', context)
+
+@admin.register(Qualification)
+class QualificationAdmin(admin.ModelAdmin):
+    list_display = ['name']
+    search_fields = ['name']
+
+@admin.register(StaffQualification)
+class StaffQualificationAdmin(admin.ModelAdmin):
+    list_display = ['staff_member', 'qualification', 'acquired_date']
+    list_filter = ['qualification', 'staff_member__facility']
+    list_select_related = ['staff_member', 'qualification']
+    search_fields = ['staff_member__name', 'staff_member__staff_id']
 
 @admin.register(EvaluationCriteria)
 class EvaluationCriteriaAdmin(admin.ModelAdmin):
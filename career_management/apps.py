@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CareerManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'career_management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from career_management.services.staff_importer import StaffImporter, RowError
+
+
+class Command(BaseCommand):
+    help = '職員CSVを一括で取り込みます（職員番号が既存の場合は更新）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='取り込むCSVファイル')
+        parser.add_argument('--encoding', default='utf-8-sig', help='文字コード（Excel保存のCSVは cp932）')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='1トランザクションあたりの行数')
+        parser.add_argument('--rejected', help='エラー行を書き出すCSVファイル')
+
+    def handle(self, *args, **options):
+        importer = StaffImporter(
+            chunk_size=options['chunk_size'],
+            progress=lambda report: self.stdout.write(report.summary()),
+        )
+        try:
+            with open(options['csv_path'], encoding=options['encoding'], newline='') as f:
+                report = importer.import_file(f)
+        except (OSError, UnicodeDecodeError, RowError) as e:
+            raise CommandError(str(e))
+
+        for line_number, staff_id, reason in report.rejected[:20]:
+            self.stderr.write(f'  {line_number}行目 {staff_id}: {reason}')
+        if options['rejected']:
+            with open(options['rejected'], 'w', encoding='utf-8-sig', newline='') as f:
+                report.write_rejected(f)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ 取り込み完了: {report.summary()}'))
@@ -0,0 +1,29 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from career_management.models import StaffMember
+from career_management.services.qualification_index import sync_staff_qualifications
+
+
+class Command(BaseCommand):
+    help = '職員の保有資格テキストから資格マスタと保有資格索引を作り直します'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='1回に処理する職員数')
+
+    def handle(self, *args, **options):
+        staff_members = StaffMember.objects.only(
+            'id', 'qualifications', 'qualification_acquisition_dates'
+        ).order_by('id').iterator(chunk_size=options['batch_size'])
+
+        total_staff = 0
+        total_rows = 0
+        while True:
+            batch = list(islice(staff_members, options['batch_size']))
+            if not batch:
+                break
+            total_rows += sync_staff_qualifications(batch)
+            total_staff += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {total_staff}名分の保有資格 {total_rows}件を索引化しました'))
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-17 12:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_wage_steps(apps, schema_editor):
+    """既存の賃金テーブルから号級行を生成する"""
+    WageTable = apps.get_model('career_management', 'WageTable')
+    WageStep = apps.get_model('career_management', 'WageStep')
+    rows = []
+    for wage_table in WageTable.objects.all().iterator():
+        allowances = wage_table.qualification_allowance + wage_table.position_allowance
+        for step in range(1, wage_table.max_steps + 1):
+            salary = wage_table.base_salary_start + wage_table.step_raise_amount * (step - 1)
+            rows.append(WageStep(
+                position_id=wage_table.position_id,
+                step=step,
+                base_salary=salary,
+                allowances=allowances,
+                total_salary=salary + allowances,
+            ))
+    WageStep.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career_management', '0003_careerpathrequirementone_salaryincreasesystem_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WageStep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('step', models.PositiveIntegerField(verbose_name='号数')),
+                ('base_salary', models.PositiveIntegerField(verbose_name='基本給')),
+                ('allowances', models.IntegerField(default=0, verbose_name='手当合計')),
+                ('total_salary', models.IntegerField(verbose_name='総支給額')),
+                ('position', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wage_steps', to='career_management.position')),
+            ],
+            options={
+                'verbose_name': '号級賃金',
+                'verbose_name_plural': '号級賃金',
+                'ordering': ['position', 'step'],
+                'indexes': [models.Index(fields=['step', 'total_salary'], name='career_mana_step_8dcc1b_idx')],
+                'unique_together': {('position', 'step')},
+            },
+        ),
+        migrations.RunPython(populate_wage_steps, migrations.RunPython.noop),
+    ]
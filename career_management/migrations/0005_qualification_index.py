@@ -0,0 +1,107 @@
+# Generated by Django 5.2.8 on 2026-10-17 12:31
+
+import re
+from datetime import date
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# 以下はマイグレーション作成時点の career_management.services.qualification_index の複製
+# （アプリのコードが変わっても、このマイグレーションの結果が変わらないようにする）
+QUALIFICATION_SEPARATORS = re.compile(r'[\n、,，]')
+DATE_PATTERN = re.compile(r'(\d{4})\s*[-/.年]\s*(\d{1,2})(?:\s*[-/.月]\s*(\d{1,2})\s*日?)?')
+MAX_NAME_LENGTH = 100
+
+
+def parse_qualification_names(text):
+    names = []
+    for token in QUALIFICATION_SEPARATORS.split(text or ''):
+        name = token.strip()[:MAX_NAME_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def parse_acquisition_dates(text, names):
+    dates = {}
+    unlabeled = []
+    for line in (text or '').splitlines():
+        match = DATE_PATTERN.search(line)
+        if not match:
+            continue
+        year, month, day = match.groups()
+        try:
+            acquired = date(int(year), int(month), int(day or 1))
+        except ValueError:
+            continue
+        label = line[:match.start()].strip(' :：\t')
+        if not label:
+            unlabeled.append(acquired)
+            continue
+        for name in names:
+            if name == label or name in label or label in name:
+                dates.setdefault(name, acquired)
+                break
+
+    remaining = [name for name in names if name not in dates]
+    dates.update(zip(remaining, unlabeled))
+    return dates
+
+
+def build_qualification_index(apps, schema_editor):
+    """既存職員の保有資格テキストから資格マスタと索引を作る"""
+    StaffMember = apps.get_model('career_management', 'StaffMember')
+    Qualification = apps.get_model('career_management', 'Qualification')
+    StaffQualification = apps.get_model('career_management', 'StaffQualification')
+    qualification_ids = {}
+    rows = []
+    for staff in StaffMember.objects.all().iterator():
+        names = parse_qualification_names(staff.qualifications)
+        dates = parse_acquisition_dates(staff.qualification_acquisition_dates, names)
+        for name in names:
+            if name not in qualification_ids:
+                qualification_ids[name] = Qualification.objects.create(name=name).id
+            rows.append(StaffQualification(
+                staff_member_id=staff.id,
+                qualification_id=qualification_ids[name],
+                acquired_date=dates.get(name),
+            ))
+    StaffQualification.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career_management', '0004_wagestep'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Qualification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='資格名')),
+            ],
+            options={
+                'verbose_name': '資格',
+                'verbose_name_plural': '資格',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StaffQualification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('acquired_date', models.DateField(blank=True, null=True, verbose_name='取得日')),
+                ('qualification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holders', to='career_management.qualification')),
+                ('staff_member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='qualification_index', to='career_management.staffmember')),
+            ],
+            options={
+                'verbose_name': '職員保有資格',
+                'verbose_name_plural': '職員保有資格',
+                'indexes': [models.Index(fields=['qualification', 'staff_member'], name='career_mana_qualifi_af663a_idx')],
+                'unique_together': {('staff_member', 'qualification')},
+            },
+        ),
+        migrations.RunPython(build_qualification_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career_management', '0005_qualification_index'),
+        ('facility_management', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='staffmember',
+            index=models.Index(fields=['facility', 'hire_date'], name='career_mana_facilit_d48af1_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-17 12:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career_management', '0006_staffmember_hire_date_index'),
+        ('facility_management', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='staffmember',
+            index=models.Index(fields=['facility', 'is_active'], name='staff_facility_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staffmember',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['facility', 'current_position'], name='staff_active_position_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingplan',
+            index=models.Index(fields=['facility', '-fiscal_year', 'scheduled_date'], name='training_plan_listing_idx'),
+        ),
+    ]
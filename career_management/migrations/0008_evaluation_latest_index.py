@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career_management', '0007_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='staffevaluation',
+            index=models.Index(fields=['staff_member', '-evaluation_date', '-id'], name='evaluation_latest_idx'),
+        ),
+    ]
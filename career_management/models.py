@@ -1,4 +1,8 @@
+from datetime import date
+
 from django.db import models
+from django.db.models import BooleanField, ExpressionWrapper, Q, Value
+from django.db.models.functions import ExtractMonth, ExtractYear
 from django.core.validators import MinValueValidator, MaxValueValidator
 from facility_management.models import Facility # 修正点
 
@@ -50,6 +54,71 @@ class WageTable(models.Model):
 
         salary = self.base_salary_start + (self.step_raise_amount * (step - 1))
         return salary
+
+class WageStepQuerySet(models.QuerySet):
+    def salary_for(self, position, step):
+        """指定職位・号数の号級行を返す（最大号数を超える号は最大号の行）"""
+        return self.filter(position=position, step__lte=step).order_by('-step').first()
+
+    def total_salary_between(self, step, minimum, maximum):
+        """指定号数の総支給額が範囲内にある号級行"""
+        return self.filter(step=step, total_salary__gte=minimum, total_salary__lte=maximum)
+
+class WageStep(models.Model):
+    """号級ごとの賃金（WageTableから自動生成される実体化テーブル）"""
+    position = models.ForeignKey(Position, on_delete=models.CASCADE, related_name='wage_steps')
+    step = models.PositiveIntegerField("号数")
+    base_salary = models.PositiveIntegerField("基本給")
+    allowances = models.IntegerField("手当合計", default=0)
+    total_salary = models.IntegerField("総支給額")
+
+    objects = WageStepQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = '号級賃金'
+        verbose_name_plural = '号級賃金'
+        unique_together = ['position', 'step']
+        ordering = ['position', 'step']
+        indexes = [
+            models.Index(fields=['step', 'total_salary']),
+        ]
+
+    def __str__(self):
+        return f"{self.position.position_name} {self.step}号"
+
+def month_index(value):
+    """日付を「年×12＋月」の通し月番号にする"""
+    return value.year * 12 + value.month
+
+def experience_cutoff(months, today):
+    """経験月数が months 以上になる入職日の上限（この日より前に入職した職員が該当する）"""
+    cutoff_index = month_index(today) - months + 1
+    return date((cutoff_index - 1) // 12, (cutoff_index - 1) % 12 + 1, 1)
+
+class StaffMemberQuerySet(models.QuerySet):
+
+    def with_experience_months(self, today=None):
+        """経験月数を tenure_months としてDB側で計算して付与する（絞り込み・並べ替え用）"""
+        today = today or date.today()
+        hire_month = ExtractYear('hire_date') * 12 + ExtractMonth('hire_date')
+        return self.annotate(
+            tenure_months=ExpressionWrapper(Value(month_index(today)) - hire_month, output_field=models.IntegerField())
+        )
+
+    def with_min_experience(self, months, today=None):
+        """経験月数が months 以上の職員（入職日の範囲に変換するので索引が効く）"""
+        return self.filter(hire_date__lt=experience_cutoff(months, today or date.today()))
+
+    def with_experience_checks(self, months_list, today=None):
+        """経験月数が各 months 以上かを has_experience_<months> として付与する（with_min_experience と同じ条件）"""
+        today = today or date.today()
+        return self.annotate(**{
+            f'has_experience_{months}': ExpressionWrapper(
+                Q(hire_date__lt=experience_cutoff(months, today)), output_field=BooleanField()
+            )
+            for months in set(months_list)
+        })
+
 class StaffMember(models.Model):
     """職員情報"""
     EMPLOYMENT_STATUS_CHOICES = [
@@ -86,14 +155,28 @@ class StaffMember(models.Model):
     is_active = models.BooleanField("在籍中", default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = StaffMemberQuerySet.as_manager()
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['facility', 'hire_date']),
+            # 在籍職員一覧（facility, is_active で絞り込み）
+            models.Index(fields=['facility', 'is_active'], name='staff_facility_active_idx'),
+            # 昇格候補判定（在籍職員のみを職位で絞り込み）
+            models.Index(
+                fields=['facility', 'current_position'], condition=Q(is_active=True),
+                name='staff_active_position_idx',
+            ),
+        ]
+
     @property
     def experience_months(self):
-        """経験月数の計算"""
-        from datetime import date
+        """経験月数の計算（with_experience_months() で取得した場合はDBの計算値）"""
+        if 'tenure_months' in self.__dict__:
+            return self.tenure_months
         if self.hire_date:
-            today = date.today()
-            return (today.year - self.hire_date.year) * 12 + (today.month - self.hire_date.month)
+            return month_index(date.today()) - month_index(self.hire_date)
         return 0
     
     @property
@@ -102,32 +185,45 @@ class StaffMember(models.Model):
         return self.experience_months // 12
     
     def check_promotion_eligibility(self, target_position):
-        """昇格適性のチェック"""
+        """昇格適性のチェック（現職位→target_positionの昇格基準で判定）"""
         if not target_position:
             return False, []
-        
-        issues = []
-        
-        # 経験年数チェック
-        if self.experience_months < target_position.required_experience_months:
-            issues.append(f"経験年数不足（必要: {target_position.required_experience_months}ヶ月, 現在: {self.experience_months}ヶ月）")
-        
-        # 評価点数チェック
-        if self.latest_evaluation_score < target_position.required_evaluation_score:
-            issues.append(f"評価点数不足（必要: {target_position.required_evaluation_score}, 現在: {self.latest_evaluation_score}）")
-        
-        # 資格チェック（簡易版）
-        if target_position.required_qualifications:
-            required_quals = target_position.required_qualifications.lower()
-            staff_quals = self.qualifications.lower() if self.qualifications else ""
-            if "介護福祉士" in required_quals and "介護福祉士" not in staff_quals:
-                issues.append("介護福祉士資格が必要")
-        
-        return len(issues) == 0, issues
+
+        from .services.promotion_engine import PromotionEligibilityEngine
+        return PromotionEligibilityEngine(self.facility).check(self, target_position)
     
     def __str__(self):
         return f"{self.name} ({self.facility.name})"
 
+class Qualification(models.Model):
+    """資格マスタ"""
+    name = models.CharField("資格名", max_length=100, unique=True)
+
+    class Meta:
+        verbose_name = '資格'
+        verbose_name_plural = '資格'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+class StaffQualification(models.Model):
+    """職員の保有資格（StaffMember.qualifications から自動生成される索引）"""
+    staff_member = models.ForeignKey(StaffMember, on_delete=models.CASCADE, related_name='qualification_index')
+    qualification = models.ForeignKey(Qualification, on_delete=models.CASCADE, related_name='holders')
+    acquired_date = models.DateField("取得日", null=True, blank=True)
+
+    class Meta:
+        verbose_name = '職員保有資格'
+        verbose_name_plural = '職員保有資格'
+        unique_together = ['staff_member', 'qualification']
+        indexes = [
+            models.Index(fields=['qualification', 'staff_member']),
+        ]
+
+    def __str__(self):
+        return f"{self.staff_member.name} - {self.qualification.name}"
+
 class EvaluationCriteria(models.Model):
     """評価基準"""
     job_category = models.ForeignKey(JobCategory, on_delete=models.CASCADE)
@@ -152,6 +248,12 @@ class StaffEvaluation(models.Model):
     
     # 評価者情報
     evaluator_name = models.CharField("評価者名", max_length=100)
+
+    class Meta:
+        indexes = [
+            # 職員ごとの最新の評価（昇格判定の相関サブクエリ）
+            models.Index(fields=['staff_member', '-evaluation_date', '-id'], name='evaluation_latest_idx'),
+        ]
     
     def __str__(self):
         return f"{self.staff_member.name} - {self.evaluation_period}"
@@ -492,6 +594,10 @@ class TrainingPlan(models.Model):
         verbose_name = 'キャリアパス要件Ⅱ（研修計画）'
         verbose_name_plural = 'キャリアパス要件Ⅱ（研修計画）'
         ordering = ['-fiscal_year', 'scheduled_date']
+        indexes = [
+            # 事業所ごとの研修計画一覧（年度・実施予定日順）
+            models.Index(fields=['facility', '-fiscal_year', 'scheduled_date'], name='training_plan_listing_idx'),
+        ]
     
     def __str__(self):
         return f"{self.fiscal_year}年度 - {self.training_name}"
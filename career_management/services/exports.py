@@ -0,0 +1,173 @@
+"""
+都道府県への提出用の出力（号級賃金表・キャリアパス要件Ⅰ・昇給制度）
+
+行を1件ずつ返すジェネレーターを CSV・XLSX のストリーミング生成に渡すため、
+法人全体（数百事業所）の出力でもメモリ使用量はほぼ一定になる。
+事業所数が多い法人全体の出力は、バックグラウンド処理（jobs）でファイルに書き出す。
+"""
+from pathlib import Path
+
+from django.conf import settings
+
+from facility_management.models import Facility
+from shogu_kaizen_system.streaming_export import CSV_CONTENT_TYPE, XLSX_CONTENT_TYPE, stream_csv, stream_xlsx
+from ..models import CareerPathRequirementOne, SalaryIncreaseSystem
+from .query_plans import wage_builder_grid, wage_builder_grid_key
+from .wage_table_generator import WageTableGenerator
+
+FORMATS = {'csv': CSV_CONTENT_TYPE, 'xlsx': XLSX_CONTENT_TYPE}
+# 法人全体の出力で、事業所数がこれを超える場合はバックグラウンドで生成する
+BACKGROUND_THRESHOLD = 50
+# 事業所・要件を取得する際のチャンクサイズ
+CHUNK_SIZE = 200
+
+REQUIREMENT_ONE_FIELDS = [
+    'required_qualifications', 'required_experience_years', 'recommended_skills', 'other_requirements',
+    'job_description', 'responsibilities', 'authority', 'base_salary_min', 'base_salary_max',
+    'allowances', 'raise_rules',
+]
+SALARY_INCREASE_FIELDS = [
+    'has_regular_increase', 'increase_timing', 'increase_amount_per_step', 'max_steps_per_year',
+    'has_special_increase', 'special_increase_conditions', 'evaluation_affects_raise', 'evaluation_criteria',
+    'notes',
+]
+
+
+def _verbose_names(model, fields):
+    return [str(model._meta.get_field(field).verbose_name) for field in fields]
+
+
+def _display(instance, field):
+    """選択肢は表示名、真偽値は「あり/なし」で出力する"""
+    value = getattr(instance, field)
+    if isinstance(value, bool):
+        return 'あり' if value else 'なし'
+    if instance._meta.get_field(field).choices:
+        return getattr(instance, f'get_{field}_display')()
+    return value
+
+
+def wage_grid_rows(facilities, progress=None):
+    """
+    事業所ごとに、号（行）× 職位（列）の基本給を画面と同じ内容で出力する。
+    progress を渡すと、事業所を1件出力するごとに progress(出力済み件数, 全件数) を呼ぶ。
+    """
+    total = facilities.count() if progress else 0
+    for done, facility in enumerate(facilities.iterator(chunk_size=CHUNK_SIZE), start=1):
+        generator = WageTableGenerator(facility)
+        grid = wage_builder_grid(facility, generator, wage_builder_grid_key(facility))
+        yield ['事業所番号', facility.facility_number, '事業所名', facility.name]
+        yield ['号 ＼ 職位'] + [column.position.position_name for column in grid.columns]
+        yield ['区分'] + ['保存済み' if column.is_saved else '提案' for column in grid.columns]
+        for row in grid.rows:
+            yield [row.step] + [cell.salary for cell in row.cells]
+        yield []
+        if progress:
+            progress(done, total)
+
+
+def requirement_one_rows(facilities):
+    """キャリアパス要件Ⅰ（職位ごとの任用要件・賃金体系）"""
+    yield (['事業所番号', '事業所名', '職位', '階層レベル']
+           + _verbose_names(CareerPathRequirementOne, REQUIREMENT_ONE_FIELDS))
+    requirements = (
+        CareerPathRequirementOne.objects.filter(facility__in=facilities)
+        .select_related('facility', 'position')
+        .order_by('facility__facility_number', 'position__level', 'position__job_category')
+    )
+    for requirement in requirements.iterator(chunk_size=CHUNK_SIZE):
+        yield [
+            requirement.facility.facility_number, requirement.facility.name,
+            requirement.position.position_name, requirement.position.level,
+        ] + [_display(requirement, field) for field in REQUIREMENT_ONE_FIELDS]
+
+
+def salary_increase_rows(facilities):
+    """キャリアパス要件Ⅲ（事業所ごとの昇給制度）"""
+    yield ['事業所番号', '事業所名'] + _verbose_names(SalaryIncreaseSystem, SALARY_INCREASE_FIELDS)
+    systems = (
+        SalaryIncreaseSystem.objects.filter(facility__in=facilities)
+        .select_related('facility')
+        .order_by('facility__facility_number')
+    )
+    for system in systems.iterator(chunk_size=CHUNK_SIZE):
+        yield [system.facility.facility_number, system.facility.name] + [
+            _display(system, field) for field in SALARY_INCREASE_FIELDS
+        ]
+
+
+# 出力の種類 → (シート名, 行のジェネレーター)
+EXPORT_KINDS = {
+    'wage-grid': ('号級賃金表', wage_grid_rows),
+    'requirement-one': ('キャリアパス要件Ⅰ', requirement_one_rows),
+    'salary-increase': ('昇給制度', salary_increase_rows),
+}
+
+
+def export_facilities(facility_id=None, provider_id=None):
+    """出力対象の事業所（賃金相場の判定に使う事業者を同時に取得）"""
+    facilities = Facility.objects.select_related('provider').order_by('facility_number')
+    if facility_id is not None:
+        return facilities.filter(pk=facility_id)
+    return facilities.filter(provider_id=provider_id)
+
+
+def _rows(name, facilities, progress):
+    _, rows = EXPORT_KINDS[name]
+    # 進捗は出力に最も時間のかかる号級賃金表で数える
+    return rows(facilities, progress) if name == 'wage-grid' else rows(facilities)
+
+
+def export_chunks(kind, fmt, facilities, progress=None):
+    """
+    出力内容のバイト列を少しずつ返す。kind='all' は全種類を1つの XLSX（種類ごとのシート）にする。
+    """
+    kinds = list(EXPORT_KINDS) if kind == 'all' else [kind]
+    if fmt == 'csv':
+        if len(kinds) != 1:
+            raise ValueError('CSV は種類を1つ指定してください')
+        return stream_csv(_rows(kind, facilities, progress))
+    return stream_xlsx([(EXPORT_KINDS[name][0], _rows(name, facilities, progress)) for name in kinds])
+
+
+def export_filename(kind, fmt, facility=None, provider_id=None):
+    """ダウンロード時のファイル名（ヘッダーに入れるため ASCII のみ）"""
+    scope = f'facility_{facility.facility_number}' if facility else f'provider_{provider_id}'
+    return f'{scope}_{kind}.{fmt}'
+
+
+# ---------------------------------------------------------------
+# バックグラウンドでの生成（jobs のワーカーが career_management.export として実行する）
+# ---------------------------------------------------------------
+
+def export_root():
+    root = Path(settings.EXPORT_ROOT)
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def needs_background(facilities):
+    return facilities.count() > BACKGROUND_THRESHOLD
+
+
+def export_path(token, fmt):
+    """ワーカーで生成した出力ファイルの置き場所（処理のトークンごとに1ファイル）"""
+    return export_root() / f'{token}.{fmt}'
+
+
+def remove_export(token):
+    """処理のトークンに対応する出力ファイル（書き込み途中のものを含む）を削除する"""
+    for path in export_root().glob(f'{token}.*'):
+        path.unlink(missing_ok=True)
+
+
+def write_export(path, kind, fmt, provider_id, progress=None):
+    """法人全体の出力をファイルに書き出す（書き込み途中のファイルは .part の名前で置く）"""
+    part = path.with_name(path.name + '.part')
+    try:
+        with open(part, 'wb') as f:
+            for chunk in export_chunks(kind, fmt, export_facilities(provider_id=provider_id), progress):
+                f.write(chunk)
+        part.replace(path)
+    finally:
+        part.unlink(missing_ok=True)
@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from facility_management.models import Facility
+from ..models import (
+    Position, WageTable, StaffMember,
+    CareerPathRequirementOne, SalaryIncreaseSystem, TrainingPlan,
+)
+
+CACHE_KEY = 'facility_readiness:{}'
+CACHE_TIMEOUT = 60 * 60
+
+
+@dataclass
+class FacilityReadiness:
+    """事業所ごとのキャリアパス要件の整備状況"""
+    facility_id: int
+    position_count: int = 0
+    wage_table_count: int = 0
+    requirement_one_count: int = 0
+    training_plan_count: int = 0
+    has_salary_system: bool = False
+    active_staff_count: int = 0
+
+    @property
+    def wage_table_coverage(self):
+        """賃金テーブルを作成済みの職位の割合（%）"""
+        if not self.position_count:
+            return 0
+        return round(self.wage_table_count * 100 / self.position_count)
+
+    @property
+    def is_ready(self):
+        """キャリアパス要件Ⅰ〜Ⅲがすべて設定済みか"""
+        return self.requirement_one_count > 0 and self.training_plan_count > 0 and self.has_salary_system
+
+
+def _count_by_facility(queryset, facility_field='facility'):
+    """事業所ごとの件数を返す相関サブクエリ"""
+    counts = (
+        queryset.filter(**{facility_field: OuterRef('pk')})
+        .order_by()
+        .values(facility_field)
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def _query_readiness(facility_ids):
+    """複数事業所の整備状況を1クエリで集計する"""
+    rows = Facility.objects.filter(id__in=facility_ids).annotate(
+        position_count=_count_by_facility(Position.objects.all()),
+        wage_table_count=_count_by_facility(WageTable.objects.all(), 'position__facility'),
+        requirement_one_count=_count_by_facility(CareerPathRequirementOne.objects.all()),
+        training_plan_count=_count_by_facility(TrainingPlan.objects.all()),
+        salary_system_count=_count_by_facility(SalaryIncreaseSystem.objects.all()),
+        active_staff_count=_count_by_facility(StaffMember.objects.filter(is_active=True)),
+    ).values(
+        'id', 'position_count', 'wage_table_count', 'requirement_one_count',
+        'training_plan_count', 'salary_system_count', 'active_staff_count',
+    )
+    return {
+        row['id']: FacilityReadiness(
+            facility_id=row['id'],
+            position_count=row['position_count'],
+            wage_table_count=row['wage_table_count'],
+            requirement_one_count=row['requirement_one_count'],
+            training_plan_count=row['training_plan_count'],
+            has_salary_system=row['salary_system_count'] > 0,
+            active_staff_count=row['active_staff_count'],
+        )
+        for row in rows
+    }
+
+
+def get_facility_readiness(facilities):
+    """事業所ID → FacilityReadiness（キャッシュになかった事業所だけをまとめて集計する）"""
+    facility_ids = [getattr(facility, 'pk', facility) for facility in facilities]
+    cached = cache.get_many([CACHE_KEY.format(facility_id) for facility_id in facility_ids])
+    readiness = {}
+    missing = []
+    for facility_id in facility_ids:
+        value = cached.get(CACHE_KEY.format(facility_id))
+        if value is None:
+            missing.append(facility_id)
+        else:
+            readiness[facility_id] = value
+
+    if missing:
+        computed = _query_readiness(missing)
+        cache.set_many({CACHE_KEY.format(key): value for key, value in computed.items()}, CACHE_TIMEOUT)
+        readiness.update(computed)
+    return readiness
+
+
+def invalidate_facility_readiness(*facility_ids):
+    """事業所の整備状況のキャッシュを破棄する"""
+    cache.delete_many([CACHE_KEY.format(facility_id) for facility_id in facility_ids])
@@ -0,0 +1,183 @@
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.db.models import OuterRef, Subquery
+
+from facility_management.models import Facility
+from ..models import StaffMember, StaffEvaluation, PromotionRecord, PromotionCriteria, month_index
+from .qualification_index import held_qualifications, meets_qualification, normalize_qualification_name
+
+# 必要資格の記載の区切り。改行・「＋」「及び」で区切った要件はすべて必要で、
+# 要件の中で読点・スラッシュ・「または」で並べた資格はいずれか1つを満たせばよい
+REQUIREMENT_SEPARATORS = re.compile(r'[\n+＋]|及び|かつ')
+ALTERNATIVE_SEPARATORS = re.compile(r'[、,，/／]|または|又は|もしくは')
+# 「介護福祉士、社会福祉士のいずれか」などの要件の末尾の語
+REQUIREMENT_SUFFIXES = re.compile(r'の?いずれか(の資格)?$')
+# 「実務者研修修了」などの資格名の末尾の語
+QUALIFICATION_SUFFIXES = re.compile(r'(修了者|修了)$')
+# 「介護職員初任者研修以上」は上位の資格も認める
+AT_LEAST_SUFFIX = '以上'
+
+
+def parse_required_qualifications(text):
+    """必要資格の記載を要件のリストにする（要件ごとに (資格名, 以上か) の選択肢のリスト）"""
+    requirements = []
+    for clause in REQUIREMENT_SEPARATORS.split(text or ''):
+        alternatives = []
+        for token in ALTERNATIVE_SEPARATORS.split(REQUIREMENT_SUFFIXES.sub('', clause.strip())):
+            name = token.strip()
+            at_least = name.endswith(AT_LEAST_SUFFIX)
+            if at_least:
+                name = name[:-len(AT_LEAST_SUFFIX)]
+            name = QUALIFICATION_SUFFIXES.sub('', name).strip()
+            if name:
+                alternatives.append((name, at_least))
+        if alternatives:
+            requirements.append(alternatives)
+    return requirements
+
+
+def requirement_label(alternatives):
+    """要件の表示名（「介護福祉士」「介護職員初任者研修以上の」「介護福祉士または社会福祉士の」）"""
+    label = 'または'.join(name + (AT_LEAST_SUFFIX if at_least else '') for name, at_least in alternatives)
+    if len(alternatives) > 1 or alternatives[0][1]:
+        label += 'の'
+    return label
+
+
+@dataclass
+class PromotionCandidate:
+    """昇格判定の結果（職員 × 昇格基準）"""
+    staff: StaffMember
+    criteria: PromotionCriteria
+    evaluation_score: float
+    experience_months: int
+    months_in_position: int
+    issues: list = field(default_factory=list)
+
+    @property
+    def eligible(self):
+        return not self.issues
+
+    @property
+    def to_position(self):
+        return self.criteria.to_position
+
+
+class PromotionEligibilityEngine:
+    """事業所単位の昇格判定サービス"""
+
+    def __init__(self, facility: Facility, today=None):
+        self.facility = facility
+        self.today = today or date.today()
+
+    def evaluate(self):
+        """在籍職員全員を該当する昇格基準で判定し、昇格候補順に並べて返す"""
+        criteria_by_position = defaultdict(list)
+        required_months = set()
+        for criteria in self.facility_criteria():
+            criteria_by_position[criteria.from_position_id].append(criteria)
+            required_months.add(criteria.to_position.required_experience_months)
+
+        staff_members = self.candidate_staff(list(criteria_by_position), required_months)
+        position_since = self._position_start_dates(staff_member__facility=self.facility)
+        qualifications = held_qualifications(facility=self.facility)
+
+        candidates = []
+        for staff in staff_members:
+            for criteria in criteria_by_position[staff.current_position_id]:
+                candidates.append(self._judge(staff, criteria, position_since, qualifications))
+
+        candidates.sort(key=lambda c: (not c.eligible, len(c.issues), -c.evaluation_score, -c.experience_months))
+        return candidates
+
+    def facility_criteria(self):
+        """事業所の昇格基準（昇格先の職位を結合する）"""
+        return PromotionCriteria.objects.filter(facility=self.facility).select_related('to_position')
+
+    def candidate_staff(self, position_ids, required_months=()):
+        """昇格元の職位にいる在籍職員（現職位・経験月数と、必要経験月数ごとの充足をDB側で付与する）"""
+        return self._staff_queryset(required_months).filter(
+            facility=self.facility, is_active=True, current_position_id__in=position_ids
+        )
+
+    def _staff_queryset(self, required_months):
+        """
+        経験月数（tenure_months）、必要経験月数の充足（has_experience_<月数>）と
+        最新の評価点数（latest_score。職員ごとの相関サブクエリで評価履歴は読み込まない）を付与した職員
+        """
+        latest_evaluation = StaffEvaluation.objects.filter(
+            staff_member=OuterRef('pk')
+        ).order_by('-evaluation_date', '-id').values('overall_score')[:1]
+        return (
+            StaffMember.objects.select_related('current_position')
+            .with_experience_months(self.today)
+            .with_experience_checks(required_months, self.today)
+            .annotate(latest_score=Subquery(latest_evaluation))
+        )
+
+    def check(self, staff, target_position):
+        """職員1名を指定職位への昇格基準で判定する（eligible, issues）"""
+        criteria = PromotionCriteria.objects.filter(
+            facility=self.facility, from_position_id=staff.current_position_id, to_position=target_position
+        ).first()
+        if criteria is None:
+            # 昇格基準が未設定の場合は職位の要件だけで判定する
+            criteria = PromotionCriteria(
+                facility=self.facility,
+                from_position_id=staff.current_position_id,
+                to_position=target_position,
+                required_experience_years=0,
+                required_qualifications=target_position.required_qualifications,
+            )
+        staff = self._staff_queryset([target_position.required_experience_months]).get(pk=staff.pk)
+        position_since = self._position_start_dates(staff_member=staff)
+        qualifications = held_qualifications(pk=staff.pk)
+        candidate = self._judge(staff, criteria, position_since, qualifications)
+        return candidate.eligible, candidate.issues
+
+    def _position_start_dates(self, **filters):
+        """職員ID → (最新の昇格先職位ID, 昇格日)"""
+        latest = {}
+        rows = PromotionRecord.objects.filter(**filters).order_by('staff_member_id', 'promotion_date', 'id')
+        for staff_id, position_id, promotion_date in rows.values_list('staff_member_id', 'to_position_id', 'promotion_date'):
+            latest[staff_id] = (position_id, promotion_date)
+        return latest
+
+    def _judge(self, staff, criteria, position_since, qualifications):
+        target_position = criteria.to_position
+        score = staff.latest_score if staff.latest_score is not None else staff.latest_evaluation_score
+        # 経験月数と必要経験月数の充足はDB側で計算済み（_staff_queryset）
+        experience_months = staff.tenure_months
+
+        # 現職位の経験は最新の昇格記録から数える（記録がなければ入職日から）
+        start = staff.hire_date
+        record = position_since.get(staff.id)
+        if record and record[0] == staff.current_position_id:
+            start = record[1]
+        months_in_position = month_index(self.today) - month_index(start)
+
+        candidate = PromotionCandidate(staff, criteria, float(score), experience_months, months_in_position)
+        issues = candidate.issues
+
+        # 経験年数チェック
+        if not getattr(staff, f'has_experience_{target_position.required_experience_months}'):
+            issues.append(f"経験年数不足（必要: {target_position.required_experience_months}ヶ月, 現在: {experience_months}ヶ月）")
+        required_months = criteria.required_experience_years * 12
+        if months_in_position < required_months:
+            issues.append(f"現職位での経験不足（必要: {criteria.required_experience_years}年, 現在: {months_in_position // 12}年）")
+
+        # 評価点数チェック
+        if criteria.required_evaluation_score is not None and score < criteria.required_evaluation_score:
+            issues.append(f"評価点数不足（必要: {criteria.required_evaluation_score}, 現在: {score}）")
+
+        # 資格チェック（保有資格の索引の資格名と完全一致で判定。「介護福祉士」は「認定介護福祉士」に一致しないが、
+        # 「介護福祉士以上」なら認定介護福祉士も満たす）
+        held = {normalize_qualification_name(name) for name in qualifications.get(staff.id, ())}
+        for alternatives in parse_required_qualifications(criteria.required_qualifications):
+            if not any(meets_qualification(held, name, at_least) for name, at_least in alternatives):
+                issues.append(f"{requirement_label(alternatives)}資格が必要")
+
+        return candidate
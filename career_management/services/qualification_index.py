@@ -0,0 +1,146 @@
+import re
+import unicodedata
+from collections import defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+
+from ..models import StaffMember, Qualification, StaffQualification
+
+# キャリアパス要件Ⅴ（介護福祉士の配置等）で数える資格
+CERTIFIED_CARE_WORKER = '介護福祉士'
+
+# 介護の資格の段階（「介護職員初任者研修以上」のような要件は、より上位の資格でも満たす）
+QUALIFICATION_RANKS = {
+    'ホームヘルパー2級': 1,
+    '訪問介護員2級': 1,
+    '初任者研修': 1,
+    '介護職員初任者研修': 1,
+    'ホームヘルパー1級': 2,
+    '訪問介護員1級': 2,
+    '介護職員基礎研修': 2,
+    '実務者研修': 2,
+    '介護職員実務者研修': 2,
+    '介護福祉士': 3,
+    '認定介護福祉士': 4,
+}
+
+# 保有資格の区切り（改行が基本、読点・カンマ区切りの入力も受け付ける）
+QUALIFICATION_SEPARATORS = re.compile(r'[\n、,，]')
+# 「2020年4月1日」「2020/4/1」「2020-04」など
+DATE_PATTERN = re.compile(r'(\d{4})\s*[-/.年]\s*(\d{1,2})(?:\s*[-/.月]\s*(\d{1,2})\s*日?)?')
+MAX_NAME_LENGTH = Qualification._meta.get_field('name').max_length
+
+
+def parse_qualification_names(text):
+    """保有資格の記載を資格名のリストにする（重複は除く）"""
+    names = []
+    for token in QUALIFICATION_SEPARATORS.split(text or ''):
+        name = token.strip()[:MAX_NAME_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def normalize_qualification_name(name):
+    """資格名の比較用の表記（全角・半角の揺れと空白を除く）"""
+    return re.sub(r'\s+', '', unicodedata.normalize('NFKC', name or ''))
+
+
+def meets_qualification(held, name, at_least=False):
+    """
+    保有資格（比較用の表記の集合）が必要資格を満たすか。
+    資格名の完全一致で判定し、at_least（「〜以上」）の場合は QUALIFICATION_RANKS で上位の資格も認める
+    """
+    required = normalize_qualification_name(name)
+    if required in held:
+        return True
+    rank = QUALIFICATION_RANKS.get(required)
+    if not at_least or rank is None:
+        return False
+    return any(QUALIFICATION_RANKS.get(held_name, 0) >= rank for held_name in held)
+
+
+def parse_acquisition_dates(text, names):
+    """
+    資格取得日の記載を 資格名 → 日付 にする。
+    「介護福祉士: 2020/4/1」のように資格名付きの行はその資格に、
+    日付だけの行は資格名が付いていない資格に上から順に対応させる。
+    """
+    dates = {}
+    unlabeled = []
+    for line in (text or '').splitlines():
+        match = DATE_PATTERN.search(line)
+        if not match:
+            continue
+        year, month, day = match.groups()
+        try:
+            acquired = date(int(year), int(month), int(day or 1))
+        except ValueError:
+            continue
+        label = line[:match.start()].strip(' :：\t')
+        if not label:
+            unlabeled.append(acquired)
+            continue
+        for name in names:
+            if name == label or name in label or label in name:
+                dates.setdefault(name, acquired)
+                break
+
+    remaining = [name for name in names if name not in dates]
+    dates.update(zip(remaining, unlabeled))
+    return dates
+
+
+def sync_staff_qualifications(staff_members):
+    """職員の保有資格テキストから資格マスタと保有資格索引を作り直す"""
+    parsed = {}
+    for staff in staff_members:
+        names = parse_qualification_names(staff.qualifications)
+        parsed[staff.id] = (names, parse_acquisition_dates(staff.qualification_acquisition_dates, names))
+    if not parsed:
+        return 0
+
+    all_names = {name for names, _ in parsed.values() for name in names}
+    with transaction.atomic():
+        Qualification.objects.bulk_create([Qualification(name=name) for name in all_names], ignore_conflicts=True)
+        qualification_ids = dict(Qualification.objects.filter(name__in=all_names).values_list('name', 'id'))
+        StaffQualification.objects.filter(staff_member_id__in=list(parsed)).delete()
+        rows = [
+            StaffQualification(
+                staff_member_id=staff_id,
+                qualification_id=qualification_ids[name],
+                acquired_date=dates.get(name),
+            )
+            for staff_id, (names, dates) in parsed.items()
+            for name in names
+        ]
+        StaffQualification.objects.bulk_create(rows)
+    return len(rows)
+
+
+def held_qualifications(**staff_filters):
+    """職員ID → 保有資格名の集合（1クエリ）"""
+    held = defaultdict(set)
+    rows = StaffQualification.objects.filter(
+        **{f'staff_member__{key}': value for key, value in staff_filters.items()}
+    ).values_list('staff_member_id', 'qualification__name')
+    for staff_id, name in rows:
+        held[staff_id].add(name)
+    return held
+
+
+def certified_care_worker_ratios(facilities):
+    """事業所ID → 在籍介護職員に占める介護福祉士の割合（キャリアパス要件Ⅴ）"""
+    certified = StaffQualification.objects.filter(
+        staff_member=OuterRef('pk'), qualification__name=CERTIFIED_CARE_WORKER
+    )
+    rows = (
+        StaffMember.objects
+        .filter(facility__in=facilities, is_active=True, current_position__job_category__category_code='care')
+        .annotate(is_certified=Exists(certified))
+        .values('facility_id')
+        .annotate(total=Count('id'), certified=Count('id', filter=Q(is_certified=True)))
+    )
+    return {row['facility_id']: row['certified'] / row['total'] for row in rows if row['total']}
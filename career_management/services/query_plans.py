@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+
+from facility_management.models import Facility
+from shogu_kaizen_system.master_cache import MASTER_CACHE_TIMEOUT, get_version, versioned_key
+from ..models import Position, StaffMember, TrainingPlan
+from .wage_grid import GRID_CACHE_NAME, WageGridEngine
+from .wage_table_generator import BENCHMARK_CACHE_NAME
+
+# ================================================================
+# 画面ごとのクエリ計画
+# 職位数に関わらずクエリ数が一定になるように関連を先読みする
+# ================================================================
+
+
+def wage_builder_facility(facility_id):
+    """賃金テーブル構築画面の事業所（賃金相場の判定に使う事業者を同時に取得）"""
+    return get_object_or_404(Facility.objects.select_related('provider'), id=facility_id)
+
+
+def wage_builder_positions(facility):
+    """賃金テーブル構築画面の職位一覧（賃金テーブル・職種を1クエリで取得）"""
+    return (
+        Position.objects.filter(facility=facility)
+        .select_related('wage_table', 'job_category')
+        .order_by('job_category', 'level')
+    )
+
+
+def staff_list_members(facility):
+    """在籍職員一覧（職位の表示名に使う事業所・職種まで結合する）"""
+    return (
+        StaffMember.objects.filter(facility=facility, is_active=True)
+        .select_related('current_position__facility', 'current_position__job_category')
+    )
+
+
+def requirement_one_positions(facility):
+    """要件Ⅰ一覧の職位（設定済みの要件Ⅰを結合する）"""
+    return (
+        Position.objects.filter(facility=facility)
+        .select_related('requirement_one')
+        .order_by('job_category', 'level')
+    )
+
+
+def requirement_two_plans(facility):
+    """要件Ⅱ一覧の研修計画（対象職位を先読みする）"""
+    return (
+        TrainingPlan.objects.filter(facility=facility)
+        .prefetch_related('target_positions')
+        .order_by('-fiscal_year', 'scheduled_date')
+    )
+
+
+def wage_builder_grid_key(facility):
+    """号級グリッドのキャッシュキー（職位・賃金テーブル・事業者所在地・賃金相場の変更で変わる）"""
+    return versioned_key(
+        GRID_CACHE_NAME.format(facility.id), get_version('providers'), get_version(BENCHMARK_CACHE_NAME)
+    )
+
+
+def wage_builder_grid(facility, generator, cache_key):
+    """賃金テーブル構築画面の号級グリッド（キャッシュがない場合のみ職位を取得して組み立てる）"""
+    def build():
+        positions = list(wage_builder_positions(facility))
+        return WageGridEngine().build(positions, generator.generate_for_positions(positions))
+    return cache.get_or_set(cache_key, build, MASTER_CACHE_TIMEOUT)
@@ -0,0 +1,229 @@
+import csv
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from facility_management.models import Facility
+from ..models import Position, StaffMember
+from .facility_readiness import invalidate_facility_readiness
+from .qualification_index import sync_staff_qualifications
+
+# CSVの列名（1行目）
+REQUIRED_COLUMNS = ['staff_id', 'name', 'facility_number', 'employment_status', 'hire_date']
+OPTIONAL_COLUMNS = [
+    'position_name', 'current_base_salary', 'current_total_salary',
+    'qualifications', 'qualification_acquisition_dates', 'is_active',
+]
+
+# 取り込み時に必ず上書きする項目（必須列）
+BASE_UPDATE_FIELDS = ['name', 'facility', 'employment_status', 'hire_date']
+# 任意列 → 上書きする項目（列がない CSV では既存の値を残す）
+OPTIONAL_UPDATE_FIELDS = {
+    'position_name': 'current_position',
+    'current_base_salary': 'current_base_salary',
+    'current_total_salary': 'current_total_salary',
+    'qualifications': 'qualifications',
+    'qualification_acquisition_dates': 'qualification_acquisition_dates',
+    'is_active': 'is_active',
+}
+QUALIFICATION_COLUMNS = {'qualifications', 'qualification_acquisition_dates'}
+MAX_STAFF_ID_LENGTH = StaffMember._meta.get_field('staff_id').max_length
+MAX_NAME_LENGTH = StaffMember._meta.get_field('name').max_length
+
+DATE_FORMATS = ['%Y-%m-%d', '%Y/%m/%d', '%Y年%m月%d日']
+FALSE_VALUES = {'0', 'false', 'no', 'いいえ', '退職'}
+
+
+class RowError(ValueError):
+    """取り込めない行"""
+
+
+@dataclass
+class ImportReport:
+    """取り込み結果"""
+    processed: int = 0
+    created: int = 0
+    updated: int = 0
+    rejected: list = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    @property
+    def rows_per_second(self):
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return (
+            f"{self.processed}行処理 / 新規 {self.created}件 / 更新 {self.updated}件 / "
+            f"エラー {len(self.rejected)}件 （{self.elapsed:.1f}秒, {self.rows_per_second:.0f}行/秒）"
+        )
+
+    def write_rejected(self, fileobj):
+        """エラー行をCSVに書き出す"""
+        writer = csv.writer(fileobj)
+        writer.writerow(['line', 'staff_id', 'reason'])
+        writer.writerows(self.rejected)
+
+
+class StaffImporter:
+    """職員CSVの一括取り込みサービス"""
+
+    def __init__(self, chunk_size=1000, progress=None):
+        self.chunk_size = chunk_size
+        # チャンクごとに ImportReport を受け取るコールバック
+        self.progress = progress
+        self._facility_ids = None
+        self._position_ids = None
+        self._update_fields = None
+        self._sync_qualifications = False
+        self._status_codes = {}
+        for code, label in StaffMember.EMPLOYMENT_STATUS_CHOICES:
+            self._status_codes[code] = code
+            self._status_codes[label] = code
+
+    def _build_indexes(self):
+        """事業所・職位の参照用インデックスを1回だけ作る"""
+        self._facility_ids = dict(Facility.objects.values_list('facility_number', 'id'))
+        self._position_ids = {
+            (facility_id, position_name): position_id
+            for position_id, facility_id, position_name
+            in Position.objects.values_list('id', 'facility_id', 'position_name')
+        }
+
+    def import_file(self, fileobj):
+        """テキストストリームのCSVをチャンク単位で取り込む"""
+        self._build_indexes()
+        report = ImportReport()
+        reader = csv.DictReader(fileobj)
+        missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise RowError(f"必須列がありません: {', '.join(missing)}")
+        columns = set(reader.fieldnames)
+        self._update_fields = BASE_UPDATE_FIELDS + [
+            field for column, field in OPTIONAL_UPDATE_FIELDS.items() if column in columns
+        ] + ['updated_at']
+        self._sync_qualifications = bool(columns & QUALIFICATION_COLUMNS)
+
+        # 1行目はヘッダーなのでデータ行は2行目から
+        rows = enumerate(reader, start=2)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self._import_chunk(chunk, report)
+            if self.progress:
+                self.progress(report)
+        return report
+
+    def _import_chunk(self, chunk, report):
+        staff_by_id = {}
+        for line_number, row in chunk:
+            report.processed += 1
+            staff_id = (row.get('staff_id') or '').strip()
+            try:
+                if staff_id in staff_by_id:
+                    raise RowError('同じ職員番号がファイル内で重複しています')
+                staff_by_id[staff_id] = self._build_staff(row)
+            except RowError as e:
+                report.rejected.append((line_number, staff_id, str(e)))
+
+        existing = {
+            staff_id: (pk, facility_id)
+            for staff_id, pk, facility_id
+            in StaffMember.objects.filter(staff_id__in=staff_by_id).values_list('staff_id', 'id', 'facility_id')
+        }
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        for staff_id, staff in staff_by_id.items():
+            if staff_id in existing:
+                # bulk_update では auto_now が効かないため明示的に設定する
+                staff.id = existing[staff_id][0]
+                staff.updated_at = now
+                to_update.append(staff)
+            else:
+                to_create.append(staff)
+
+        with transaction.atomic():
+            StaffMember.objects.bulk_create(to_create)
+            StaffMember.objects.bulk_update(to_update, self._update_fields)
+            # bulk操作ではシグナルが発火しないため資格索引をまとめて更新する
+            # （資格の列がない CSV では、既存職員の資格は変わらない）
+            sync_staff_qualifications(to_create + to_update if self._sync_qualifications else to_create)
+        # 別の事業所へ移った職員は、移動前の事業所の集計も変わる
+        invalidate_facility_readiness(
+            *{staff.facility_id for staff in staff_by_id.values()},
+            *{facility_id for _, facility_id in existing.values()},
+        )
+        report.created += len(to_create)
+        report.updated += len(to_update)
+
+    def _build_staff(self, row):
+        """1行分の値を検証して StaffMember を組み立てる（未保存）"""
+        staff_id = (row.get('staff_id') or '').strip()
+        name = (row.get('name') or '').strip()
+        if not staff_id:
+            raise RowError('職員番号が空です')
+        if len(staff_id) > MAX_STAFF_ID_LENGTH:
+            raise RowError('職員番号が長すぎます')
+        if not name:
+            raise RowError('氏名が空です')
+        if len(name) > MAX_NAME_LENGTH:
+            raise RowError(f'氏名が長すぎます（{MAX_NAME_LENGTH}文字以内）')
+
+        facility_number = (row.get('facility_number') or '').strip()
+        facility_id = self._facility_ids.get(facility_number)
+        if facility_id is None:
+            raise RowError(f'事業所番号「{facility_number}」が見つかりません')
+
+        status = self._status_codes.get((row.get('employment_status') or '').strip())
+        if status is None:
+            raise RowError(f"雇用形態「{row.get('employment_status')}」が不正です")
+
+        position_id = None
+        position_name = (row.get('position_name') or '').strip()
+        if position_name:
+            position_id = self._position_ids.get((facility_id, position_name))
+            if position_id is None:
+                raise RowError(f'職位「{position_name}」が事業所に登録されていません')
+
+        return StaffMember(
+            staff_id=staff_id,
+            name=name,
+            facility_id=facility_id,
+            employment_status=status,
+            hire_date=self._parse_date(row.get('hire_date')),
+            current_position_id=position_id,
+            current_base_salary=self._parse_int(row.get('current_base_salary'), '現在の基本給'),
+            current_total_salary=self._parse_int(row.get('current_total_salary'), '現在の総給与'),
+            qualifications=(row.get('qualifications') or '').strip(),
+            qualification_acquisition_dates=(row.get('qualification_acquisition_dates') or '').strip(),
+            is_active=(row.get('is_active') or '1').strip().lower() not in FALSE_VALUES,
+        )
+
+    @staticmethod
+    def _parse_date(value):
+        value = (value or '').strip()
+        for date_format in DATE_FORMATS:
+            try:
+                return datetime.strptime(value, date_format).date()
+            except ValueError:
+                continue
+        raise RowError(f'入職日「{value}」を日付として読み取れません')
+
+    @staticmethod
+    def _parse_int(value, label):
+        value = (value or '').strip().replace(',', '')
+        if not value:
+            return 0
+        try:
+            return int(value)
+        except ValueError:
+            raise RowError(f'{label}「{value}」が数値ではありません')
@@ -0,0 +1,79 @@
+from collections import namedtuple
+
+from shogu_kaizen_system.master_cache import bump_version
+
+# 号級グリッドの最低表示号数
+DEFAULT_MIN_STEPS = 30
+
+# 事業所ごとの号級グリッドのキャッシュ名（バージョンは職位・賃金テーブルの変更で更新）
+GRID_CACHE_NAME = 'wage_grid:{}'
+
+GridColumn = namedtuple('GridColumn', ['position', 'suggestion', 'is_saved', 'css_class'])
+GridCell = namedtuple('GridCell', ['salary', 'css_class'])
+GridRow = namedtuple('GridRow', ['step', 'cells'])
+WageGrid = namedtuple('WageGrid', ['columns', 'rows', 'max_steps'])
+
+
+def salary_series(base_salary_start, step_raise_amount, max_steps):
+    """1号〜max_steps号の基本給を配列で返す（WageTable.get_salary_for_stepと同じ計算）"""
+    if max_steps <= 0:
+        return []
+    if step_raise_amount == 0:
+        return [base_salary_start] * max_steps
+    stop = base_salary_start + step_raise_amount * max_steps
+    return list(range(base_salary_start, stop, step_raise_amount))
+
+
+def salary_at(series, step):
+    """号数を配列の範囲に丸めて基本給を返す（max_stepsを超える号は最大号に張り付く）"""
+    if not series:
+        return 0
+    step = min(max(step, 1), len(series))
+    return series[step - 1]
+
+
+class WageGridEngine:
+    """事業所の職位×号級の賃金グリッドを一括計算するサービス"""
+
+    def __init__(self, min_steps=DEFAULT_MIN_STEPS):
+        self.min_steps = min_steps
+
+    def _wage_params(self, position, suggestion):
+        """保存済みの賃金テーブルがあればそれを、なければ提案値を返す"""
+        wage_table = getattr(position, 'wage_table', None)
+        if wage_table is not None:
+            return True, (wage_table.base_salary_start, wage_table.step_raise_amount, wage_table.max_steps)
+        return False, (suggestion['base_salary_start'], suggestion['step_raise_amount'], suggestion['max_steps'])
+
+    def build(self, positions, suggestions):
+        """
+        職位ごとに号級の基本給配列を1回で計算し、テンプレートがそのまま
+        1行ずつ描画できる行データ（号→各職位のセル）に転置して返す
+        """
+        columns = []
+        series_list = []
+        max_steps = self.min_steps
+        for position in positions:
+            suggestion = suggestions[position.id]
+            is_saved, params = self._wage_params(position, suggestion)
+            series = salary_series(*params)
+            max_steps = max(max_steps, params[2], suggestion.get('max_steps', 0))
+            css_class = 'saved-cell' if is_saved else 'unsaved-cell'
+            columns.append(GridColumn(position, suggestion, is_saved, css_class))
+            series_list.append(series)
+
+        # 各列を最大号数までNoneで埋めてから行方向に転置する
+        padded = [series + [None] * (max_steps - len(series)) for series in series_list]
+        css_classes = [column.css_class for column in columns]
+        rows = []
+        for step, salaries in enumerate(zip(*padded), start=1):
+            rows.append(GridRow(step, [GridCell(s, c) for s, c in zip(salaries, css_classes)]))
+        if not columns:
+            rows = [GridRow(step, []) for step in range(1, max_steps + 1)]
+
+        return WageGrid(columns, rows, max_steps)
+
+
+def invalidate_wage_grid(*facility_ids):
+    """事業所の号級グリッドのキャッシュを破棄する"""
+    bump_version(*(GRID_CACHE_NAME.format(facility_id) for facility_id in facility_ids))
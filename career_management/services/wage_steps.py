@@ -0,0 +1,39 @@
+from django.db import transaction
+
+from ..models import WageStep
+from .wage_grid import salary_series
+
+
+def build_wage_steps(wage_table):
+    """賃金テーブル1件分の号級行を生成する（未保存）"""
+    allowances = wage_table.qualification_allowance + wage_table.position_allowance
+    series = salary_series(wage_table.base_salary_start, wage_table.step_raise_amount, wage_table.max_steps)
+    return [
+        WageStep(
+            position_id=wage_table.position_id,
+            step=step,
+            base_salary=salary,
+            allowances=allowances,
+            total_salary=salary + allowances,
+        )
+        for step, salary in enumerate(series, start=1)
+    ]
+
+
+def refresh_wage_steps(wage_tables):
+    """対象職位の号級行だけを削除して作り直す"""
+    wage_tables = list(wage_tables)
+    if not wage_tables:
+        return 0
+    rows = []
+    for wage_table in wage_tables:
+        rows.extend(build_wage_steps(wage_table))
+    with transaction.atomic():
+        clear_wage_steps([wage_table.position_id for wage_table in wage_tables])
+        WageStep.objects.bulk_create(rows)
+    return len(rows)
+
+
+def clear_wage_steps(position_ids):
+    """対象職位の号級行を削除する"""
+    return WageStep.objects.filter(position_id__in=position_ids).delete()[0]
@@ -1,5 +1,13 @@
+from functools import lru_cache
+
+from django.db import transaction
+
 from facility_management.models import Facility
-from ..models import Position
+from shogu_kaizen_system.master_cache import bump_version
+from ..models import Position, WageTable
+from .facility_readiness import invalidate_facility_readiness
+from .wage_grid import invalidate_wage_grid
+from .wage_steps import refresh_wage_steps
 
 # 地域の賃金相場データ（サンプル）
 REGIONAL_WAGE_BENCHMARKS = {
@@ -8,34 +16,117 @@ REGIONAL_WAGE_BENCHMARKS = {
     'default': {'care_staff_avg': 270000}
 }
 
+# 賃金相場テーブルのキャッシュ名（号級グリッドのキャッシュキーに含める）
+BENCHMARK_CACHE_NAME = 'regional_wage_benchmarks'
+
+# 職位レベルに応じた基本給の傾斜配分
+LEVEL_MULTIPLIERS = {1: 0.8, 2: 0.95, 3: 1.1, 4: 1.25, 5: 1.4}
+
+
+def resolve_prefecture(address: str) -> str:
+    """所在地から賃金相場テーブルのキー（都道府県）を判定する"""
+    for prefecture in REGIONAL_WAGE_BENCHMARKS:
+        if prefecture in (address or ''):
+            return prefecture
+    return 'default'
+
+
+@lru_cache(maxsize=512)
+def _cached_suggestion(prefecture: str, level: int) -> tuple:
+    """(都道府県, 職位レベル) ごとの賃金テーブル案を計算してキャッシュする"""
+    base_avg = REGIONAL_WAGE_BENCHMARKS.get(prefecture, REGIONAL_WAGE_BENCHMARKS['default'])['care_staff_avg']
+    multiplier = LEVEL_MULTIPLIERS.get(level, 1.0)
+
+    start_salary = int(base_avg * multiplier)
+
+    return (
+        ('base_salary_start', start_salary),
+        ('step_raise_amount', 2000),
+        ('max_steps', 30),
+        ('qualification_allowance', 5000 * level),
+        ('position_allowance', int(start_salary * 0.05 * (level - 1))),
+    )
+
+
+def invalidate_benchmark_cache():
+    """賃金相場テーブルの変更時にキャッシュ済みの提案・号級グリッドを破棄する"""
+    _cached_suggestion.cache_clear()
+    bump_version(BENCHMARK_CACHE_NAME)
+
+
+def update_regional_wage_benchmarks(benchmarks: dict):
+    """賃金相場テーブルを更新し、キャッシュを無効化する"""
+    REGIONAL_WAGE_BENCHMARKS.update(benchmarks)
+    invalidate_benchmark_cache()
+
+
 class WageTableGenerator:
     """賃金テーブル自動生成サービス"""
     def __init__(self, facility: Facility):
         self.facility = facility
+        # リクエスト内キャッシュ（事業者ID → 都道府県）
+        self._prefecture_by_provider = {}
+
+    def _prefecture_for(self, facility: Facility) -> str:
+        """事業所の都道府県を事業者単位で1回だけ判定する"""
+        provider_id = facility.provider_id
+        if provider_id not in self._prefecture_by_provider:
+            self._prefecture_by_provider[provider_id] = resolve_prefecture(facility.provider.address)
+        return self._prefecture_by_provider[provider_id]
 
     def get_regional_wage_benchmark(self) -> dict:
         """事業所の所在地から地域の賃金相場を取得する"""
-        address = self.facility.provider.address
-        for prefecture, benchmark in REGIONAL_WAGE_BENCHMARKS.items():
-            if prefecture in address:
-                return benchmark
-        return REGIONAL_WAGE_BENCHMARKS['default']
+        return REGIONAL_WAGE_BENCHMARKS[self._prefecture_for(self.facility)]
 
     def generate_optimized_wage_table(self, position: Position) -> dict:
         """職位に応じた最適な賃金テーブル案を生成する"""
-        benchmark = self.get_regional_wage_benchmark()
-        base_avg = benchmark['care_staff_avg']
-
-        # 職位レベルに応じて基本給を傾斜配分
-        level_multipliers = {1: 0.8, 2: 0.95, 3: 1.1, 4: 1.25, 5: 1.4}
-        multiplier = level_multipliers.get(position.level, 1.0)
-        
-        start_salary = int(base_avg * multiplier)
-        
-        return {
-            'base_salary_start': start_salary,
-            'step_raise_amount': 2000,
-            'max_steps': 30,
-            'qualification_allowance': 5000 * position.level,
-            'position_allowance': int(start_salary * 0.05 * (position.level - 1)),
-        }
\ No newline at end of file
+        return dict(_cached_suggestion(self._prefecture_for(self.facility), position.level))
+
+    def generate_for_positions(self, positions) -> dict:
+        """
+        複数職位の賃金テーブル案をまとめて生成する
+        （職位ID → 提案の辞書）。他事業所の職位は facility__provider を
+        select_related しておくと追加クエリが発生しない。
+        """
+        suggestions = {}
+        for position in positions:
+            if position.facility_id == self.facility.id:
+                facility = self.facility
+            else:
+                facility = position.facility
+            prefecture = self._prefecture_for(facility)
+            suggestions[position.id] = dict(_cached_suggestion(prefecture, position.level))
+        return suggestions
+
+    def apply_all_suggestions(self, overwrite=False) -> dict:
+        """
+        事業所の全職位に賃金テーブル案を一括保存する。
+        未作成の職位は bulk_create、overwrite=True の場合は既存も bulk_update する。
+        """
+        positions = list(
+            Position.objects.filter(facility=self.facility).select_related('wage_table')
+        )
+        suggestions = self.generate_for_positions(positions)
+        fields = list(next(iter(suggestions.values()), {}).keys())
+
+        to_create = []
+        to_update = []
+        for position in positions:
+            wage_table = getattr(position, 'wage_table', None)
+            if wage_table is None:
+                to_create.append(WageTable(position=position, **suggestions[position.id]))
+            elif overwrite:
+                for field, value in suggestions[position.id].items():
+                    setattr(wage_table, field, value)
+                to_update.append(wage_table)
+
+        with transaction.atomic():
+            WageTable.objects.bulk_create(to_create)
+            if to_update:
+                WageTable.objects.bulk_update(to_update, fields)
+            # bulk操作ではシグナルが発火しないため号級行をまとめて更新する
+            refresh_wage_steps(to_create + to_update)
+        invalidate_facility_readiness(self.facility.id)
+        invalidate_wage_grid(self.facility.id)
+
+        return {'created': len(to_create), 'updated': len(to_update)}
@@ -0,0 +1,93 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from facility_management.models import Facility
+from jobs.models import Job
+from .models import (
+    Position, WageTable, StaffMember,
+    CareerPathRequirementOne, SalaryIncreaseSystem, TrainingPlan,
+)
+from .services.exports import remove_export
+from .services.facility_readiness import invalidate_facility_readiness
+from .services.qualification_index import sync_staff_qualifications
+from .services.wage_grid import invalidate_wage_grid
+from .services.wage_steps import refresh_wage_steps, clear_wage_steps
+
+
+@receiver(post_save, sender=WageTable)
+def refresh_wage_steps_on_save(sender, instance, **kwargs):
+    """賃金テーブル保存時にその職位の号級行を再生成する"""
+    refresh_wage_steps([instance])
+
+
+@receiver(post_delete, sender=WageTable)
+def clear_wage_steps_on_delete(sender, instance, **kwargs):
+    """賃金テーブル削除時にその職位の号級行を削除する"""
+    clear_wage_steps([instance.position_id])
+
+
+@receiver(post_save, sender=StaffMember)
+def sync_qualifications_on_save(sender, instance, raw=False, **kwargs):
+    """職員保存時に保有資格の索引を作り直す"""
+    if not raw:
+        sync_staff_qualifications([instance])
+
+
+def _facility_ids(instance):
+    """変更前後の事業所ID（別の事業所へ移した場合は移動元も含む）"""
+    previous = getattr(instance, '_previous_facility_id', None)
+    return {facility_id for facility_id in (instance.facility_id, previous) if facility_id is not None}
+
+
+@receiver(pre_save, sender=Position)
+@receiver(pre_save, sender=StaffMember)
+@receiver(pre_save, sender=CareerPathRequirementOne)
+@receiver(pre_save, sender=SalaryIncreaseSystem)
+@receiver(pre_save, sender=TrainingPlan)
+def remember_previous_facility(sender, instance, raw=False, **kwargs):
+    """保存前の事業所IDを控え、事業所を移した場合に移動元のキャッシュも破棄できるようにする"""
+    if raw or instance.pk is None:
+        instance._previous_facility_id = None
+        return
+    instance._previous_facility_id = (
+        sender.objects.filter(pk=instance.pk).values_list('facility_id', flat=True).first()
+    )
+
+
+@receiver([post_save, post_delete], sender=Position)
+@receiver([post_save, post_delete], sender=StaffMember)
+@receiver([post_save, post_delete], sender=CareerPathRequirementOne)
+@receiver([post_save, post_delete], sender=SalaryIncreaseSystem)
+@receiver([post_save, post_delete], sender=TrainingPlan)
+def invalidate_readiness_on_change(sender, instance, **kwargs):
+    """要件・職員・職位の変更時に事業所（移動元を含む）の整備状況キャッシュを破棄する"""
+    invalidate_facility_readiness(*_facility_ids(instance))
+
+
+@receiver([post_save, post_delete], sender=Position)
+def invalidate_wage_grid_on_position_change(sender, instance, **kwargs):
+    """職位の変更時に事業所（移動元を含む）の号級グリッドのキャッシュを破棄する"""
+    invalidate_wage_grid(*_facility_ids(instance))
+
+
+@receiver([post_save, post_delete], sender=WageTable)
+def invalidate_readiness_on_wage_table_change(sender, instance, **kwargs):
+    """賃金テーブルの変更時に事業所の整備状況・号級グリッドのキャッシュを破棄する"""
+    facility_id = Position.objects.filter(pk=instance.position_id).values_list('facility_id', flat=True).first()
+    if facility_id is not None:
+        invalidate_facility_readiness(facility_id)
+        invalidate_wage_grid(facility_id)
+
+
+@receiver([post_save, post_delete], sender=Facility)
+def invalidate_readiness_on_facility_change(sender, instance, **kwargs):
+    """事業所の登録・削除時に整備状況・号級グリッドのキャッシュを破棄する"""
+    invalidate_facility_readiness(instance.pk)
+    invalidate_wage_grid(instance.pk)
+
+
+@receiver(post_delete, sender=Job)
+def remove_export_on_job_delete(sender, instance, **kwargs):
+    """出力ファイルを作成した処理が削除されたら、そのファイルも削除する"""
+    if instance.name == 'career_management.export':
+        remove_export(instance.token)
@@ -0,0 +1,38 @@
+"""
+バックグラウンド処理（jobs のワーカーが実行する）
+"""
+from django.urls import reverse
+
+from facility_management.models import Facility
+from jobs.registry import task
+from .services.exports import export_filename, export_path, write_export
+from .services.wage_table_generator import WageTableGenerator
+
+
+@task('career_management.apply_wage_suggestions', label='賃金テーブル案の一括保存')
+def apply_wage_suggestions(job, facility_id, overwrite=False):
+    """事業所の全職位に賃金テーブル案を一括保存する"""
+    facility = Facility.objects.select_related('provider').get(pk=facility_id)
+    result = WageTableGenerator(facility).apply_all_suggestions(overwrite=overwrite)
+    return {
+        'message': f"賃金テーブル案を一括保存しました（新規 {result['created']}件 / 更新 {result['updated']}件）。",
+        'url': reverse('wage_table_builder', args=[facility_id]),
+        'link_label': '号級賃金テーブルへ戻る',
+    }
+
+
+@task('career_management.export', label='出力ファイルの作成')
+def export(job, kind, fmt, provider_id):
+    """法人全体の出力をファイルに書き出す（ダウンロードは処理のトークンで行う）"""
+    filename = export_filename(kind, fmt, provider_id=provider_id)
+    write_export(
+        export_path(job.token, fmt), kind, fmt, provider_id,
+        progress=lambda done, total: job.report_progress(done, total, f'{done} / {total} 事業所'),
+    )
+    return {
+        'message': f'{filename} の作成が完了しました。',
+        'filename': filename,
+        'format': fmt,
+        'url': reverse('export_download', args=[job.token]),
+        'link_label': 'ダウンロード',
+    }
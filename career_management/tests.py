@@ -1,3 +1,715 @@
+import io
+import os
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.core.cache.utils import make_template_fragment_key
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from facility_management.models import Provider, Facility
+from jobs.models import Job
+from shogu_kaizen_system.master_cache import get_version
+from jobs.services.queue import prune_finished, run_pending
+from shogu_kaizen_system.testing import QueryPlanAssertionsMixin
+from .models import (
+    JobCategory, Position, WageTable, WageStep, StaffMember, StaffEvaluation, PromotionCriteria,
+    SalaryIncreaseSystem, TrainingPlan, CareerPathRequirementOne,
+)
+from .services import exports, wage_table_generator
+from .services.facility_readiness import get_facility_readiness
+from .services.promotion_engine import PromotionEligibilityEngine
+from .services.qualification_index import certified_care_worker_ratios, held_qualifications
+from .services.query_plans import (
+    requirement_one_positions, requirement_two_plans, staff_list_members, wage_builder_positions,
+)
+from .services.staff_importer import StaffImporter
+from .services.wage_grid import GRID_CACHE_NAME, WageGridEngine, salary_at, salary_series
+from .services.wage_table_generator import WageTableGenerator
+
+
+class WageTableBuilderQueryTests(TestCase):
+    """賃金テーブル構築画面のクエリ数が職位数に比例しないことを確認する"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        cls.facility = Facility.objects.create(
+            provider=cls.provider,
+            name='テスト事業所',
+            service_type='special_nursing_home',
+            facility_number='0000000001',
+            address='東京都千代田区1-1',
+        )
+        cls.categories = [
+            JobCategory.objects.create(category_code=code, category_name=name)
+            for code, name in JobCategory.CATEGORY_CHOICES
+        ]
+
+    def _add_positions(self, count):
+        existing = Position.objects.filter(facility=self.facility).count()
+        for i in range(existing, existing + count):
+            position = Position.objects.create(
+                facility=self.facility,
+                job_category=self.categories[i // 10],
+                position_name=f'職位{i}',
+                level=i % 10 + 1,
+            )
+            # 半数の職位だけ賃金テーブルを保存済みにする
+            if i % 2 == 0:
+                WageTable.objects.create(position=position, base_salary_start=200000, step_raise_amount=2000)
+
+    def _count_queries(self):
+        url = reverse('wage_table_builder', args=[self.facility.id])
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_query_count_is_constant(self):
+        self._add_positions(2)
+        small = self._count_queries()
+        self._add_positions(30)
+        large = self._count_queries()
+        self.assertEqual(small, large)
+
+    def test_grid_marks_saved_positions(self):
+        self._add_positions(4)
+        response = self.client.get(reverse('wage_table_builder', args=[self.facility.id]))
+        columns = response.context['grid'].columns
+        self.assertEqual([column.is_saved for column in columns], [True, False, True, False])
+        self.assertEqual(response.context['grid'].rows[1].cells[0].salary, 202000)
+
+    def test_grid_is_cached_until_wage_table_changes(self):
+        self._add_positions(4)
+        url = reverse('wage_table_builder', args=[self.facility.id])
+        first = self._count_queries()
+        # 2回目は号級グリッドをキャッシュから取得する
+        self.assertLess(self._count_queries(), first)
+        # 表の描画結果も号級グリッドのキャッシュキーごとに保存される
+        grid_key = self.client.get(url).context['grid_key']
+        fragment = cache.get(make_template_fragment_key('wage_grid_table', [grid_key]))
+        self.assertIn('<td class="saved-cell">200000円</td>', fragment)
+
+        WageTable.objects.filter(position__facility=self.facility).first().delete()
+        response = self.client.get(url)
+        self.assertEqual([column.is_saved for column in response.context['grid'].columns], [False, False, True, False])
+        self.assertContains(response, '<td class="unsaved-cell">256000円</td>', html=True)
+
+
+class WageGridEngineTests(TestCase):
+    """号級グリッドの一括計算が、従来の職位×号ごとの計算と同じ結果になることを確認する"""
+
+    def setUp(self):
+        provider = Provider.objects.create(name='テスト法人', address='大阪府大阪市1-1')
+        self.facility = Facility.objects.create(
+            provider=provider, name='テスト事業所', service_type='day_service', facility_number='0000000003',
+            address='大阪府大阪市1-1',
+        )
+        category = JobCategory.objects.create(category_code='care', category_name='介護職員')
+        # 最大号数が表示号数より多い・少ない・昇給なし・未保存（提案値）の職位
+        for level, params in enumerate([
+            {'base_salary_start': 200000, 'step_raise_amount': 1500, 'max_steps': 40},
+            {'base_salary_start': 230000, 'step_raise_amount': 3000, 'max_steps': 5},
+            {'base_salary_start': 250000, 'step_raise_amount': 0, 'max_steps': 12},
+            None,
+        ], start=1):
+            position = Position.objects.create(
+                facility=self.facility, job_category=category, position_name=f'職位{level}', level=level,
+            )
+            if params:
+                WageTable.objects.create(position=position, **params)
+
+    def _old_salary_by_step(self, position, suggestion):
+        """変更前のビューと同じ、職位×号ごとの計算"""
+        wage_table = getattr(position, 'wage_table', None)
+        if wage_table is not None:
+            return {step: wage_table.get_salary_for_step(step) for step in range(1, wage_table.max_steps + 1)}
+        return {
+            step: suggestion['base_salary_start'] + suggestion['step_raise_amount'] * (step - 1)
+            for step in range(1, suggestion['max_steps'] + 1)
+        }
+
+    def test_matches_per_cell_calculation(self):
+        positions = list(Position.objects.filter(facility=self.facility).select_related('wage_table').order_by('level'))
+        suggestions = WageTableGenerator(self.facility).generate_for_positions(positions)
+        grid = WageGridEngine().build(positions, suggestions)
+
+        self.assertEqual(grid.max_steps, 40)
+        self.assertEqual([row.step for row in grid.rows], list(range(1, 41)))
+        self.assertEqual([column.is_saved for column in grid.columns], [True, True, True, False])
+        for index, position in enumerate(positions):
+            expected = self._old_salary_by_step(position, suggestions[position.id])
+            cells = [row.cells[index] for row in grid.rows]
+            self.assertEqual([cell.salary for cell in cells], [expected.get(step) for step in range(1, 41)])
+            self.assertEqual({cell.css_class for cell in cells}, {grid.columns[index].css_class})
+
+    def test_salary_at_clamps_like_wage_table(self):
+        wage_table = WageTable.objects.get(max_steps=5)
+        series = salary_series(wage_table.base_salary_start, wage_table.step_raise_amount, wage_table.max_steps)
+        for step in range(1, 9):
+            self.assertEqual(salary_at(series, step), wage_table.get_salary_for_step(step))
+        self.assertEqual(salary_series(200000, 1000, 0), [])
+        self.assertEqual(WageGridEngine(min_steps=3).build([], {}).rows[2].cells, [])
+
+
+class WageTableGeneratorTests(TestCase):
+    """賃金テーブル案の一括生成とキャッシュの無効化を確認する"""
+
+    def setUp(self):
+        self.category = JobCategory.objects.create(category_code='care', category_name='介護職員')
+        self.facilities = []
+        for i, address in enumerate(['東京都千代田区1-1', '大阪府大阪市1-1', '北海道札幌市1-1']):
+            provider = Provider.objects.create(name=f'法人{i}', address=address)
+            facility = Facility.objects.create(
+                provider=provider, name=f'事業所{i}', service_type='day_service', facility_number=f'00000001{i:02d}',
+                address=address,
+            )
+            for level in (1, 3):
+                Position.objects.create(
+                    facility=facility, job_category=self.category, position_name=f'職位{level}', level=level,
+                )
+            self.facilities.append(facility)
+        saved = dict(wage_table_generator.REGIONAL_WAGE_BENCHMARKS)
+        self.addCleanup(wage_table_generator.update_regional_wage_benchmarks, saved)
+
+    def test_batch_matches_single_generation(self):
+        positions = list(Position.objects.select_related('facility__provider').order_by('id'))
+        generator = WageTableGenerator(self.facilities[0])
+        with self.assertNumQueries(0):
+            suggestions = generator.generate_for_positions(positions)
+        for position in positions:
+            self.assertEqual(
+                suggestions[position.id], WageTableGenerator(position.facility).generate_optimized_wage_table(position),
+            )
+        self.assertEqual(suggestions[positions[1].id]['base_salary_start'], int(320000 * 1.1))
+        self.assertEqual(suggestions[positions[5].id]['base_salary_start'], int(270000 * 1.1))
+
+    def test_benchmark_change_clears_cached_suggestions_and_grid(self):
+        facility = self.facilities[0]
+        position = Position.objects.filter(facility=facility, level=1).get()
+        url = reverse('wage_table_builder', args=[facility.id])
+        self.assertEqual(WageTableGenerator(facility).generate_optimized_wage_table(position)['base_salary_start'], 256000)
+        self.assertContains(self.client.get(url), '<td class="unsaved-cell">256000円</td>', html=True)
+        version = get_version(wage_table_generator.BENCHMARK_CACHE_NAME)
+
+        wage_table_generator.update_regional_wage_benchmarks({'東京都': {'care_staff_avg': 330000}})
+        self.assertNotEqual(get_version(wage_table_generator.BENCHMARK_CACHE_NAME), version)
+        self.assertEqual(WageTableGenerator(facility).generate_optimized_wage_table(position)['base_salary_start'], 264000)
+        self.assertContains(self.client.get(url), '<td class="unsaved-cell">264000円</td>', html=True)
+
+    def test_wage_table_save_bumps_grid_version(self):
+        facility = self.facilities[1]
+        name = GRID_CACHE_NAME.format(facility.id)
+        version = get_version(name)
+        wage_table = WageTable.objects.create(
+            position=Position.objects.filter(facility=facility).first(), base_salary_start=210000,
+        )
+        self.assertNotEqual(get_version(name), version)
+        version = get_version(name)
+        wage_table.step_raise_amount = 2500
+        wage_table.save()
+        self.assertNotEqual(get_version(name), version)
+        # 他の事業所のグリッドには影響しない
+        other = GRID_CACHE_NAME.format(self.facilities[2].id)
+        version = get_version(other)
+        wage_table.delete()
+        self.assertEqual(get_version(other), version)
+
+
+class ApplyAllSuggestionsTests(TestCase):
+    """賃金テーブル案の一括保存（既存テーブルの上書き有無）を確認する"""
+
+    def setUp(self):
+        provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        self.facility = Facility.objects.create(
+            provider=provider, name='テスト事業所', service_type='day_service', facility_number='0000000200',
+            address='東京都千代田区1-1',
+        )
+        category = JobCategory.objects.create(category_code='care', category_name='介護職員')
+        self.positions = [
+            Position.objects.create(
+                facility=self.facility, job_category=category, position_name=f'職位{level}', level=level,
+            )
+            for level in (1, 2, 3)
+        ]
+        self.existing = WageTable.objects.create(
+            position=self.positions[0], base_salary_start=199000, step_raise_amount=1000, max_steps=10,
+        )
+
+    def test_without_overwrite_keeps_existing_tables(self):
+        result = WageTableGenerator(self.facility).apply_all_suggestions()
+        self.assertEqual(result, {'created': 2, 'updated': 0})
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.base_salary_start, self.existing.max_steps), (199000, 10))
+        self.assertEqual(self.positions[0].wage_steps.count(), 10)
+
+        created = WageTable.objects.get(position=self.positions[2])
+        self.assertEqual((created.base_salary_start, created.max_steps), (int(320000 * 1.1), 30))
+        self.assertEqual(self.positions[2].wage_steps.count(), 30)
+        # 2回目は作成済みのため何もしない
+        self.assertEqual(WageTableGenerator(self.facility).apply_all_suggestions(), {'created': 0, 'updated': 0})
+
+    def test_overwrite_updates_existing_tables(self):
+        result = WageTableGenerator(self.facility).apply_all_suggestions(overwrite=True)
+        self.assertEqual(result, {'created': 2, 'updated': 1})
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.base_salary_start, self.existing.max_steps), (256000, 30))
+        self.assertEqual(self.positions[0].wage_steps.count(), 30)
+        self.assertEqual(WageTable.objects.filter(position__facility=self.facility).count(), 3)
+
+
+class WageStepRefreshTests(TestCase):
+    """賃金テーブルの保存・削除に号級行が追従することを確認する"""
+
+    def setUp(self):
+        provider = Provider.objects.create(name='テスト法人', address='大阪府大阪市1-1')
+        facility = Facility.objects.create(
+            provider=provider, name='テスト事業所', service_type='day_service', facility_number='0000000002',
+            address='大阪府大阪市1-1',
+        )
+        category = JobCategory.objects.create(category_code='care', category_name='介護職員')
+        self.position = Position.objects.create(facility=facility, job_category=category, position_name='介護職員', level=1)
+
+    def test_save_and_delete_refresh_rows(self):
+        wage_table = WageTable.objects.create(
+            position=self.position, base_salary_start=200000, step_raise_amount=1000, max_steps=10,
+            qualification_allowance=5000,
+        )
+        self.assertEqual(self.position.wage_steps.count(), 10)
+        self.assertEqual(WageStep.objects.salary_for(self.position, 3).total_salary, 207000)
+        # 最大号数を超える号は最大号の賃金になる
+        self.assertEqual(WageStep.objects.salary_for(self.position, 99).base_salary, wage_table.get_salary_for_step(99))
+
+        wage_table.max_steps = 5
+        wage_table.save()
+        self.assertEqual(self.position.wage_steps.count(), 5)
+
+        wage_table.delete()
+        self.assertFalse(self.position.wage_steps.exists())
+
+
+class StaffImporterTests(TestCase):
+    """職員CSV取り込みの新規・更新・エラー行の扱いを確認する"""
+
+    def setUp(self):
+        provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        self.facility = Facility.objects.create(
+            provider=provider, name='テスト事業所', service_type='day_service', facility_number='1300000001',
+            address='東京都千代田区1-1',
+        )
+        category = JobCategory.objects.create(category_code='care', category_name='介護職員')
+        self.position = Position.objects.create(facility=self.facility, job_category=category, position_name='介護職員', level=1)
+        StaffMember.objects.create(
+            facility=self.facility, staff_id='A001', name='旧氏名', employment_status='full_time', hire_date='2020-04-01',
+        )
+
+    def test_import_creates_updates_and_rejects(self):
+        csv_text = (
+            'staff_id,name,facility_number,employment_status,hire_date,position_name,current_base_salary\n'
+            'A001,新氏名,1300000001,正職員,2020/04/01,介護職員,"210,000"\n'
+            'A002,新人,1300000001,part_time,2024-04-01,,\n'
+            'A003,不明,9999999999,full_time,2024-04-01,,\n'
+            'A004,日付不正,1300000001,full_time,昨日,,\n'
+        )
+        report = StaffImporter(chunk_size=2).import_file(io.StringIO(csv_text))
+
+        self.assertEqual((report.processed, report.created, report.updated), (4, 1, 1))
+        self.assertEqual([line for line, _, _ in report.rejected], [4, 5])
+        staff = StaffMember.objects.get(staff_id='A001')
+        self.assertEqual(staff.name, '新氏名')
+        self.assertEqual(staff.current_position, self.position)
+        self.assertEqual(staff.current_base_salary, 210000)
+
+    def test_reimport_without_optional_columns_keeps_other_fields(self):
+        StaffMember.objects.filter(staff_id='A001').update(
+            current_position=self.position, current_base_salary=230000, qualifications='介護福祉士', is_active=False,
+        )
+        StaffMember.objects.get(staff_id='A001').save()  # 資格索引を作る
+        csv_text = (
+            'staff_id,name,facility_number,employment_status,hire_date\n'
+            'A001,改姓後,1300000001,full_time,2020-04-01\n'
+            f'A005,{"長" * 101},1300000001,full_time,2020-04-01\n'
+        )
+        report = StaffImporter().import_file(io.StringIO(csv_text))
+
+        self.assertEqual((report.updated, [line for line, _, _ in report.rejected]), (1, [3]))
+        staff = StaffMember.objects.get(staff_id='A001')
+        self.assertEqual(staff.name, '改姓後')
+        self.assertEqual(
+            (staff.current_position, staff.current_base_salary, staff.qualifications, staff.is_active),
+            (self.position, 230000, '介護福祉士', False),
+        )
+        self.assertEqual(list(staff.qualification_index.values_list('qualification__name', flat=True)), ['介護福祉士'])
+
+    def test_admin_import_accepts_only_offered_encodings(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        url = reverse('admin:career_management_staffmember_import_csv')
+        csv_text = 'staff_id,name,facility_number,employment_status,hire_date\nA001,新氏名,1300000001,full_time,2020-04-01\n'
+
+        response = self.client.post(url, {
+            'csv_file': SimpleUploadedFile('staff.csv', csv_text.encode('cp932')), 'encoding': 'rot13',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors['encoding'])
+        self.assertEqual(StaffMember.objects.get(staff_id='A001').name, '旧氏名')
+
+        self.client.post(url, {
+            'csv_file': SimpleUploadedFile('staff.csv', csv_text.encode('cp932')), 'encoding': 'cp932',
+        })
+        self.assertEqual(StaffMember.objects.get(staff_id='A001').name, '新氏名')
+
+
+class PromotionEligibilityEngineTests(TestCase):
+    """昇格判定エンジンの判定理由と並び順を確認する"""
+
+    def setUp(self):
+        provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        self.facility = Facility.objects.create(
+            provider=provider, name='テスト事業所', service_type='day_service', facility_number='1300000003',
+            address='東京都千代田区1-1',
+        )
+        category = JobCategory.objects.create(category_code='care', category_name='介護職員')
+        self.staff_position = Position.objects.create(facility=self.facility, job_category=category, position_name='介護職員', level=1)
+        self.leader_position = Position.objects.create(
+            facility=self.facility, job_category=category, position_name='主任', level=2, required_experience_months=36,
+        )
+        PromotionCriteria.objects.create(
+            facility=self.facility, from_position=self.staff_position, to_position=self.leader_position,
+            required_experience_years=3, required_qualifications='介護福祉士', required_evaluation_score=3,
+            review_process='面接',
+        )
+
+    def _staff(self, staff_id, hire_date, qualifications, score):
+        staff = StaffMember.objects.create(
+            facility=self.facility, staff_id=staff_id, name=staff_id, employment_status='full_time',
+            hire_date=hire_date, current_position=self.staff_position, qualifications=qualifications,
+        )
+        StaffEvaluation.objects.create(
+            staff_member=staff, evaluation_period='2025年上期', evaluation_date=date(2025, 9, 30),
+            overall_score=score, evaluator_name='評価者',
+        )
+        return staff
+
+    def test_ranked_candidates_with_reasons(self):
+        self._staff('junior', date(2024, 4, 1), '介護職員初任者研修', 2.0)
+        self._staff('senior', date(2018, 4, 1), '介護福祉士', 4.0)
+
+        candidates = PromotionEligibilityEngine(self.facility, today=date(2026, 4, 1)).evaluate()
+
+        self.assertEqual([c.staff.staff_id for c in candidates], ['senior', 'junior'])
+        self.assertTrue(candidates[0].eligible)
+        self.assertEqual(len(candidates[1].issues), 4)
+        self.assertIn('介護福祉士資格が必要', candidates[1].issues)
+
+    def test_latest_evaluation_is_used(self):
+        staff = self._staff('senior', date(2018, 4, 1), '介護福祉士', 2.0)
+        StaffEvaluation.objects.create(
+            staff_member=staff, evaluation_period='2024年下期', evaluation_date=date(2025, 3, 31),
+            overall_score=5.0, evaluator_name='評価者',
+        )
+        # 評価履歴はまとめて読み込まず、職員の取得と同じクエリで最新の1件を選ぶ
+        with self.assertNumQueries(4):
+            candidates = PromotionEligibilityEngine(self.facility, today=date(2026, 4, 1)).evaluate()
+        self.assertEqual(candidates[0].evaluation_score, 2.0)
+
+    def test_check_promotion_eligibility_uses_criteria(self):
+        staff = self._staff('senior', date(2018, 4, 1), '介護福祉士', 2.5)
+        eligible, issues = staff.check_promotion_eligibility(self.leader_position)
+        self.assertFalse(eligible)
+        self.assertEqual(issues, ['評価点数不足（必要: 3.0, 現在: 2.5）'])
+
+    def test_qualification_requires_exact_name(self):
+        # 名前に必要資格を含むだけの別資格は満たさない。全角・半角や空白の揺れは同じ資格とみなす
+        advanced = self._staff('advanced', date(2018, 4, 1), '認定介護福祉士', 4.0)
+        spaced = self._staff('spaced', date(2018, 4, 1), '介護　福祉士', 4.0)
+        self.assertEqual(advanced.check_promotion_eligibility(self.leader_position)[1], ['介護福祉士資格が必要'])
+        self.assertEqual(spaced.check_promotion_eligibility(self.leader_position), (True, []))
+
+    def test_at_least_accepts_higher_qualification(self):
+        # 「以上」は上位の資格でも満たし、下位の資格では満たさない
+        PromotionCriteria.objects.filter(to_position=self.leader_position).update(required_qualifications='介護職員初任者研修以上')
+        certified = self._staff('certified', date(2018, 4, 1), '介護福祉士', 4.0)
+        none = self._staff('none', date(2018, 4, 1), '', 4.0)
+        self.assertEqual(certified.check_promotion_eligibility(self.leader_position), (True, []))
+        self.assertEqual(none.check_promotion_eligibility(self.leader_position)[1], ['介護職員初任者研修以上の資格が必要'])
+
+        PromotionCriteria.objects.filter(to_position=self.leader_position).update(required_qualifications='介護福祉士以上')
+        beginner = self._staff('beginner', date(2018, 4, 1), '介護職員初任者研修', 4.0)
+        self.assertEqual(beginner.check_promotion_eligibility(self.leader_position)[1], ['介護福祉士以上の資格が必要'])
+
+    def test_listed_qualifications_are_alternatives(self):
+        # 読点で並べた資格はいずれか1つ、「＋」でつないだ資格はすべて必要
+        PromotionCriteria.objects.filter(to_position=self.leader_position).update(
+            required_qualifications='介護福祉士、社会福祉士のいずれか＋喀痰吸引等研修修了'
+        )
+        social = self._staff('social', date(2018, 4, 1), '社会福祉士\n喀痰吸引等研修', 4.0)
+        certified = self._staff('certified', date(2018, 4, 1), '介護福祉士', 4.0)
+        self.assertEqual(social.check_promotion_eligibility(self.leader_position), (True, []))
+        self.assertEqual(certified.check_promotion_eligibility(self.leader_position)[1], ['喀痰吸引等研修資格が必要'])
+
+
+class QualificationIndexTests(TestCase):
+    """保有資格テキストから資格索引が作られることを確認する"""
+
+    def setUp(self):
+        provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        self.facility = Facility.objects.create(
+            provider=provider, name='テスト事業所', service_type='day_service', facility_number='1300000004',
+            address='東京都千代田区1-1',
+        )
+        category = JobCategory.objects.create(category_code='care', category_name='介護職員')
+        self.position = Position.objects.create(facility=self.facility, job_category=category, position_name='介護職員', level=1)
+
+    def _staff(self, staff_id, qualifications, dates=''):
+        return StaffMember.objects.create(
+            facility=self.facility, staff_id=staff_id, name=staff_id, employment_status='full_time',
+            hire_date=date(2020, 4, 1), current_position=self.position,
+            qualifications=qualifications, qualification_acquisition_dates=dates,
+        )
+
+    def test_index_follows_text_field(self):
+        staff = self._staff('A', '介護職員初任者研修\n介護福祉士', '2018/4/1\n介護福祉士: 2022年3月20日')
+        self._staff('B', '介護職員初任者研修')
+
+        index = {q.qualification.name: q.acquired_date for q in staff.qualification_index.select_related('qualification')}
+        self.assertEqual(index, {'介護職員初任者研修': date(2018, 4, 1), '介護福祉士': date(2022, 3, 20)})
+        self.assertEqual(held_qualifications(name='A')[staff.id], {'介護職員初任者研修', '介護福祉士'})
+        self.assertEqual(certified_care_worker_ratios([self.facility]), {self.facility.id: 0.5})
+
+        staff.qualifications = '介護職員初任者研修'
+        staff.save()
+        self.assertEqual(held_qualifications(name='A')[staff.id], {'介護職員初任者研修'})
+
+
+class StaffExperienceQueryTests(TestCase):
+    """経験月数の注釈と入職日による絞り込みが一致することを確認する"""
+
+    def test_min_experience_matches_annotation(self):
+        provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        facility = Facility.objects.create(
+            provider=provider, name='テスト事業所', service_type='day_service', facility_number='1300000005',
+            address='東京都千代田区1-1',
+        )
+        for i, hire_date in enumerate([date(2021, 10, 31), date(2021, 11, 1), date(2015, 1, 1)]):
+            StaffMember.objects.create(
+                facility=facility, staff_id=f'E{i}', name=f'E{i}', employment_status='full_time', hire_date=hire_date,
+            )
+        today = date(2026, 10, 1)
+
+        annotated = StaffMember.objects.with_experience_months(today).order_by('tenure_months')
+        self.assertEqual([s.experience_months for s in annotated], [59, 60, 141])
+        self.assertEqual(
+            set(StaffMember.objects.with_min_experience(60, today).values_list('staff_id', flat=True)),
+            {'E0', 'E2'},
+        )
+        checked = StaffMember.objects.with_experience_checks([60], today)
+        self.assertEqual({s.staff_id for s in checked if s.has_experience_60}, {'E0', 'E2'})
+
+
+class FacilityReadinessTests(TestCase):
+    """事業所の整備状況の一括集計とキャッシュの破棄を確認する"""
+
+    def setUp(self):
+        provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        self.facilities = [
+            Facility.objects.create(
+                provider=provider, name=f'事業所{i}', service_type='day_service', facility_number=f'13000001{i:02d}',
+                address='東京都千代田区1-1',
+            )
+            for i in range(5)
+        ]
+
+    def test_aggregates_in_one_query_and_invalidates(self):
+        with self.assertNumQueries(1):
+            readiness = get_facility_readiness(self.facilities)
+        self.assertFalse(readiness[self.facilities[0].id].has_salary_system)
+
+        # キャッシュ済みならクエリは発行されない
+        with self.assertNumQueries(0):
+            get_facility_readiness(self.facilities)
+
+        SalaryIncreaseSystem.objects.create(facility=self.facilities[0])
+        TrainingPlan.objects.create(
+            facility=self.facilities[0], fiscal_year=2025, training_name='新人研修', description='-', objectives='-',
+            training_type='OJT',
+        )
+        with self.assertNumQueries(1):
+            readiness = get_facility_readiness(self.facilities)
+        self.assertTrue(readiness[self.facilities[0].id].has_salary_system)
+        self.assertEqual(readiness[self.facilities[0].id].training_plan_count, 1)
+        self.assertEqual(readiness[self.facilities[1].id].training_plan_count, 0)
+
+    def test_moving_staff_or_position_invalidates_both_facilities(self):
+        source, target = self.facilities[:2]
+        staff = StaffMember.objects.create(
+            facility=source, staff_id='M001', name='異動者', employment_status='full_time', hire_date='2020-04-01',
+        )
+        position = Position.objects.create(
+            facility=source, job_category=JobCategory.objects.create(category_code='care', category_name='介護職員'),
+            position_name='一般職員', level=1,
+        )
+        readiness = get_facility_readiness([source, target])
+        self.assertEqual((readiness[source.id].active_staff_count, readiness[source.id].position_count), (1, 1))
+
+        staff.facility = target
+        staff.save()
+        position.facility = target
+        position.save()
+        readiness = get_facility_readiness([source, target])
+        self.assertEqual((readiness[source.id].active_staff_count, readiness[source.id].position_count), (0, 0))
+        self.assertEqual((readiness[target.id].active_staff_count, readiness[target.id].position_count), (1, 1))
+
+
+class AsyncListViewTests(TestCase):
+    """非同期ビューが描画中に遅延読み込みせず表示できることを確認する"""
+
+    def setUp(self):
+        provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        self.facility = Facility.objects.create(
+            provider=provider, name='テスト事業所', service_type='day_service', facility_number='1300000300',
+            address='東京都千代田区1-1',
+        )
+        category = JobCategory.objects.create(category_code='care_worker', category_name='介護職員')
+        self.position = Position.objects.create(
+            facility=self.facility, job_category=category, position_name='リーダー', level=2
+        )
+        StaffMember.objects.create(
+            facility=self.facility, staff_id='S001', name='山田太郎', hire_date=date(2020, 4, 1),
+            current_position=self.position,
+        )
+        CareerPathRequirementOne.objects.create(
+            facility=self.facility, position=self.position, required_experience_years=3,
+            job_description='-', responsibilities='-', base_salary_min=200000, base_salary_max=250000,
+        )
+        plan = TrainingPlan.objects.create(
+            facility=self.facility, fiscal_year=2025, training_name='新人研修', description='-', objectives='-',
+            training_type='OJT',
+        )
+        plan.target_positions.add(self.position)
+
+    def test_list_pages_render(self):
+        response = self.client.get(reverse('staff_list', args=[self.facility.id]))
+        self.assertContains(response, 'テスト事業所 - 介護職員 - リーダー')
+        response = self.client.get(reverse('requirement_one_list', args=[self.facility.id]))
+        self.assertContains(response, '3年以上')
+        response = self.client.get(reverse('requirement_two_list', args=[self.facility.id]))
+        self.assertContains(response, 'リーダー')
+        self.assertEqual(self.client.get(reverse('staff_list', args=[0])).status_code, 404)
+
+
+class HotPathQueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    """画面・サービスで実際に使うクエリが全件走査にならないことを実行計画で確認する"""
+
+    @classmethod
+    def setUpTestData(cls):
+        provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        cls.facility = Facility.objects.create(
+            provider=provider, name='テスト事業所', service_type='day_service', facility_number='0000000500',
+            address='東京都千代田区1-1',
+        )
+
+    def test_staff_list_uses_indexes(self):
+        self.assertNoFullScan(staff_list_members(self.facility), StaffMember, Position)
+
+    def test_position_listings_use_indexes(self):
+        # 職位は unique_together（facility, job_category, level）の複合インデックスで引ける
+        self.assertNoFullScan(wage_builder_positions(self.facility), Position, WageTable)
+        self.assertNoFullScan(requirement_one_positions(self.facility), Position, CareerPathRequirementOne)
+
+    def test_training_plan_listing_uses_index(self):
+        self.assertNoFullScan(requirement_two_plans(self.facility), TrainingPlan)
+
+    def test_promotion_engine_lookups_use_indexes(self):
+        engine = PromotionEligibilityEngine(self.facility, today=date(2025, 4, 1))
+        self.assertNoFullScan(engine.facility_criteria(), PromotionCriteria)
+        self.assertNoFullScan(engine.candidate_staff([1, 2]), StaffMember, StaffEvaluation)
+
+
+class ExportTests(TestCase):
+    """提出用の出力が CSV・XLSX として正しく生成されることを確認する"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        cls.facilities = [
+            Facility.objects.create(
+                provider=cls.provider, name=f'テスト事業所{i}', service_type='day_service',
+                facility_number=f'130000040{i}', address='東京都千代田区1-1',
+            )
+            for i in range(2)
+        ]
+        category = JobCategory.objects.create(category_code='care', category_name='介護職員')
+        for facility in cls.facilities:
+            position = Position.objects.create(
+                facility=facility, job_category=category, position_name='リーダー', level=2
+            )
+            WageTable.objects.create(position=position, base_salary_start=200000, step_raise_amount=1000, max_steps=5)
+            CareerPathRequirementOne.objects.create(
+                facility=facility, position=position, required_experience_years=3, job_description='利用者対応',
+                responsibilities='-', base_salary_min=200000, base_salary_max=250000, raise_rules='年1回',
+            )
+            SalaryIncreaseSystem.objects.create(facility=facility, increase_timing='OCTOBER')
+
+    def _content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_facility_csv(self):
+        facility = self.facilities[0]
+        response = self.client.get(reverse('facility_export', args=[facility.id, 'salary-increase', 'csv']))
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="facility_1300000400_salary-increase.csv"')
+        lines = self._content(response).decode('utf-8-sig').splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['事業所番号', '事業所名', '定期昇給の有無'])
+        self.assertEqual(lines[1].split(',')[:4], ['1300000400', 'テスト事業所0', 'あり', '10月'])
+        self.assertEqual(len(lines), 2)
+
+    def test_facility_xlsx_contains_all_sheets(self):
+        response = self.client.get(reverse('facility_export', args=[self.facilities[0].id, 'all', 'xlsx']))
+        archive = zipfile.ZipFile(io.BytesIO(self._content(response)))
+        self.assertIsNone(archive.testzip())
+        self.assertIn('号級賃金表', archive.read('xl/workbook.xml').decode('utf-8'))
+        grid = archive.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertIn('<c r="B4"><v>200000</v></c>', grid)
+        self.assertIn('<c r="B8"><v>204000</v></c>', grid)
+        self.assertIn('利用者対応', archive.read('xl/worksheets/sheet2.xml').decode('utf-8'))
+
+        # CSV は種類を1つに限る
+        response = self.client.get(reverse('facility_export', args=[self.facilities[0].id, 'all', 'csv']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_large_provider_export_runs_in_background(self):
+        url = reverse('provider_export', args=[self.provider.id, 'requirement-one', 'csv'])
+        with tempfile.TemporaryDirectory() as directory, \
+                self.settings(EXPORT_ROOT=directory, JOBS_WORKER_ENABLED=True), \
+                mock.patch.object(exports, 'BACKGROUND_THRESHOLD', 1):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 302)
+            self.assertContains(self.client.get(response['Location']), '待機中')
+            self.assertEqual(run_pending(), 1)
+            status = self.client.get(response['Location'])
+            self.assertContains(status, 'provider_')
+            self.assertContains(status, 'ダウンロード')
+
+            token = response['Location'].rstrip('/').rsplit('/', 1)[-1]
+            download = self.client.get(reverse('export_download', args=[token]))
+            lines = b''.join(download.streaming_content).decode('utf-8-sig').splitlines()
+            self.assertEqual([line.split(',')[0] for line in lines[1:]], ['1300000400', '1300000401'])
+            download.close()
+
+            # 保存期間を過ぎた処理を削除すると、出力ファイルも削除される
+            self.assertEqual(prune_finished(days=1), 0)
+            Job.objects.filter(token=token).update(finished_at=timezone.now() - timedelta(days=2))
+            self.assertEqual(prune_finished(days=1), 1)
+            self.assertEqual(os.listdir(directory), [])
 
-# Create your tests here.
+        # しきい値以下ならその場でストリーミングする
+        self.assertTrue(self.client.get(url).streaming)
@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('', views.index, name='career_index'),
+    path('facility-overview/', views.facility_overview, name='facility_overview'),
     path('facility/<int:facility_id>/wage-table-builder/', views.wage_table_builder, name='wage_table_builder'),
     path('facility/<int:facility_id>/staff-list/', views.staff_list, name='staff_list'),
     path('facility/<int:facility_id>/promotion-candidates/', views.promotion_candidates, name='promotion_candidates'),
@@ -57,5 +58,17 @@ urlpatterns = [
         views.training_plan_edit,
         name='training_plan_edit'
     ),
+    
+    # 提出用の出力
+    path(
+        'facility/<int:facility_id>/export/<slug:kind>.<slug:fmt>',
+        views.facility_export,
+        name='facility_export'
+    ),
+    path(
+        'provider/<int:provider_id>/export/<slug:kind>.<slug:fmt>',
+        views.provider_export,
+        name='provider_export'
+    ),
+    path('exports/<uuid:token>/download/', views.export_download, name='export_download'),
 ]
-
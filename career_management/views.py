@@ -1,69 +1,80 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
 from django.contrib import messages
-from facility_management.models import Facility
+from django.http import FileResponse, Http404
+from facility_management.models import Provider, Facility
+from jobs.models import Job
+from jobs.services.queue import enqueue
+from shogu_kaizen_system.streaming_export import streaming_response
 from .models import Position, WageTable, StaffMember
 from .services.wage_table_generator import WageTableGenerator
+from .services.facility_readiness import get_facility_readiness
+from .services.promotion_engine import PromotionEligibilityEngine
+from .services.exports import (
+    EXPORT_KINDS, FORMATS, export_chunks, export_facilities, export_filename, export_path, needs_background,
+)
+from .services.query_plans import (
+    wage_builder_facility, wage_builder_grid, wage_builder_grid_key,
+    staff_list_members, requirement_one_positions, requirement_two_plans,
+)
 
 def index(request):
     """キャリア管理トップページ"""
-    facilities = Facility.objects.all()[:5]
+    facilities = list(Facility.objects.all()[:5])
+    readiness = get_facility_readiness(facilities)
     return render(request, 'career_management/index.html', {
-        'facilities': facilities
+        'facilities': facilities,
+        'facility_rows': [(facility, readiness.get(facility.id)) for facility in facilities],
+    })
+
+def facility_overview(request):
+    """法人全体の事業所ごとのキャリアパス要件整備状況"""
+    facilities = list(Facility.objects.select_related('provider').order_by('provider__name', 'name'))
+    readiness = get_facility_readiness(facilities)
+    rows = [(facility, readiness.get(facility.id)) for facility in facilities]
+    return render(request, 'career_management/facility_overview.html', {
+        'rows': rows,
+        'ready_count': sum(1 for _, status in rows if status and status.is_ready),
     })
 
 def wage_table_builder(request, facility_id):
-    facility = get_object_or_404(Facility, id=facility_id)
+    facility = wage_builder_facility(facility_id)
     generator = WageTableGenerator(facility)
-    positions = Position.objects.filter(facility=facility).order_by('job_category', 'level')
-    
-    suggestions = {}
-    for position in positions:
-        suggestions[position.id] = generator.generate_optimized_wage_table(position)
 
     if request.method == 'POST':
+        if request.POST.get('action') == 'apply_all':
+            # 全職位の一括保存はワーカーで行い、状態確認画面へ移動する
+            job = enqueue(
+                'career_management.apply_wage_suggestions',
+                facility_id=facility.id, overwrite=request.POST.get('overwrite') == 'on',
+            )
+            return redirect('job_status', token=job.token)
+
         position_id = request.POST.get('position_id')
-        position = get_object_or_404(Position, id=position_id)
-        wage_data = suggestions[position.id]
+        position = get_object_or_404(Position, id=position_id, facility=facility)
+        wage_data = generator.generate_optimized_wage_table(position)
         WageTable.objects.update_or_create(position=position, defaults=wage_data)
         messages.success(request, f"「{position.position_name}」の賃金テーブルを保存しました。")
         return redirect('wage_table_builder', facility_id=facility_id)
 
-    max_steps = 30
-    for p in positions:
-        if hasattr(p, 'wage_table') and p.wage_table.max_steps > max_steps:
-            max_steps = p.wage_table.max_steps
-        suggestion = suggestions.get(p.id, {})
-        if suggestion.get('max_steps', 0) > max_steps:
-            max_steps = suggestion['max_steps']
-    
-    positions_data = []
-    for p in positions:
-        is_saved = hasattr(p, 'wage_table')
-        suggestion = suggestions[p.id]
-        salary_by_step = {}
-        if is_saved:
-            for step in range(1, p.wage_table.max_steps + 1):
-                salary_by_step[step] = p.wage_table.get_salary_for_step(step)
-        else:
-            for step in range(1, suggestion['max_steps'] + 1):
-                salary_by_step[step] = suggestion['base_salary_start'] + (suggestion['step_raise_amount'] * (step - 1))
-        
-        positions_data.append({'position': p, 'suggestion': suggestion, 'is_saved': is_saved, 'salary_by_step': salary_by_step})
-    
+    grid_key = wage_builder_grid_key(facility)
+    grid = wage_builder_grid(facility, generator, grid_key)
+
     return render(request, 'career_management/wage_table_builder.html', {
         'facility': facility,
-        'positions_data': positions_data,
-        'max_steps_range': range(1, max_steps + 1),
+        'grid': grid,
+        'grid_key': grid_key,
     })
 
-def staff_list(request, facility_id):
-    facility = get_object_or_404(Facility, id=facility_id)
-    staff_members = StaffMember.objects.filter(facility=facility, is_active=True)
+async def staff_list(request, facility_id):
+    facility = await aget_object_or_404(Facility, id=facility_id)
+    # 非同期ビューでは描画中に遅延読み込みできないため、リストにしてから渡す
+    staff_members = [staff async for staff in staff_list_members(facility)]
     return render(request, 'career_management/staff_list.html', {'facility': facility, 'staff_members': staff_members})
 
 def promotion_candidates(request, facility_id):
     facility = get_object_or_404(Facility, id=facility_id)
-    return render(request, 'career_management/promotion_candidates.html', {'facility': facility, 'candidates': []})
+    candidates = PromotionEligibilityEngine(facility).evaluate()
+    return render(request, 'career_management/promotion_candidates.html', {'facility': facility, 'candidates': candidates})
 
 def staff_detail(request, staff_id):
     staff = get_object_or_404(StaffMember, id=staff_id)
@@ -94,24 +105,15 @@ def career_path_requirements_index(request, facility_id):
     """キャリアパス要件設計のメインメニュー"""
     facility = get_object_or_404(Facility, id=facility_id)
     
-    # 各要件の設計状況をチェック
-    requirement_one_count = CareerPathRequirementOne.objects.filter(
-        facility=facility
-    ).count()
-    
-    has_salary_system = SalaryIncreaseSystem.objects.filter(
-        facility=facility
-    ).exists()
-    
-    training_plan_count = TrainingPlan.objects.filter(
-        facility=facility
-    ).count()
+    # 各要件の設計状況（事業所ごとにキャッシュされた集計値）
+    readiness = get_facility_readiness([facility])[facility.id]
     
     context = {
         'facility': facility,
-        'requirement_one_count': requirement_one_count,
-        'has_salary_system': has_salary_system,
-        'training_plan_count': training_plan_count,
+        'readiness': readiness,
+        'requirement_one_count': readiness.requirement_one_count,
+        'has_salary_system': readiness.has_salary_system,
+        'training_plan_count': readiness.training_plan_count,
     }
     
     return render(
@@ -125,16 +127,13 @@ def career_path_requirements_index(request, facility_id):
 # キャリアパス要件Ⅰ：任用要件と賃金体系
 # ================================================================
 
-def requirement_one_list(request, facility_id):
+async def requirement_one_list(request, facility_id):
     """要件Ⅰの一覧・設計画面"""
-    facility = get_object_or_404(Facility, id=facility_id)
-    positions = Position.objects.filter(facility=facility).order_by(
-        'job_category', 'level'
-    )
+    facility = await aget_object_or_404(Facility, id=facility_id)
     
-    # 各職位の要件設定状況をチェック
+    # 各職位の要件設定状況をチェック（要件Ⅰは同じクエリで取得済み）
     positions_data = []
-    for position in positions:
+    async for position in requirement_one_positions(facility):
         try:
             requirement = position.requirement_one
             has_requirement = True
@@ -287,17 +286,15 @@ def promotion_criteria_list(request, facility_id):
 # キャリアパス要件Ⅱ：研修計画
 # ================================================================
 
-def requirement_two_list(request, facility_id):
+async def requirement_two_list(request, facility_id):
     """要件Ⅱ（研修計画）の一覧画面"""
-    facility = get_object_or_404(Facility, id=facility_id)
+    facility = await aget_object_or_404(Facility, id=facility_id)
     
     # 年度ごとにグループ化
     import datetime
     current_year = datetime.datetime.now().year
     
-    training_plans = TrainingPlan.objects.filter(
-        facility=facility
-    ).order_by('-fiscal_year', 'scheduled_date')
+    training_plans = [plan async for plan in requirement_two_plans(facility)]
     
     context = {
         'facility': facility,
@@ -362,3 +359,46 @@ def training_plan_edit(request, facility_id, plan_id=None):
         context
     )
 
+
+# ================================================================
+# 提出用の出力（号級賃金表・要件Ⅰ・昇給制度の CSV・XLSX）
+# ================================================================
+
+def _check_export_params(kind, fmt):
+    """出力の種類と形式を確認する（全種類まとめての出力は XLSX のみ）"""
+    if fmt not in FORMATS or not (kind in EXPORT_KINDS or (kind == 'all' and fmt == 'xlsx')):
+        raise Http404('指定された出力形式はありません')
+
+
+def facility_export(request, facility_id, kind, fmt):
+    """事業所の出力をストリーミングで返す"""
+    _check_export_params(kind, fmt)
+    facility = get_object_or_404(Facility, id=facility_id)
+    chunks = export_chunks(kind, fmt, export_facilities(facility_id=facility.id))
+    return streaming_response(request, chunks, FORMATS[fmt], export_filename(kind, fmt, facility=facility))
+
+
+def provider_export(request, provider_id, kind, fmt):
+    """法人全体の出力（事業所数が多い場合はワーカーで生成し、状態確認画面へ移動する）"""
+    _check_export_params(kind, fmt)
+    provider = get_object_or_404(Provider, id=provider_id)
+    facilities = export_facilities(provider_id=provider.id)
+    if needs_background(facilities):
+        job = enqueue('career_management.export', kind=kind, fmt=fmt, provider_id=provider.id)
+        return redirect('job_status', token=job.token)
+    chunks = export_chunks(kind, fmt, facilities)
+    return streaming_response(request, chunks, FORMATS[fmt], export_filename(kind, fmt, provider_id=provider.id))
+
+
+def export_download(request, token):
+    """ワーカーで生成した出力ファイルのダウンロード"""
+    job = get_object_or_404(Job, token=token, name='career_management.export')
+    if job.status != 'succeeded':
+        raise Http404('出力ファイルがありません')
+    fmt = job.result['format']
+    path = export_path(job.token, fmt)
+    if not path.exists():
+        raise Http404('出力ファイルがありません')
+    return FileResponse(
+        open(path, 'rb'), as_attachment=True, filename=job.result['filename'], content_type=FORMATS[fmt],
+    )
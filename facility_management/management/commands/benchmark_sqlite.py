@@ -0,0 +1,115 @@
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from shogu_kaizen_system.sqlite_tuning import apply_pragmas
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = 'SQLite の性能設定（WAL 等）の有無で、同時アクセス時のロックエラー率と応答時間を比較します'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='同時に実行するスレッド数')
+        parser.add_argument('--operations', type=int, default=200, help='1スレッドあたりの操作回数')
+        parser.add_argument('--write-ratio', type=float, default=0.2, help='書き込み操作の割合')
+        parser.add_argument('--timeout', type=float, default=5.0, help='通常設定での接続タイムアウト（秒）')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            for tuned in (False, True):
+                path = os.path.join(directory, f'bench_{int(tuned)}.sqlite3')
+                self._prepare(path)
+                result = self._run(path, tuned, options)
+                label = '性能設定あり' if tuned else '通常設定'
+                self.stdout.write(
+                    f'{label}: 操作 {result["operations"]}件 / ロックエラー {result["locked"]}件'
+                    f'（{result["locked_rate"]:.2%}） / p50 {result["p50"]:.1f}ms / p95 {result["p95"]:.1f}ms'
+                    f' / {result["throughput"]:.0f}件/秒'
+                )
+
+    def _prepare(self, path):
+        """職員一覧に近い表を作って初期データを入れる"""
+        conn = sqlite3.connect(path)
+        conn.execute('CREATE TABLE staff (id INTEGER PRIMARY KEY, facility_id INTEGER, name TEXT, salary INTEGER)')
+        conn.execute('CREATE INDEX staff_facility ON staff (facility_id)')
+        conn.executemany(
+            'INSERT INTO staff (facility_id, name, salary) VALUES (?, ?, ?)',
+            [(i % 20, f'職員{i}', 200000 + i) for i in range(5000)],
+        )
+        conn.commit()
+        conn.close()
+
+    def _connect(self, path, tuned, timeout):
+        # 自動トランザクションを切り、BEGIN を明示する（Django の接続と同じ扱い）
+        conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        if tuned:
+            apply_pragmas(conn.cursor())
+        return conn
+
+    def _run(self, path, tuned, options):
+        latencies = []
+        locked = [0]
+        lock = threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            conn = self._connect(path, tuned, options['timeout'])
+            local_latencies = []
+            local_locked = 0
+            for _ in range(options['operations']):
+                facility_id = rng.randrange(20)
+                started = time.perf_counter()
+                try:
+                    if rng.random() < options['write_ratio']:
+                        # 読んでから書く（管理画面・ウィザードの保存と同じ流れ）
+                        # 性能設定ありでは transaction_mode=IMMEDIATE と同様に開始時にロックを取る
+                        conn.execute('BEGIN IMMEDIATE' if tuned else 'BEGIN')
+                        conn.execute('SELECT MAX(salary) FROM staff WHERE facility_id = ?', (facility_id,)).fetchone()
+                        conn.execute('UPDATE staff SET salary = salary + 1 WHERE facility_id = ?', (facility_id,))
+                        conn.execute('COMMIT')
+                    else:
+                        conn.execute(
+                            'SELECT COUNT(*), AVG(salary) FROM staff WHERE facility_id = ?', (facility_id,)
+                        ).fetchone()
+                except sqlite3.OperationalError as e:
+                    if 'locked' not in str(e) and 'busy' not in str(e):
+                        raise
+                    local_locked += 1
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK')
+                local_latencies.append((time.perf_counter() - started) * 1000)
+            conn.close()
+            with lock:
+                latencies.extend(local_latencies)
+                locked[0] += local_locked
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(options['workers'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        operations = len(latencies)
+        return {
+            'operations': operations,
+            'locked': locked[0],
+            'locked_rate': locked[0] / operations if operations else 0,
+            'p50': statistics.median(latencies) if latencies else 0.0,
+            'p95': _percentile(latencies, 95),
+            'throughput': operations / elapsed if elapsed else 0,
+        }
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from facility_management.services.sample_data import available_datasets, load_sample_dataset
+
+
+class Command(BaseCommand):
+    help = 'サンプルデータ（事業所・職位・賃金テーブル・職員・要件等）を自然キーで一括登録・更新します'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'datasets', nargs='*', choices=available_datasets(), default=['sakura'],
+            help='投入するデータセット（facility_management/seed_data/ のファイル名）',
+        )
+
+    def handle(self, *args, **options):
+        for name in options['datasets']:
+            counts = load_sample_dataset(name)
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: ' + ' / '.join(f'{label} {count}件' for label, count in counts.items())
+            ))
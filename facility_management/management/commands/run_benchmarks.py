@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from facility_management.services.benchmarks import DEFAULT_TOLERANCE, compare, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = '主要な画面・サービスの処理時間と SQL 件数を測定し、JSON に保存・ベースラインと比較します'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='各ベンチマークの実行回数')
+        parser.add_argument('--only', action='append', help='名前にこの文字列を含むベンチマークだけ実行（複数指定可）')
+        parser.add_argument('--output', help='結果を保存する JSON ファイル')
+        parser.add_argument('--baseline', help='比較するベースラインの JSON ファイル')
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help='劣化とみなす処理時間の増加率（0.2 = 20%%）')
+        parser.add_argument('--fail-on-regression', action='store_true', help='劣化があれば異常終了する')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat は1以上を指定してください')
+        try:
+            report = run_benchmarks(
+                repeat=options['repeat'], only=options['only'], progress=self._print_result
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f'結果を保存しました: {options["output"]}')
+
+        if not options['baseline']:
+            return
+        with open(options['baseline'], encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, tolerance=options['tolerance'])
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('ベースラインからの劣化はありません'))
+            return
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(
+                f'{regression.name} {regression.metric}: {regression.baseline:g} → {regression.current:g}'
+                f'（×{regression.ratio:.2f}）'
+            ))
+        if options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)}件の劣化があります')
+
+    def _print_result(self, result):
+        self.stdout.write(
+            f'{result.name:<36} 中央値 {result.median_ms:8.1f}ms / p95 {result.p95_ms:8.1f}ms'
+            f' / 最小 {result.min_ms:8.1f}ms / SQL {result.queries}件'
+        )
@@ -0,0 +1,38 @@
+from dataclasses import replace
+
+from django.core.management.base import BaseCommand, CommandError
+
+from facility_management.services.benchmark_data import PRESETS, clear_dataset, seed_dataset
+
+
+class Command(BaseCommand):
+    help = '性能測定用の大規模データ（事業者・事業所・職員・計画書）を生成します'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=sorted(PRESETS), default='small', help='生成する件数のプリセット')
+        parser.add_argument('--providers', type=int, help='事業者数（プリセットを上書き）')
+        parser.add_argument('--facilities', type=int, help='事業所数（プリセットを上書き）')
+        parser.add_argument('--staff', type=int, help='職員数（プリセットを上書き）')
+        parser.add_argument('--plans', type=int, help='計画書数（プリセットを上書き）')
+        parser.add_argument('--seed', type=int, default=0, help='乱数の種（同じ値なら同じデータになる）')
+        parser.add_argument('--reset', action='store_true', help='生成済みのデータを削除してから生成する')
+        parser.add_argument('--clear', action='store_true', help='生成済みのデータを削除して終了する')
+
+    def handle(self, *args, **options):
+        if options['reset'] or options['clear']:
+            deleted = clear_dataset()
+            self.stdout.write(f'生成済みのデータを削除しました（{deleted}件）')
+            if options['clear']:
+                return
+
+        overrides = {
+            key: options[key] for key in ('providers', 'facilities', 'staff', 'plans') if options[key] is not None
+        }
+        spec = replace(PRESETS[options['preset']], **overrides)
+        try:
+            created = seed_dataset(spec, seed=options['seed'], progress=self.stdout.write)
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            '生成しました: ' + ' / '.join(f'{key} {value}件' for key, value in created.items())
+        ))
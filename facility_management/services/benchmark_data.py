@@ -0,0 +1,245 @@
+"""
+性能測定用の大規模データ生成
+
+事業者名・事業所番号・職員番号に接頭辞を付けて作成し、clear_dataset() で一括削除できる。
+件数が多いため bulk_create で登録し、シグナルで行っている索引・号級行・取り組み数の更新は
+まとめて明示的に実行する。
+"""
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from career_management.models import (
+    JobCategory, Position, WageTable, StaffMember, StaffEvaluation, PromotionCriteria,
+    CareerPathRequirementOne, SalaryIncreaseSystem, TrainingPlan,
+)
+from career_management.services.facility_readiness import invalidate_facility_readiness
+from career_management.services.qualification_index import sync_staff_qualifications
+from career_management.services.wage_grid import invalidate_wage_grid
+from career_management.services.wage_steps import refresh_wage_steps
+from plans.models import ImprovementPlan, WorkplaceInitiative
+from plans.services.plan_recompute import recompute_plans
+from shogu_kaizen_system.master_cache import bump_version
+from ..models import Provider, Facility
+
+PROVIDER_PREFIX = 'ベンチマーク法人'
+FACILITY_NUMBER_PREFIX = 'BM'
+STAFF_ID_PREFIX = 'BM'
+INITIATIVE_PREFIX = 'BM'
+
+# 事業所ごとの職位の階層数
+POSITION_LEVELS = 4
+# 1事業所あたりの研修計画数
+TRAINING_PLANS_PER_FACILITY = 3
+CHUNK_SIZE = 2000
+
+QUALIFICATION_POOL = ['介護福祉士', '実務者研修修了者', '初任者研修修了者', '介護支援専門員', '社会福祉士']
+ADDRESSES = ['東京都千代田区1-1', '大阪府大阪市北区1-1', '愛知県名古屋市中区1-1', '福岡県福岡市博多区1-1']
+
+
+@dataclass
+class DatasetSpec:
+    """生成するデータの件数"""
+    providers: int
+    facilities: int
+    staff: int
+    plans: int
+
+
+PRESETS = {
+    'tiny': DatasetSpec(providers=1, facilities=3, staff=60, plans=10),
+    'small': DatasetSpec(providers=2, facilities=20, staff=2000, plans=200),
+    'medium': DatasetSpec(providers=5, facilities=100, staff=10000, plans=1000),
+    'large': DatasetSpec(providers=10, facilities=500, staff=50000, plans=5000),
+}
+
+
+def dataset_facilities():
+    """生成したデータの事業所"""
+    return Facility.objects.filter(provider__name__startswith=PROVIDER_PREFIX)
+
+
+def dataset_plans():
+    """生成したデータの計画書"""
+    return ImprovementPlan.objects.filter(provider__name__startswith=PROVIDER_PREFIX)
+
+
+def invalidate_dataset_caches(facility_ids):
+    """
+    生成したデータに関わるキャッシュだけを破棄する。
+    キャッシュは他の事業者と共有しているため、cache.clear() は使わない。
+    """
+    bump_version('providers', 'facilities', 'workplace_initiatives')
+    invalidate_facility_readiness(*facility_ids)
+    invalidate_wage_grid(*facility_ids)
+
+
+def clear_dataset():
+    """生成したデータを削除する（事業者から連鎖削除）"""
+    facility_ids = list(dataset_facilities().values_list('id', flat=True))
+    deleted = Provider.objects.filter(name__startswith=PROVIDER_PREFIX).delete()[0]
+    WorkplaceInitiative.objects.filter(item_number__startswith=INITIATIVE_PREFIX).delete()
+    invalidate_dataset_caches(facility_ids)
+    return deleted
+
+
+def _initiatives():
+    """職場環境等要件の項目（未登録の環境では区分ごとに8件作成する）"""
+    initiatives = list(WorkplaceInitiative.objects.all())
+    if not initiatives:
+        initiatives = WorkplaceInitiative.objects.bulk_create([
+            WorkplaceInitiative(category=category, item_number=f'{INITIATIVE_PREFIX}{i}-{n}', description=f'{label}の取り組み{n}')
+            for i, (category, label) in enumerate(WorkplaceInitiative.CATEGORY_CHOICES, start=1)
+            for n in range(1, 9)
+        ])
+    return initiatives
+
+
+def seed_dataset(spec, seed=0, progress=None):
+    """指定件数のデータを生成し、作成件数を返す（生成済みのデータがある場合は ValueError）"""
+    if dataset_facilities().exists():
+        # 事業所番号などが重複するため、追加生成はせず削除してからの再生成を求める
+        raise ValueError('生成済みのデータがあります。--reset を指定して削除してから生成してください')
+    rng = random.Random(seed)
+    today = date.today()
+    report = progress or (lambda message: None)
+    care, _ = JobCategory.objects.get_or_create(category_code='care', defaults={'category_name': '介護職員'})
+
+    with transaction.atomic():
+        providers = Provider.objects.bulk_create([
+            Provider(name=f'{PROVIDER_PREFIX}{i + 1}', address=ADDRESSES[i % len(ADDRESSES)])
+            for i in range(spec.providers)
+        ])
+        facilities = Facility.objects.bulk_create([
+            Facility(
+                provider=providers[i % len(providers)],
+                name=f'ベンチマーク事業所{i + 1}',
+                service_type='day_service',
+                facility_number=f'{FACILITY_NUMBER_PREFIX}{i + 1:08d}',
+                address=providers[i % len(providers)].address,
+            )
+            for i in range(spec.facilities)
+        ], batch_size=CHUNK_SIZE)
+        report(f'事業者 {len(providers)}件 / 事業所 {len(facilities)}件')
+
+        positions = Position.objects.bulk_create([
+            Position(facility=facility, job_category=care, position_name=f'介護職{level}級', level=level,
+                     required_qualifications=QUALIFICATION_POOL[0] if level >= 3 else '')
+            for facility in facilities
+            for level in range(1, POSITION_LEVELS + 1)
+        ], batch_size=CHUNK_SIZE)
+        positions_by_facility = {}
+        for position in positions:
+            positions_by_facility.setdefault(position.facility_id, []).append(position)
+
+        # 半数の職位だけ賃金テーブルを保存済みにする
+        wage_tables = WageTable.objects.bulk_create([
+            WageTable(position=position, base_salary_start=180000 + position.level * 20000, step_raise_amount=2000,
+                      max_steps=30)
+            for position in positions if position.level % 2
+        ], batch_size=CHUNK_SIZE)
+        refresh_wage_steps(wage_tables)
+        CareerPathRequirementOne.objects.bulk_create([
+            CareerPathRequirementOne(
+                facility_id=position.facility_id, position=position, required_experience_years=position.level - 1,
+                job_description='-', responsibilities='-',
+                base_salary_min=180000 + position.level * 20000, base_salary_max=240000 + position.level * 20000,
+            )
+            for position in positions
+        ], batch_size=CHUNK_SIZE)
+        PromotionCriteria.objects.bulk_create([
+            PromotionCriteria(
+                facility_id=facility_id, from_position=levels[i], to_position=levels[i + 1],
+                required_experience_years=i + 1, required_qualifications=levels[i + 1].required_qualifications,
+                review_process='面接',
+            )
+            for facility_id, levels in positions_by_facility.items()
+            for i in range(len(levels) - 1)
+        ], batch_size=CHUNK_SIZE)
+        SalaryIncreaseSystem.objects.bulk_create([
+            SalaryIncreaseSystem(facility=facility) for facility in facilities[::2]
+        ], batch_size=CHUNK_SIZE)
+        training_plans = TrainingPlan.objects.bulk_create([
+            TrainingPlan(
+                facility=facility, fiscal_year=today.year - n, training_name=f'研修{n + 1}', description='-',
+                objectives='-', training_type='OJT', scheduled_date=today - timedelta(days=365 * n),
+            )
+            for facility in facilities
+            for n in range(TRAINING_PLANS_PER_FACILITY)
+        ], batch_size=CHUNK_SIZE)
+        through = TrainingPlan.target_positions.through
+        through.objects.bulk_create([
+            through(trainingplan_id=plan.id, position_id=position.id)
+            for plan in training_plans
+            for position in positions_by_facility[plan.facility_id]
+        ], batch_size=CHUNK_SIZE)
+        report(f'職位 {len(positions)}件 / 賃金テーブル {len(wage_tables)}件 / 研修計画 {len(training_plans)}件')
+
+    staff_count = 0
+    for start in range(0, spec.staff, CHUNK_SIZE):
+        with transaction.atomic():
+            staff_members = StaffMember.objects.bulk_create([
+                StaffMember(
+                    facility=facility,
+                    staff_id=f'{STAFF_ID_PREFIX}{number + 1:08d}',
+                    name=f'職員{number + 1}',
+                    employment_status='full_time' if number % 3 else 'part_time',
+                    hire_date=today - timedelta(days=rng.randrange(30, 365 * 15)),
+                    current_position=rng.choice(positions_by_facility[facility.id]),
+                    current_base_salary=rng.randrange(180000, 320000, 1000),
+                    qualifications='\n'.join(rng.sample(QUALIFICATION_POOL, rng.randrange(0, 3))),
+                    is_active=number % 20 != 0,
+                )
+                for number in range(start, min(start + CHUNK_SIZE, spec.staff))
+                for facility in [facilities[number % len(facilities)]]
+            ])
+            sync_staff_qualifications(staff_members)
+            StaffEvaluation.objects.bulk_create([
+                StaffEvaluation(
+                    staff_member=staff, evaluation_period=f'{today.year}年上期', evaluation_date=today,
+                    overall_score=rng.randrange(20, 50) / 10, evaluator_name='評価者',
+                )
+                for staff in staff_members[::2]
+            ])
+        staff_count += len(staff_members)
+        report(f'職員 {staff_count}/{spec.staff}件')
+
+    initiatives = _initiatives()
+    facilities_by_provider = {}
+    for facility in facilities:
+        facilities_by_provider.setdefault(facility.provider_id, []).append(facility)
+    with transaction.atomic():
+        plans = ImprovementPlan.objects.bulk_create([
+            ImprovementPlan(
+                provider=providers[i % len(providers)],
+                fiscal_year=today.year - i % 5,
+                target_addition_tier=rng.choice(['I', 'II', 'III', 'IV']),
+                meets_career_path_1=rng.random() < 0.9,
+                meets_career_path_2=rng.random() < 0.8,
+                meets_career_path_3=rng.random() < 0.6,
+                total_service_units=rng.randrange(100000, 3000000, 1000),
+            )
+            for i in range(spec.plans)
+        ], batch_size=CHUNK_SIZE)
+        facility_through = ImprovementPlan.target_facilities.through
+        initiative_through = ImprovementPlan.workplace_initiatives.through
+        facility_rows = []
+        initiative_rows = []
+        for plan in plans:
+            candidates = facilities_by_provider[plan.provider_id]
+            for facility in rng.sample(candidates, min(len(candidates), rng.randrange(1, 4))):
+                facility_rows.append(facility_through(improvementplan_id=plan.id, facility_id=facility.id))
+            for initiative in rng.sample(initiatives, min(len(initiatives), rng.randrange(3, 9))):
+                initiative_rows.append(
+                    initiative_through(improvementplan_id=plan.id, workplaceinitiative_id=initiative.id)
+                )
+        facility_through.objects.bulk_create(facility_rows, batch_size=CHUNK_SIZE)
+        initiative_through.objects.bulk_create(initiative_rows, batch_size=CHUNK_SIZE)
+    recompute_plans(dataset_plans())
+    report(f'計画書 {len(plans)}件')
+
+    # bulk_create ではキャッシュ破棄のシグナルが発火しないためまとめて破棄する
+    invalidate_dataset_caches(dataset_facilities().values_list('id', flat=True))
+    return {**asdict(spec), 'staff': staff_count, 'positions': len(positions)}
@@ -0,0 +1,179 @@
+"""
+主要な画面・サービスの性能測定
+
+各ベンチマークを指定回数実行して処理時間（中央値・p95・最小）と SQL 件数を記録し、
+JSON として保存する。保存済みの結果（ベースライン）と比較して性能の劣化を検出できる。
+測定対象は seed_benchmark_data で生成したデータに限り、実データの計画書を書き換えない。
+キャッシュの効果で結果がぶれないよう、各回の実行前に生成データに関わるキャッシュだけを破棄する。
+"""
+import platform
+import statistics
+import time
+from dataclasses import asdict, dataclass
+
+import django
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from career_management.services.facility_readiness import get_facility_readiness
+from career_management.services.promotion_engine import PromotionEligibilityEngine
+from career_management.services.query_plans import wage_builder_grid, wage_builder_grid_key
+from career_management.services.wage_table_generator import WageTableGenerator
+from plans.services.plan_recompute import recompute_plans
+from plans.services.tier_simulator import Scenario, TierSimulator
+from .benchmark_data import dataset_facilities, dataset_plans, invalidate_dataset_caches
+
+# 比較時に劣化とみなす増加率の既定値
+DEFAULT_TOLERANCE = 0.2
+# これより短い処理は誤差が大きいため、増加率だけでは劣化と判定しない（ms）
+NOISE_FLOOR_MS = 5.0
+
+
+@dataclass
+class BenchmarkResult:
+    """1ベンチマーク分の測定結果"""
+    name: str
+    repeat: int
+    median_ms: float
+    p95_ms: float
+    min_ms: float
+    queries: int
+
+
+@dataclass
+class Regression:
+    """ベースラインからの劣化"""
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self):
+        return self.current / self.baseline if self.baseline else float('inf')
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def _target_facility():
+    """生成データのうち職員数が最も多い事業所（測定対象）"""
+    return dataset_facilities().select_related('provider').annotate(
+        member_count=Count('staff_members')
+    ).order_by('-member_count', 'id').first()
+
+
+def _view_benchmarks(facility):
+    client = Client()
+    pages = {
+        'view:plan_list': reverse('plan_list'),
+        'view:facility_overview': reverse('facility_overview'),
+        'view:staff_list': reverse('staff_list', args=[facility.id]),
+        'view:promotion_candidates': reverse('promotion_candidates', args=[facility.id]),
+        'view:wage_table_builder': reverse('wage_table_builder', args=[facility.id]),
+        'view:requirement_one_list': reverse('requirement_one_list', args=[facility.id]),
+        'view:requirement_two_list': reverse('requirement_two_list', args=[facility.id]),
+    }
+
+    def get(url):
+        def run():
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f'{url} が {response.status_code} を返しました')
+        return run
+    return {name: get(url) for name, url in pages.items()}
+
+
+def _service_benchmarks(facility):
+    facilities = list(dataset_facilities().values_list('id', flat=True))
+    scenarios = [Scenario(name='要件I・IIを満たす', career_path={1: True, 2: True})]
+
+    def wage_grid():
+        wage_builder_grid(facility, WageTableGenerator(facility), wage_builder_grid_key(facility))
+
+    return {
+        'service:promotion_eligibility': lambda: PromotionEligibilityEngine(facility).evaluate(),
+        'service:facility_readiness': lambda: get_facility_readiness(facilities),
+        'service:tier_simulator': lambda: TierSimulator(dataset_plans()).run(scenarios),
+        'service:recompute_plans': lambda: recompute_plans(dataset_plans()),
+        'service:wage_builder_grid': wage_grid,
+    }
+
+
+def available_benchmarks(facility=None):
+    """ベンチマーク名 → 実行する関数"""
+    facility = facility or _target_facility()
+    if facility is None:
+        raise ValueError('測定用のデータがありません。先に seed_benchmark_data を実行してください')
+    return {**_view_benchmarks(facility), **_service_benchmarks(facility)}
+
+
+def measure(name, func, repeat, reset=None):
+    """func を repeat 回実行して測定する（SQL 件数は1回目の値）。reset は各回の実行前に呼ぶ"""
+    durations = []
+    queries = 0
+    for i in range(repeat):
+        if reset:
+            reset()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            func()
+            durations.append((time.perf_counter() - started) * 1000)
+        if i == 0:
+            queries = len(captured)
+    return BenchmarkResult(
+        name=name,
+        repeat=repeat,
+        median_ms=statistics.median(durations),
+        p95_ms=_percentile(durations, 95),
+        min_ms=min(durations),
+        queries=queries,
+    )
+
+
+def run_benchmarks(repeat=5, only=None, progress=None):
+    """ベンチマークを実行し、JSON に保存できる辞書を返す"""
+    benchmarks = available_benchmarks()
+    if only:
+        benchmarks = {name: func for name, func in benchmarks.items() if any(key in name for key in only)}
+    facility_ids = list(dataset_facilities().values_list('id', flat=True))
+    results = []
+    for name, func in benchmarks.items():
+        result = measure(name, func, repeat, reset=lambda: invalidate_dataset_caches(facility_ids))
+        if progress:
+            progress(result)
+        results.append(asdict(result))
+    return {
+        'meta': {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': repeat,
+            'facilities': len(facility_ids),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE, noise_floor_ms=NOISE_FLOOR_MS):
+    """ベースラインと比較し、処理時間の中央値または SQL 件数が増えたベンチマークを返す"""
+    baseline_results = {result['name']: result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        before = baseline_results.get(result['name'])
+        if before is None:
+            continue
+        if (result['median_ms'] > before['median_ms'] * (1 + tolerance)
+                and result['median_ms'] - before['median_ms'] > noise_floor_ms):
+            regressions.append(Regression(result['name'], 'median_ms', before['median_ms'], result['median_ms']))
+        # SQL 件数はデータ量に依存しないはずなので、1件でも増えたら劣化とみなす
+        if result['queries'] > before['queries']:
+            regressions.append(Regression(result['name'], 'queries', before['queries'], result['queries']))
+    return regressions
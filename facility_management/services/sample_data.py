@@ -0,0 +1,153 @@
+"""
+サンプルデータの投入
+
+seed_data/<名前>.json の事業者・事業所・職位・職員・要件等を、自然キー（事業所番号・職種コード・
+職員番号など）で一括登録・更新する。1データセットを1トランザクションで投入し、何度実行しても
+同じ状態になる。bulk 操作ではシグナルが発火しないため、保有資格の索引・号級行・取り組み数・
+キャッシュはまとめて更新する。
+"""
+import json
+from pathlib import Path
+
+from django.db import transaction
+
+from career_management.models import (
+    JobCategory, Position, WageTable, StaffMember,
+    CareerPathRequirementOne, SalaryIncreaseSystem, TrainingPlan,
+)
+from career_management.services.facility_readiness import invalidate_facility_readiness
+from career_management.services.qualification_index import sync_staff_qualifications
+from career_management.services.wage_grid import invalidate_wage_grid
+from career_management.services.wage_steps import refresh_wage_steps
+from plans.models import ImprovementPlan, WorkplaceInitiative
+from plans.services.plan_recompute import refresh_initiative_counts
+from shogu_kaizen_system.bulk_upsert import bulk_upsert
+from shogu_kaizen_system.master_cache import bump_version
+from ..models import Provider, Facility
+
+SEED_DIR = Path(__file__).resolve().parent.parent / 'seed_data'
+
+
+def available_datasets():
+    """投入できるデータセット名"""
+    return sorted(path.stem for path in SEED_DIR.glob('*.json'))
+
+
+def _upsert(model, rows, unique_fields, **fixed):
+    """行（フィールド名 → 値）を自然キーで登録・更新する。更新するのはデータセットに含まれる列だけ"""
+    rows = [{**fixed, **row} for row in rows]
+    if not rows:
+        return {}
+    update_fields = sorted({key for row in rows for key in row} - set(unique_fields))
+    return bulk_upsert(model, [model(**row) for row in rows], unique_fields, update_fields=update_fields)
+
+
+def _replace_m2m(through, owner_field, owner_ids, rows):
+    """中間テーブルの対象行を入れ替える（.set() の一括版）"""
+    through.objects.filter(**{f'{owner_field}__in': owner_ids}).delete()
+    through.objects.bulk_create(rows)
+
+
+def load_sample_dataset(name):
+    """データセットを投入し、種類ごとの件数を返す"""
+    with open(SEED_DIR / f'{name}.json', encoding='utf-8') as f:
+        data = json.load(f)
+
+    with transaction.atomic():
+        counts = _load(data)
+        facility_id = counts.pop('facility_id')
+
+    # 保存時のシグナルで行っているキャッシュの破棄をまとめて行う
+    bump_version('providers', 'facilities')
+    invalidate_facility_readiness(facility_id)
+    invalidate_wage_grid(facility_id)
+    return counts
+
+
+def _with_position(rows, positions, field):
+    """行の 'position'（職位名）を職位インスタンスに置き換える"""
+    return [{**{key: value for key, value in row.items() if key != 'position'}, field: positions[row['position']]}
+            for row in rows]
+
+
+def _load(data):
+    provider = _upsert(Provider, [data['provider']], ['name'])[(data['provider']['name'],)]
+    facility = _upsert(
+        Facility, [data['facility']], ['facility_number'], provider=provider
+    )[(data['facility']['facility_number'],)]
+
+    job_categories = _upsert(JobCategory, data.get('job_categories', []), ['category_code'])
+    category_by_code = {code: category for (code,), category in job_categories.items()}
+
+    position_rows = []
+    wage_rows = {}
+    for row in data.get('positions', []):
+        row = dict(row)
+        wage = row.pop('wage_table', None)
+        row['job_category'] = category_by_code[row['job_category']]
+        if wage:
+            wage_rows[row['position_name']] = wage
+        position_rows.append(row)
+    positions = _upsert(Position, position_rows, ['facility', 'job_category', 'level'], facility=facility)
+    position_by_name = {position.position_name: position for position in positions.values()}
+
+    wage_tables = _upsert(WageTable, [
+        {**wage, 'position': position_by_name[name]} for name, wage in wage_rows.items()
+    ], ['position'])
+    refresh_wage_steps(wage_tables.values())
+
+    staff = _upsert(
+        StaffMember, _with_position(data.get('staff', []), position_by_name, 'current_position'), ['staff_id'],
+        facility=facility,
+    )
+    sync_staff_qualifications(staff.values())
+
+    requirements = _upsert(
+        CareerPathRequirementOne, _with_position(data.get('requirement_one', []), position_by_name, 'position'),
+        ['position'], facility=facility,
+    )
+
+    training_rows = [dict(row) for row in data.get('training_plans', [])]
+    targets = {row['training_name']: row.pop('target_positions', []) for row in training_rows}
+    training_plans = _upsert(
+        TrainingPlan, training_rows, ['facility', 'fiscal_year', 'training_name'], facility=facility
+    )
+    through = TrainingPlan.target_positions.through
+    _replace_m2m(through, 'trainingplan_id', [plan.pk for plan in training_plans.values()], [
+        through(trainingplan_id=plan.pk, position_id=position_by_name[name].pk)
+        for plan in training_plans.values()
+        for name in targets.get(plan.training_name, [])
+    ])
+
+    if 'salary_increase_system' in data:
+        _upsert(SalaryIncreaseSystem, [data['salary_increase_system']], ['facility'], facility=facility)
+
+    plans = {}
+    if 'improvement_plan' in data:
+        row = dict(data['improvement_plan'])
+        item_numbers = row.pop('workplace_initiatives', [])
+        plans = _upsert(ImprovementPlan, [row], ['provider', 'fiscal_year'], provider=provider)
+        plan = plans[(provider.pk, row['fiscal_year'])]
+        ImprovementPlan.target_facilities.through.objects.bulk_create(
+            [ImprovementPlan.target_facilities.through(improvementplan_id=plan.pk, facility_id=facility.pk)],
+            ignore_conflicts=True,
+        )
+        # 取り組み項目が未投入の環境では、登録済みの項目だけを選択する
+        initiative_ids = WorkplaceInitiative.objects.filter(item_number__in=item_numbers).values_list('pk', flat=True)
+        through = ImprovementPlan.workplace_initiatives.through
+        _replace_m2m(through, 'improvementplan_id', [plan.pk], [
+            through(improvementplan_id=plan.pk, workplaceinitiative_id=initiative_id)
+            for initiative_id in initiative_ids
+        ])
+        refresh_initiative_counts([plan.pk])
+
+    return {
+        'facility_id': facility.pk,
+        '職種': len(job_categories),
+        '職位': len(positions),
+        '賃金テーブル': len(wage_tables),
+        '職員': len(staff),
+        '要件Ⅰ': len(requirements),
+        '研修計画': len(training_plans),
+        '計画書': len(plans),
+    }
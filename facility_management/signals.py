@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from shogu_kaizen_system.master_cache import bump_version
+from .models import Provider, Facility
+
+
+@receiver([post_save, post_delete], sender=Provider)
+def invalidate_provider_master_cache(sender, instance, **kwargs):
+    """事業者の変更時にマスタデータのキャッシュを破棄する"""
+    bump_version('providers')
+
+
+@receiver([post_save, post_delete], sender=Facility)
+def invalidate_facility_master_cache(sender, instance, **kwargs):
+    """事業所の変更時にマスタデータのキャッシュを破棄する"""
+    bump_version('facilities')
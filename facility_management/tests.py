@@ -1,3 +1,110 @@
+import io
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
 from django.test import TestCase
 
-# Create your tests here.
+from career_management.models import StaffMember, StaffQualification, WageStep
+from plans.models import ImprovementPlan
+from plans.services.initiative_loader import load_workplace_initiatives
+from plans.services.tier_simulator import TierSimulator
+from .models import Facility, Provider
+from .services.benchmark_data import PRESETS, clear_dataset, seed_dataset
+from .services.benchmarks import compare, run_benchmarks
+from .services.sample_data import load_sample_dataset
+
+
+class BenchmarkSuiteTests(TestCase):
+    """性能測定用データの生成・測定・ベースライン比較を小さな件数で確認する"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_dataset(PRESETS['tiny'])
+
+    def test_seed_dataset_creates_requested_counts(self):
+        spec = PRESETS['tiny']
+        self.assertEqual(Provider.objects.count(), spec.providers)
+        self.assertEqual(Facility.objects.count(), spec.facilities)
+        self.assertEqual(StaffMember.objects.count(), spec.staff)
+        self.assertEqual(ImprovementPlan.objects.count(), spec.plans)
+        # シグナルの代わりに明示的に更新した索引・号級行・判定区分
+        self.assertTrue(StaffQualification.objects.exists())
+        self.assertTrue(WageStep.objects.exists())
+        totals = ImprovementPlan.objects.aggregate(
+            qualification=Sum('qualification_initiatives_count'),
+            work_style=Sum('work_style_initiatives_count'),
+            balance=Sum('balance_initiatives_count'),
+        )
+        self.assertEqual(sum(totals.values()), ImprovementPlan.workplace_initiatives.through.objects.count())
+
+    def test_run_benchmarks_and_compare_with_baseline(self):
+        # 生成データ以外の計画書・キャッシュには触れない
+        provider = Provider.objects.create(name='実在の法人', address='東京都千代田区1-1')
+        real_plan = ImprovementPlan.objects.create(
+            provider=provider, target_addition_tier='I', determined_addition_tier='I', estimated_addition_amount=123,
+        )
+        cache.set('other_tenant', 'kept')
+
+        with mock.patch('facility_management.services.benchmarks.TierSimulator', wraps=TierSimulator) as simulator:
+            report = run_benchmarks(repeat=1)
+        # 一括試算も生成データの計画書だけを対象にする
+        self.assertNotIn(real_plan, simulator.call_args.args[0])
+        real_plan.refresh_from_db()
+        self.assertEqual(real_plan.estimated_addition_amount, 123)
+        self.assertEqual(cache.get('other_tenant'), 'kept')
+        names = {result['name'] for result in report['results']}
+        self.assertIn('view:plan_list', names)
+        self.assertIn('service:recompute_plans', names)
+        self.assertEqual(compare(report, report), [])
+
+        # SQL 件数の増加と、ノイズを超える処理時間の増加を劣化として検出する
+        slower = {'results': [
+            {**result, 'median_ms': result['median_ms'] * 3 + 100, 'queries': result['queries'] + 1}
+            for result in report['results']
+        ]}
+        regressions = compare(slower, report)
+        self.assertEqual(
+            {(regression.name, regression.metric) for regression in regressions},
+            {(name, metric) for name in names for metric in ('median_ms', 'queries')},
+        )
+
+    def test_seed_twice_requires_reset(self):
+        with self.assertRaisesMessage(CommandError, '--reset'):
+            call_command('seed_benchmark_data', preset='tiny', stdout=io.StringIO())
+        call_command('seed_benchmark_data', preset='tiny', reset=True, stdout=io.StringIO())
+        self.assertEqual(Facility.objects.count(), PRESETS['tiny'].facilities)
+
+    def test_clear_dataset(self):
+        clear_dataset()
+        self.assertFalse(Provider.objects.exists())
+        self.assertFalse(StaffMember.objects.exists())
+
+
+class SampleDataLoaderTests(TestCase):
+    """サンプルデータの一括投入が冪等で、シグナルの代わりの更新も行われることを確認する"""
+
+    def test_load_is_idempotent(self):
+        load_workplace_initiatives()
+        first = load_sample_dataset('tokuyo')
+        facility = Facility.objects.get(facility_number='1234567890')
+        staff = StaffMember.objects.get(staff_id='S2025001')
+        StaffMember.objects.filter(pk=staff.pk).update(current_base_salary=1, latest_evaluation_score=4.5)
+
+        self.assertEqual(load_sample_dataset('tokuyo'), first)
+        self.assertEqual(Provider.objects.count(), 1)
+        self.assertEqual(StaffMember.objects.filter(facility=facility).count(), first['職員'])
+        staff.refresh_from_db()
+        # データセットに含まれる列は戻り、含まれない列は保持される
+        self.assertEqual(staff.current_base_salary, 500000)
+        self.assertEqual(float(staff.latest_evaluation_score), 4.5)
+
+        self.assertEqual(StaffQualification.objects.filter(staff_member=staff).count(), 1)
+        self.assertTrue(WageStep.objects.filter(position__facility=facility).exists())
+        plan = ImprovementPlan.objects.get(provider=facility.provider)
+        self.assertEqual(
+            (plan.qualification_initiatives_count, plan.work_style_initiatives_count, plan.balance_initiatives_count),
+            (1, 1, 1),
+        )
+        self.assertEqual(list(plan.target_facilities.all()), [facility])
@@ -0,0 +1,24 @@
+"""
+ASGI で起動する場合の gunicorn 設定
+
+    gunicorn shogu_kaizen_system.asgi:application -c gunicorn_asgi.conf.py
+
+uvicorn ワーカーは1プロセスで多数の接続を扱えるため、通信の遅い端末が多くても
+非同期ビュー（計画書一覧・職員一覧など）がスレッドを占有しない。
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = 'uvicorn.workers.UvicornWorker'
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 4)))
+# キャッシュの無効化が他のワーカーに伝わらないため、複数ワーカーではプロセス内メモリのキャッシュを使えない
+if workers > 1 and os.environ.get('CACHE_BACKEND') == 'locmem':
+    raise RuntimeError('CACHE_BACKEND=locmem は複数ワーカーでは使用できません（file または redis を指定してください）')
+# 遅い接続を待つ間もワーカーは他のリクエストを処理できるため長めに取る
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+keepalive = 5
+# メモリ増加の対策として一定数のリクエストごとにワーカーを入れ替える
+max_requests = 1000
+max_requests_jitter = 100
+accesslog = '-'
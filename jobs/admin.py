@@ -0,0 +1,26 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'progress', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'name']
+    search_fields = ['token', 'name']
+    readonly_fields = [
+        'token', 'name', 'payload', 'status', 'progress', 'progress_message', 'attempts', 'max_attempts',
+        'result', 'error', 'run_after', 'locked_by', 'heartbeat_at', 'created_at', 'started_at', 'finished_at',
+    ]
+    actions = ['retry_selected']
+
+    def has_add_permission(self, request):
+        return False
+
+    def retry_selected(self, request, queryset):
+        """失敗した処理を実行回数をリセットして待機中に戻す"""
+        count = queryset.filter(status='failed').update(
+            status='queued', attempts=0, run_after=timezone.now(), finished_at=None,
+        )
+        self.message_user(request, f'{count}件の処理を再実行待ちにしました。')
+    retry_selected.short_description = '選択した失敗処理を再実行'
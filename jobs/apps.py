@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+    verbose_name = 'バックグラウンド処理'
+
+    def ready(self):
+        # 各アプリの tasks.py で登録された処理を読み込む
+        autodiscover_modules('tasks')
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.services.queue import prune_finished
+
+
+class Command(BaseCommand):
+    help = '終了してから保存期間を過ぎたバックグラウンド処理と出力ファイルを削除します'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.JOBS_RETENTION_DAYS,
+            help='終了した処理を残しておく日数（既定は JOBS_RETENTION_DAYS）',
+        )
+
+    def handle(self, *args, **options):
+        count = prune_finished(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {count}件の処理を削除しました'))
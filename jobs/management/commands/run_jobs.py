@@ -0,0 +1,128 @@
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from jobs import process
+from jobs.services.queue import (
+    STALE_TIMEOUT, claim_jobs, execute_job_in_worker, heartbeat, heartbeating, prune_finished, release_job,
+    requeue_stale, worker_name,
+)
+
+# 保存期間を過ぎた処理を削除する間隔（秒）
+PRUNE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = '登録されたバックグラウンド処理（計画書の再計算・出力など）を取り出して実行します'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count() or 1,
+            help='同時に実行する子プロセス数（0 の場合はこのプロセスで1件ずつ実行する）',
+        )
+        parser.add_argument('--once', action='store_true', help='実行可能な処理がなくなったら終了する')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='処理がない場合の確認間隔（秒）')
+        parser.add_argument(
+            '--stale-timeout', type=int, default=STALE_TIMEOUT,
+            help='応答のない実行中の処理を再実行するまでの時間（秒）',
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        self.worker = worker_name()
+        self.pruned_at = None
+        self.stdout.write(f'ワーカー {self.worker} を開始しました（子プロセス {options["processes"]}）')
+        if options['processes'] > 0:
+            self._run_pool(options)
+        else:
+            self._run_inline(options)
+        self.stdout.write('ワーカーを終了しました')
+
+    def _stop(self, signum, frame):
+        """停止の合図を受けたら新しい処理を取り出さず、実行中の処理の終了を待つ"""
+        self.stopping = True
+
+    def _prune(self):
+        """保存期間を過ぎた処理を一定間隔で削除する"""
+        now = time.monotonic()
+        if self.pruned_at is not None and now - self.pruned_at < PRUNE_INTERVAL:
+            return
+        self.pruned_at = now
+        count = prune_finished()
+        if count:
+            self.stdout.write(f'保存期間を過ぎた処理 {count}件を削除しました')
+
+    def _log(self, job_id, state):
+        self.stdout.write(f'処理 #{job_id}: {state}')
+
+    def _run_inline(self, options):
+        while not self.stopping:
+            close_old_connections()
+            self._prune()
+            requeue_stale(options['stale_timeout'])
+            claimed = claim_jobs(self.worker, 1)
+            if not claimed:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+            # 実行中も最終応答日時を更新し、長い処理が応答なしとして再実行されないようにする
+            with heartbeating(self.worker, claimed):
+                self._log(claimed[0], execute_job_in_worker(claimed[0], self.worker))
+
+    def _run_pool(self, options):
+        while True:
+            # 子プロセスに親の DB 接続を持ち込まない
+            connections.close_all()
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(options['processes'], mp_context=context, initializer=process.setup) as pool:
+                broken = self._drive_pool(pool, options)
+            if not broken or self.stopping:
+                return
+            self.stderr.write('子プロセスが異常終了したため、プロセスプールを作り直します')
+
+    def _drive_pool(self, pool, options):
+        """プールで処理を実行する。子プロセスの異常終了でプールが使えなくなった場合は True を返す"""
+        running = {}
+        broken = False
+        while running or not (self.stopping or broken):
+            close_old_connections()
+            claimed = []
+            if not (self.stopping or broken):
+                self._prune()
+                requeue_stale(options['stale_timeout'])
+                claimed = claim_jobs(self.worker, options['processes'] - len(running))
+            for job_id in claimed:
+                try:
+                    running[pool.submit(process.execute, job_id, self.worker)] = job_id
+                except BrokenProcessPool as e:
+                    broken = True
+                    self._release(job_id, e)
+            if not running:
+                if options['once'] or broken:
+                    return broken
+                time.sleep(options['poll_interval'])
+                continue
+
+            done, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+            for future in done:
+                job_id = running.pop(future)
+                try:
+                    self._log(job_id, future.result())
+                except Exception as e:
+                    broken = broken or isinstance(e, BrokenProcessPool)
+                    self._release(job_id, e)
+            heartbeat(self.worker, list(running.values()))
+        return broken
+
+    def _release(self, job_id, error):
+        self.stderr.write(f'処理 #{job_id}: {error}')
+        release_job(job_id, self.worker, f'子プロセスでの実行に失敗しました: {error}')
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-17 12:59
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='トークン')),
+                ('name', models.CharField(max_length=100, verbose_name='処理名')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='引数')),
+                ('status', models.CharField(choices=[('queued', '待機中'), ('running', '実行中'), ('succeeded', '完了'), ('failed', '失敗')], default='queued', max_length=20, verbose_name='状態')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='進捗（%）')),
+                ('progress_message', models.CharField(blank=True, max_length=200, verbose_name='進捗メッセージ')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='実行回数')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='最大実行回数')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='結果')),
+                ('error', models.TextField(blank=True, verbose_name='エラー')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='実行可能日時')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='実行中のワーカー')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='最終応答日時')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='登録日時')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='開始日時')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='終了日時')),
+            ],
+            options={
+                'verbose_name': 'バックグラウンド処理',
+                'verbose_name_plural': 'バックグラウンド処理',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'queued')), fields=['run_after', 'id'], name='job_queued_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+import uuid
+
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """バックグラウンドで実行する処理（run_jobs コマンドのワーカーが取り出して実行する）"""
+    STATUS_CHOICES = [
+        ('queued', '待機中'),
+        ('running', '実行中'),
+        ('succeeded', '完了'),
+        ('failed', '失敗'),
+    ]
+
+    token = models.UUIDField("トークン", default=uuid.uuid4, unique=True, editable=False)
+    name = models.CharField("処理名", max_length=100)
+    payload = models.JSONField("引数", default=dict, blank=True)
+    status = models.CharField("状態", max_length=20, choices=STATUS_CHOICES, default='queued')
+    progress = models.PositiveSmallIntegerField("進捗（%）", default=0)
+    progress_message = models.CharField("進捗メッセージ", max_length=200, blank=True)
+    attempts = models.PositiveSmallIntegerField("実行回数", default=0)
+    max_attempts = models.PositiveSmallIntegerField("最大実行回数", default=3)
+    result = models.JSONField("結果", null=True, blank=True)
+    error = models.TextField("エラー", blank=True)
+    run_after = models.DateTimeField("実行可能日時", default=timezone.now)
+    locked_by = models.CharField("実行中のワーカー", max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField("最終応答日時", null=True, blank=True)
+    created_at = models.DateTimeField("登録日時", auto_now_add=True)
+    started_at = models.DateTimeField("開始日時", null=True, blank=True)
+    finished_at = models.DateTimeField("終了日時", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "バックグラウンド処理"
+        verbose_name_plural = "バックグラウンド処理"
+        ordering = ['-created_at']
+        indexes = [
+            # ワーカーが待機中の処理を実行可能日時順に取り出す
+            models.Index(fields=['run_after', 'id'], condition=Q(status='queued'), name='job_queued_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk}（{self.get_status_display()}）"
+
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed')
+
+    def report_progress(self, done, total, message=''):
+        """処理中の進捗を記録する（他の列を上書きしないよう UPDATE で保存）"""
+        self.progress = min(100, int(done * 100 / total)) if total else 100
+        self.progress_message = message[:200]
+        self.heartbeat_at = timezone.now()
+        # 再実行に回された後の古い実行からは記録しない
+        Job.objects.filter(pk=self.pk, status='running', locked_by=self.locked_by, attempts=self.attempts).update(
+            progress=self.progress, progress_message=self.progress_message, heartbeat_at=self.heartbeat_at,
+        )
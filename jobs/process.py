@@ -0,0 +1,18 @@
+"""
+プロセスプールの子プロセスで呼び出す関数
+
+spawn で起動した子プロセスは、Django の読み込み前にこのモジュールを import するため、
+モデルは関数の中で import する。
+"""
+import django
+
+
+def setup():
+    """子プロセスの初期化"""
+    django.setup()
+
+
+def execute(job_id, worker):
+    from .services.queue import execute_job_in_worker
+
+    return execute_job_in_worker(job_id, worker)
@@ -0,0 +1,48 @@
+"""
+バックグラウンド処理の登録
+
+各アプリの tasks.py で @task('アプリ名.処理名') を付けた関数を登録する。
+関数は実行中の Job と、登録時の引数（JSON にできる値）をキーワード引数で受け取り、
+結果（JSON にできる dict）を返す。結果の 'url' は完了後の移動先として状態確認画面が使う。
+再実行するのは retry_on の例外（DB の接続断・ロック待ちなど一時的なもの）だけで、
+入力の誤りなど何度実行しても同じ結果になる例外はすぐに失敗とする。
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+from django.db import InterfaceError, OperationalError
+
+DEFAULT_MAX_ATTEMPTS = 3
+# 一時的とみなして再実行する例外
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, OSError)
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    func: Callable
+    max_attempts: int
+    label: str
+    retry_on: tuple = TRANSIENT_ERRORS
+    # 失敗時に状態確認画面から戻る先（入力画面など）
+    back_url: str = ''
+
+
+_tasks = {}
+
+
+def task(name, max_attempts=DEFAULT_MAX_ATTEMPTS, label='', retry_on=TRANSIENT_ERRORS, back_url=''):
+    """関数をバックグラウンド処理として登録するデコレーター"""
+    def register(func):
+        if name in _tasks:
+            raise ValueError(f'処理「{name}」は登録済みです')
+        _tasks[name] = Task(name, func, max_attempts, label or name, retry_on, back_url)
+        return func
+    return register
+
+
+def get_task(name):
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise LookupError(f'処理「{name}」は登録されていません') from None
@@ -0,0 +1,212 @@
+"""
+データベースを使った処理キュー
+
+画面からは enqueue() で登録だけを行い、run_jobs コマンドのワーカーが取り出して実行する
+（ワーカーを起動しない開発環境では、登録と同時にその場で実行する）。
+取り出しは「待機中なら実行中にする」条件付き UPDATE で行い、更新できた1件だけを実行するため、
+SELECT ... FOR UPDATE SKIP LOCKED がない SQLite でも複数のワーカーが同じ処理を同時に取り出さない。
+実行中はワーカーが最終応答日時を更新し続け、途絶えた処理だけを再実行に回す。結果の記録は
+取り出したワーカーと実行回数が一致する場合だけ行うため、再実行に回された後に元のワーカーが
+終了しても、新しい実行の状態は上書きされない。
+一時的な例外で失敗した処理は、間隔を広げながら max_attempts 回まで再実行する。
+終了した処理は JOBS_RETENTION_DAYS 日後に prune_finished() で削除する。
+"""
+import os
+import socket
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Job
+from ..registry import get_task
+
+# 再実行までの待ち時間（秒）。2回目以降は倍ずつ延ばす
+RETRY_BASE_DELAY = 30
+# 実行中のまま応答がない処理を、ワーカーが停止したものとみなすまでの時間（秒）
+STALE_TIMEOUT = 600
+# 実行中の処理の最終応答日時を更新する間隔（秒）
+HEARTBEAT_INTERVAL = 30
+
+
+def worker_name():
+    """ワーカーの識別名（ホスト名:プロセスID）"""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def enqueue(name, **payload):
+    """
+    処理を待機中として登録する（実行はワーカーが行う）。
+    ワーカーを起動していない環境（JOBS_WORKER_ENABLED が無効）では、その場で実行してから返す。
+    """
+    task = get_task(name)
+    job = Job.objects.create(name=name, payload=payload, max_attempts=task.max_attempts)
+    if not settings.JOBS_WORKER_ENABLED:
+        run_now(job)
+    return job
+
+
+def _claim(pk, worker, now):
+    """待機中の処理を実行中にする。他のワーカーが先に取り出した場合は 0 件更新になる"""
+    return Job.objects.filter(pk=pk, status='queued').update(
+        status='running', locked_by=worker, attempts=F('attempts') + 1,
+        started_at=now, heartbeat_at=now, progress=0, progress_message='',
+    )
+
+
+def claim_jobs(worker, limit):
+    """実行可能な待機中の処理を最大 limit 件取り出し、実行中にした ID のリストを返す"""
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    candidates = list(
+        Job.objects.filter(status='queued', run_after__lte=now)
+        .order_by('run_after', 'id')
+        .values_list('pk', flat=True)[:limit * 2]
+    )
+    claimed = []
+    for pk in candidates:
+        if _claim(pk, worker, now):
+            claimed.append(pk)
+            if len(claimed) >= limit:
+                break
+    return claimed
+
+
+def _owned(job):
+    """
+    この実行（取り出したワーカーと実行回数）が今も担当している処理だけに絞り込む。
+    応答なしとして再実行に回された後に元のワーカーが終了しても、新しい実行の状態を上書きしない。
+    """
+    return Job.objects.filter(pk=job.pk, status='running', locked_by=job.locked_by, attempts=job.attempts)
+
+
+def heartbeat(worker, job_ids):
+    """実行中の処理の最終応答日時を更新する（停止したワーカーの処理と区別するため）"""
+    if job_ids:
+        Job.objects.filter(pk__in=job_ids, status='running', locked_by=worker).update(heartbeat_at=timezone.now())
+
+
+@contextmanager
+def heartbeating(worker, job_ids, interval=HEARTBEAT_INTERVAL):
+    """ブロックを実行している間、別スレッドから一定間隔で最終応答日時を更新する"""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                heartbeat(worker, job_ids)
+        finally:
+            # スレッドで開いたDB接続を閉じる
+            connection.close()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _retry_or_fail(job, error, retry=True):
+    """再実行できる回数が残っていれば待機中に戻し、なければ（または retry=False なら）失敗にする"""
+    now = timezone.now()
+    if retry and job.attempts < job.max_attempts:
+        delay = RETRY_BASE_DELAY * 2 ** (job.attempts - 1)
+        updated = _owned(job).update(
+            status='queued', error=error, locked_by='', run_after=now + timedelta(seconds=delay),
+        )
+        return 'queued' if updated else 'lost'
+    updated = _owned(job).update(status='failed', error=error, locked_by='', finished_at=now)
+    return 'failed' if updated else 'lost'
+
+
+def release_job(job_id, worker, error):
+    """実行できなかった処理（子プロセスの異常終了など）を、再実行または失敗にする"""
+    job = Job.objects.filter(pk=job_id, status='running', locked_by=worker).first()
+    return _retry_or_fail(job, error) if job else None
+
+
+def execute_job(job_id, worker):
+    """
+    取り出した処理を1件実行し、終了後の状態を返す。
+    プロセスプールの子プロセスでも呼び出せるよう、引数は ID とワーカー名だけにしている。
+    他の実行に引き継がれて結果を記録できなかった場合は 'lost' を返す。
+    """
+    job = Job.objects.filter(pk=job_id, status='running', locked_by=worker).first()
+    if job is None:
+        return 'lost'
+    try:
+        task = get_task(job.name)
+    except LookupError:
+        return _retry_or_fail(job, traceback.format_exc(), retry=False)
+    try:
+        result = task.func(job, **job.payload)
+    except Exception as e:
+        # 入力の誤りなど、再実行しても結果が変わらない例外はすぐに失敗とする
+        return _retry_or_fail(job, traceback.format_exc(), retry=isinstance(e, task.retry_on))
+    updated = _owned(job).update(
+        status='succeeded', result=result, error='', progress=100, locked_by='',
+        finished_at=timezone.now(),
+    )
+    return 'succeeded' if updated else 'lost'
+
+
+def execute_job_in_worker(job_id, worker):
+    """ワーカーでの実行。リクエストと同様に、前後で切断済み・期限切れの DB 接続を閉じる"""
+    close_old_connections()
+    try:
+        return execute_job(job_id, worker)
+    finally:
+        close_old_connections()
+
+
+def requeue_stale(timeout=STALE_TIMEOUT):
+    """応答が途絶えた実行中の処理を、再実行または失敗にする。件数を返す"""
+    threshold = timezone.now() - timedelta(seconds=timeout)
+    stale = list(Job.objects.filter(status='running', heartbeat_at__lt=threshold))
+    for job in stale:
+        _retry_or_fail(job, f'ワーカー（{job.locked_by}）からの応答が {timeout} 秒以上ありません')
+    return len(stale)
+
+
+def prune_finished(days=None):
+    """
+    終了してから保存期間（既定は JOBS_RETENTION_DAYS 日）を過ぎた処理を削除し、件数を返す。
+    出力ファイルなど処理が残したものは、各アプリが Job の post_delete シグナルで削除する。
+    """
+    days = settings.JOBS_RETENTION_DAYS if days is None else days
+    threshold = timezone.now() - timedelta(days=days)
+    deleted, _ = Job.objects.filter(status__in=('succeeded', 'failed'), finished_at__lt=threshold).delete()
+    return deleted
+
+
+def run_now(job):
+    """ワーカーを使わずにこの場で実行する（一時的な例外はワーカーと同じく run_after まで待ってから再実行する）"""
+    worker = worker_name()
+    while _claim(job.pk, worker, timezone.now()):
+        if execute_job(job.pk, worker) != 'queued':
+            break
+        job.refresh_from_db(fields=['run_after'])
+        time.sleep(max(0.0, (job.run_after - timezone.now()).total_seconds()))
+    job.refresh_from_db()
+    return job
+
+
+def run_pending(worker=None):
+    """実行可能な処理がなくなるまで、このプロセスで1件ずつ実行する。実行した件数を返す"""
+    worker = worker or worker_name()
+    count = 0
+    while True:
+        claimed = claim_jobs(worker, 1)
+        if not claimed:
+            return count
+        execute_job(claimed[0], worker)
+        count += 1
@@ -0,0 +1,151 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Job
+from .registry import task
+from .services.queue import RETRY_BASE_DELAY, claim_jobs, enqueue, execute_job, prune_finished, requeue_stale, run_pending
+
+calls = []
+
+
+@task('jobs.tests.record', max_attempts=2)
+def record(job, value, fail=False, permanent=False):
+    calls.append(value)
+    job.report_progress(1, 2, '半分')
+    if permanent:
+        raise ValueError(f'{value} は処理できません')
+    if fail:
+        raise OperationalError(f'{value} に失敗しました')
+    return {'value': value, 'url': '/plans/'}
+
+
+@task('jobs.tests.taken_over')
+def taken_over(job):
+    """実行中に応答なしとして再実行に回され、別のワーカーに取り出される処理"""
+    Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=2))
+    requeue_stale(timeout=60)
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    claim_jobs('w2', 1)
+    job.report_progress(1, 2)
+    return {'worker': 'w1'}
+
+
+@override_settings(JOBS_WORKER_ENABLED=True)
+class JobQueueTests(TestCase):
+    """処理の登録・取り出し・再実行を確認する"""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_claim_is_exclusive_and_runs_in_order(self):
+        first = enqueue('jobs.tests.record', value='a')
+        second = enqueue('jobs.tests.record', value='b')
+        enqueue('jobs.tests.record', value='later')
+        Job.objects.filter(payload__value='later').update(run_after=timezone.now() + timedelta(minutes=5))
+
+        self.assertEqual(claim_jobs('w1', 5), [first.pk, second.pk])
+        # 取り出し済みの処理は他のワーカーからは取り出せない
+        self.assertEqual(claim_jobs('w2', 5), [])
+        self.assertEqual(execute_job(first.pk, 'w1'), 'succeeded')
+        # 他のワーカーが取り出した処理は実行しない
+        self.assertEqual(execute_job(second.pk, 'w2'), 'lost')
+
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.progress, first.attempts), ('succeeded', 100, 1))
+        self.assertEqual(first.result, {'value': 'a', 'url': '/plans/'})
+        self.assertEqual(calls, ['a'])
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        job = enqueue('jobs.tests.record', value='x', fail=True)
+        self.assertEqual(job.max_attempts, 2)
+
+        self.assertEqual(run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.progress), ('queued', 1, 50))
+        self.assertIn('OperationalError: x に失敗しました', job.error)
+        self.assertGreater(job.run_after, timezone.now())
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.assertEqual(run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_non_transient_error_fails_without_retry(self):
+        job = enqueue('jobs.tests.record', value='p', permanent=True)
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 1))
+        self.assertIn('ValueError: p は処理できません', job.error)
+
+    def test_stale_running_job_is_requeued(self):
+        job = enqueue('jobs.tests.record', value='s')
+        claim_jobs('w1', 1)
+        self.assertEqual(requeue_stale(timeout=60), 0)
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(requeue_stale(timeout=60), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), ('queued', ''))
+
+    def test_requeued_job_is_not_overwritten_by_old_worker(self):
+        job = enqueue('jobs.tests.taken_over')
+        claim_jobs('w1', 1)
+        self.assertEqual(execute_job(job.pk, 'w1'), 'lost')
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.attempts, job.progress), ('running', 'w2', 2, 0))
+        self.assertIsNone(job.result)
+
+    def test_prune_finished_deletes_only_old_finished_jobs(self):
+        old = timezone.now() - timedelta(days=10)
+        expired = enqueue('jobs.tests.record', value='old')
+        recent = enqueue('jobs.tests.record', value='new')
+        waiting = enqueue('jobs.tests.record', value='wait')
+        run_pending()
+        Job.objects.filter(pk=expired.pk).update(finished_at=old)
+        Job.objects.filter(pk=waiting.pk).update(status='queued', finished_at=None, created_at=old)
+
+        self.assertEqual(prune_finished(days=7), 1)
+        self.assertEqual(set(Job.objects.values_list('pk', flat=True)), {recent.pk, waiting.pk})
+
+    def test_status_endpoints(self):
+        job = enqueue('jobs.tests.record', value='v')
+        response = self.client.get(reverse('job_status_json', args=[job.token]))
+        self.assertEqual(response.json()['status'], 'queued')
+        self.assertContains(self.client.get(reverse('job_status', args=[job.token])), 'http-equiv="refresh" content="2"')
+
+        run_pending()
+        data = self.client.get(reverse('job_status_json', args=[job.token])).json()
+        self.assertEqual((data['status'], data['progress'], data['result']['value']), ('succeeded', 100, 'v'))
+        self.assertContains(self.client.get(reverse('job_status', args=[job.token])), 'url=/plans/')
+
+
+class InlineJobTests(TestCase):
+    """ワーカーを起動していない環境では、登録した処理をその場で実行する"""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_runs_job_immediately(self):
+        job = enqueue('jobs.tests.record', value='i')
+        self.assertEqual((job.status, job.attempts, job.result['value']), ('succeeded', 1, 'i'))
+        self.assertEqual(calls, ['i'])
+
+    def test_transient_error_is_retried_inline_after_backoff(self):
+        with mock.patch('jobs.services.queue.time.sleep') as sleep:
+            job = enqueue('jobs.tests.record', value='t', fail=True)
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertEqual(calls, ['t', 't'])
+        # 再実行の前に run_after（RETRY_BASE_DELAY 秒後）まで待つ
+        sleep.assert_called_once()
+        self.assertAlmostEqual(sleep.call_args.args[0], RETRY_BASE_DELAY, delta=5)
+
+    def test_non_transient_error_is_not_retried_inline(self):
+        job = enqueue('jobs.tests.record', value='n', permanent=True)
+        self.assertEqual((job.status, job.attempts), ('failed', 1))
+        self.assertEqual(calls, ['n'])
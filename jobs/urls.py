@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('<uuid:token>/', views.job_status, name='job_status'),
+    path('<uuid:token>.json', views.job_status_json, name='job_status_json'),
+]
@@ -0,0 +1,39 @@
+from django.http import JsonResponse
+from django.shortcuts import render, get_object_or_404
+
+from .models import Job
+from .registry import get_task
+
+
+def _error_summary(job):
+    """画面に出すエラー（トレースバックの最終行だけ）"""
+    lines = job.error.strip().splitlines()
+    return lines[-1] if lines else ''
+
+
+def job_status(request, token):
+    """処理の状態確認（実行中は自動で再読み込みし、完了したら結果の画面へ移動する）"""
+    job = get_object_or_404(Job, token=token)
+    try:
+        task = get_task(job.name)
+        label, back_url = task.label, task.back_url
+    except LookupError:
+        label, back_url = job.name, ''
+    return render(request, 'jobs/job_status.html', {
+        'job': job, 'label': label, 'back_url': back_url,
+        'error': _error_summary(job) if job.status == 'failed' else '',
+    })
+
+
+def job_status_json(request, token):
+    """処理の状態（画面やスクリプトからの問い合わせ用）"""
+    job = get_object_or_404(Job, token=token)
+    return JsonResponse({
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'progress': job.progress,
+        'message': job.progress_message,
+        'attempts': job.attempts,
+        'result': job.result if job.status == 'succeeded' else None,
+        'error': _error_summary(job) if job.status == 'failed' else '',
+    })
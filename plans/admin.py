@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.urls import reverse
 from django.utils.html import format_html
-from .models import WorkplaceInitiative, ImprovementPlan
+from jobs.services.queue import enqueue
+from .models import WorkplaceInitiative, ImprovementPlan, INITIATIVE_COUNT_FIELDS
 
 
 @admin.register(WorkplaceInitiative)
@@ -22,6 +24,7 @@ class ImprovementPlanAdmin(admin.ModelAdmin):
     list_filter = ['fiscal_year', 'target_addition_tier', 'status']
     search_fields = ['provider__name']
     filter_horizontal = ['target_facilities', 'workplace_initiatives']
+    actions = ['recompute_selected']
     
     fieldsets = (
         ('基本情報', {
@@ -73,13 +76,23 @@ class ImprovementPlanAdmin(admin.ModelAdmin):
             return format_html('<span style="color: red;">✗ なし</span>')
     
     career_path_summary.short_description = 'キャリアパス要件'
+
+    def recompute_selected(self, request, queryset):
+        """選択した計画書の加算区分・加算見込額の再計算をワーカーに登録する"""
+        job = enqueue('plans.recompute_plans', plan_ids=list(queryset.values_list('id', flat=True)))
+        self.message_user(request, format_html(
+            '{}件の計画書の再計算を登録しました（<a href="{}">状態を確認</a>）。',
+            len(job.payload['plan_ids']), reverse('job_status', args=[job.token]),
+        ))
+    recompute_selected.short_description = '選択した計画書の加算見込額を再計算'
     
-    def save_model(self, request, obj, form, change):
-        """保存時に自動計算を実行"""
-        super().save_model(request, obj, form, change)
+    def save_related(self, request, form, formsets, change):
+        """取り組みの保存（M2M）後に自動計算を実行"""
+        super().save_related(request, form, formsets, change)
+        obj = form.instance
         
-        # 職場環境等要件の取り組み数を計算
-        obj.calculate_workplace_initiatives_count()
+        # 職場環境等要件の取り組み数は m2m_changed シグナルで更新済み
+        obj.refresh_from_db(fields=list(INITIATIVE_COUNT_FIELDS.values()))
         
         # 取得可能な加算区分を判定
         eligible_tier = obj.determine_eligible_tier()
@@ -87,6 +100,6 @@ class ImprovementPlanAdmin(admin.ModelAdmin):
             obj.determined_addition_tier = eligible_tier
         
         # 加算見込額を計算
-        obj.calculate_estimated_amount()
+        obj.calculate_estimated_amount(commit=False)
         
         obj.save()
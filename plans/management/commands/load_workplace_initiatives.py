@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from plans.services.initiative_loader import SEED_FILE, load_workplace_initiatives
+
+
+class Command(BaseCommand):
+    help = '職場環境等要件の取り組み項目を項目番号で一括登録・更新します（デプロイ時に実行）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=SEED_FILE, help='取り組み項目の JSON ファイル')
+
+    def handle(self, *args, **options):
+        count = load_workplace_initiatives(options['file'])
+        self.stdout.write(self.style.SUCCESS(f'{count}件の取り組み項目を登録・更新しました'))
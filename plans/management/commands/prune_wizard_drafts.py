@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from plans.services.plan_wizard import prune_drafts
+
+
+class Command(BaseCommand):
+    help = 'セッションの有効期限を過ぎた計画書作成ウィザードの下書きを削除します'
+
+    def handle(self, *args, **options):
+        count = prune_drafts()
+        self.stdout.write(self.style.SUCCESS(f'✅ {count}件の下書きを削除しました'))
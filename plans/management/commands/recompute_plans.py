@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.services.queue import enqueue
+from plans.models import ImprovementPlan, parse_tier_rates
+from plans.services.plan_recompute import recompute_plans
+
+
+class Command(BaseCommand):
+    help = '処遇改善計画書の取り組み数・加算区分・加算率・加算見込額を一括で再計算します'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fiscal-year', type=int, help='対象年度')
+        parser.add_argument('--provider', type=int, help='対象事業者ID')
+        parser.add_argument(
+            '--rate', action='append', default=[], metavar='区分=加算率',
+            help='加算率の上書き（例: --rate I=16.5 --rate II=13.7）',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='bulk_update のバッチサイズ')
+        parser.add_argument('--background', action='store_true', help='再計算をワーカー（run_jobs）に登録して終了する')
+
+    def handle(self, *args, **options):
+        try:
+            tier_rates = parse_tier_rates(options['rate'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['background']:
+            job = enqueue(
+                'plans.recompute_plans', fiscal_year=options['fiscal_year'], provider_id=options['provider'],
+                tier_rates=tier_rates,
+            )
+            self.stdout.write(self.style.SUCCESS(f'✅ 再計算を登録しました（処理 #{job.pk}）'))
+            return
+
+        plans = ImprovementPlan.objects.all()
+        if options['fiscal_year']:
+            plans = plans.filter(fiscal_year=options['fiscal_year'])
+        if options['provider']:
+            plans = plans.filter(provider_id=options['provider'])
+
+        count = recompute_plans(plans, tier_rates=tier_rates, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {count}件の計画書を再計算しました'))
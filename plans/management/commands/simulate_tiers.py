@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from plans.models import ImprovementPlan, parse_tier_rates
+from plans.services.tier_simulator import TierSimulator, Scenario
+
+
+class Command(BaseCommand):
+    help = '全計画書について、要件の充足や加算率の変更による加算見込額の変化を試算します'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fiscal-year', type=int, help='対象年度')
+        parser.add_argument(
+            '--meet', type=int, action='append', default=[], choices=[1, 2, 3],
+            help='全計画で満たした場合を試算するキャリアパス要件（例: --meet 3）',
+        )
+        parser.add_argument('--workplace', action='store_true', help='職場環境等要件を全計画で満たした場合も試算する')
+        parser.add_argument(
+            '--rate', action='append', default=[], metavar='区分=加算率',
+            help='加算率を変更した場合を試算する（例: --rate I=18.0）',
+        )
+
+    def handle(self, *args, **options):
+        plans = ImprovementPlan.objects.all()
+        if options['fiscal_year']:
+            plans = plans.filter(fiscal_year=options['fiscal_year'])
+
+        scenarios = [Scenario(f'キャリアパス要件{number}を全計画で充足', career_path={number: True}) for number in options['meet']]
+        if options['workplace']:
+            scenarios.append(Scenario('職場環境等要件を全計画で充足', workplace=True))
+        if options['rate']:
+            try:
+                tier_rates = parse_tier_rates(options['rate'])
+            except ValueError as e:
+                raise CommandError(str(e))
+            scenarios.append(Scenario('加算率の変更', tier_rates=tier_rates))
+
+        simulator = TierSimulator(plans)
+        self.stdout.write(f'対象計画書: {len(simulator)}件')
+        for result in simulator.run(scenarios):
+            tiers = ' '.join(f'{tier}:{count}' for tier, count in sorted(result.tier_counts.items()))
+            self.stdout.write(
+                f'{result.name}: 加算見込額 {result.total_amount:,}円（差額 {result.delta:+,}円） [{tiers}]'
+            )
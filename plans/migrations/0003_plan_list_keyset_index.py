@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 12:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility_management', '0001_initial'),
+        ('plans', '0002_planwizarddraft'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='improvementplan',
+            index=models.Index(fields=['-fiscal_year', '-created_at', '-id'], name='plans_list_keyset_idx'),
+        ),
+    ]
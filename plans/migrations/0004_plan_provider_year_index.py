@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 12:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility_management', '0001_initial'),
+        ('plans', '0003_plan_list_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='improvementplan',
+            index=models.Index(fields=['provider', 'fiscal_year'], name='plan_provider_year_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.8 on 2026-10-17 12:49
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+# マイグレーション作成時点の plans.models.INITIATIVE_COUNT_FIELDS の複製
+INITIATIVE_COUNT_FIELDS = {
+    'qualification': 'qualification_initiatives_count',
+    'work_style': 'work_style_initiatives_count',
+    'balance': 'balance_initiatives_count',
+}
+
+
+def merge_duplicate_item_numbers(apps, schema_editor):
+    """
+    一意制約を付ける前に、項目番号が重複する取り組みを最も古い1件にまとめる。
+    重複した項目を選んでいた計画書は残す項目を選んだことにし、取り組み数を数え直す。
+    """
+    WorkplaceInitiative = apps.get_model('plans', 'WorkplaceInitiative')
+    ImprovementPlan = apps.get_model('plans', 'ImprovementPlan')
+    Through = ImprovementPlan.workplace_initiatives.through
+
+    duplicates = (
+        WorkplaceInitiative.objects.values('item_number')
+        .annotate(count=Count('id'), kept_id=Min('id'))
+        .filter(count__gt=1)
+    )
+    affected_plan_ids = set()
+    for row in duplicates:
+        kept_id = row['kept_id']
+        merged_ids = list(
+            WorkplaceInitiative.objects.filter(item_number=row['item_number']).exclude(pk=kept_id).values_list('id', flat=True)
+        )
+        links = Through.objects.filter(workplaceinitiative_id__in=merged_ids)
+        plan_ids = set(links.values_list('improvementplan_id', flat=True))
+        already_linked = set(
+            Through.objects.filter(workplaceinitiative_id=kept_id, improvementplan_id__in=plan_ids)
+            .values_list('improvementplan_id', flat=True)
+        )
+        Through.objects.bulk_create([
+            Through(improvementplan_id=plan_id, workplaceinitiative_id=kept_id)
+            for plan_id in plan_ids - already_linked
+        ])
+        links.delete()
+        WorkplaceInitiative.objects.filter(pk__in=merged_ids).delete()
+        affected_plan_ids |= plan_ids
+
+    for plan in ImprovementPlan.objects.filter(pk__in=affected_plan_ids):
+        counts = dict(
+            Through.objects.filter(improvementplan_id=plan.pk)
+            .values_list('workplaceinitiative__category')
+            .annotate(count=Count('id'))
+        )
+        for category, field_name in INITIATIVE_COUNT_FIELDS.items():
+            setattr(plan, field_name, counts.get(category, 0))
+        plan.save(update_fields=list(INITIATIVE_COUNT_FIELDS.values()))
+
+
+class Migration(migrations.Migration):
+    # PostgreSQL では同じトランザクションで行を削除した後にテーブルを変更できないため、
+    # 統合（RunPython は個別のトランザクション）と一意制約の追加を分けて実行する
+    atomic = False
+
+    dependencies = [
+        ('plans', '0004_plan_provider_year_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_item_numbers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='workplaceinitiative',
+            name='item_number',
+            field=models.CharField(max_length=10, unique=True, verbose_name='項目番号'),
+        ),
+    ]
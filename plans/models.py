@@ -1,6 +1,83 @@
+import math
+from decimal import Decimal, InvalidOperation
+
 from django.db import models
+from django.db.models import Count, Q
 from facility_management.models import Facility, Provider
 
+# 加算区分ごとの加算率（%）
+TIER_RATES = {
+    'I': 16.5,   # 加算I: 16.5%
+    'II': 13.7,  # 加算II: 13.7%
+    'III': 5.9,  # 加算III: 5.9%
+    'IV': 3.3,   # 加算IV: 3.3%
+}
+
+
+def resolve_tier_rates(tier_rates=None):
+    """加算率の上書き（一部の区分だけでもよい）を標準の加算率に重ねる"""
+    return {**TIER_RATES, **(tier_rates or {})}
+
+
+def parse_tier_rates(values):
+    """
+    「区分=加算率」形式の指定（--rate I=16.5 など）を標準の加算率に重ねた辞書にする。
+    存在しない区分、数値でない・有限でない・負の加算率は ValueError
+    """
+    tier_rates = {}
+    for value in values:
+        tier, _, rate = value.partition('=')
+        if tier not in TIER_RATES:
+            raise ValueError(f'加算区分「{tier}」は存在しません')
+        try:
+            parsed = float(Decimal(rate.strip()))
+        except InvalidOperation:
+            raise ValueError(f'加算率「{rate}」が数値ではありません')
+        if not math.isfinite(parsed) or parsed < 0:
+            raise ValueError(f'加算率「{rate}」は0以上の数値で指定してください')
+        tier_rates[tier] = parsed
+    return resolve_tier_rates(tier_rates)
+
+
+# 1単位あたりの単価（円）の概算
+UNIT_PRICE = 10
+
+# 職場環境等要件の区分 → 計画書の取り組み数の項目
+INITIATIVE_COUNT_FIELDS = {
+    'qualification': 'qualification_initiatives_count',
+    'work_style': 'work_style_initiatives_count',
+    'balance': 'balance_initiatives_count',
+}
+
+
+def determine_tier(career_path_1, career_path_2, career_path_3, qualification_count, work_style_count, balance_count):
+    """キャリアパス要件と職場環境等要件の充足状況から取得可能な加算区分を判定"""
+    meets_workplace = qualification_count >= 1 and work_style_count >= 1 and balance_count >= 1
+
+    # 加算I: キャリアパス要件I+II+III、職場環境等要件（各区分1つ以上）
+    if career_path_1 and career_path_2 and career_path_3 and meets_workplace:
+        return 'I'
+
+    # 加算II: キャリアパス要件I+II、職場環境等要件（各区分1つ以上）
+    elif career_path_1 and career_path_2 and meets_workplace:
+        return 'II'
+
+    # 加算III: キャリアパス要件I+II
+    elif career_path_1 and career_path_2:
+        return 'III'
+
+    # 加算IV: キャリアパス要件I または II のいずれか
+    elif career_path_1 or career_path_2:
+        return 'IV'
+
+    else:
+        return None
+
+
+def estimate_addition_amount(total_service_units, rate):
+    """加算見込額（単位数 × 加算率 × 単位単価）"""
+    return int(total_service_units * rate / 100 * UNIT_PRICE)
+
 
 class WorkplaceInitiative(models.Model):
     """職場環境等要件の取り組み項目"""
@@ -11,7 +88,7 @@ class WorkplaceInitiative(models.Model):
     ]
     
     category = models.CharField("区分", max_length=20, choices=CATEGORY_CHOICES)
-    item_number = models.CharField("項目番号", max_length=10)
+    item_number = models.CharField("項目番号", max_length=10, unique=True)
     description = models.TextField("取り組み内容")
     
     class Meta:
@@ -84,6 +161,12 @@ class ImprovementPlan(models.Model):
     
     class Meta:
         ordering = ['-fiscal_year', '-created_at']
+        indexes = [
+            # 一覧のキーセットページング用（plans.services.plan_listing.LIST_ORDERING）
+            models.Index(fields=['-fiscal_year', '-created_at', '-id'], name='plans_list_keyset_idx'),
+            # 事業者・年度での絞り込み（再計算・シミュレーションの対象指定）
+            models.Index(fields=['provider', 'fiscal_year'], name='plan_provider_year_idx'),
+        ]
         verbose_name = "処遇改善計画書"
         verbose_name_plural = "処遇改善計画書"
     
@@ -100,57 +183,52 @@ class ImprovementPlan(models.Model):
             'requirement_5': self.meets_career_path_5,
         }
     
-    def calculate_workplace_initiatives_count(self):
+    def count_initiatives_by_category(self):
+        """職場環境等要件の区分別取り組み数を1クエリで集計（項目名 → 件数）"""
+        return self.workplace_initiatives.aggregate(**{
+            field: Count('pk', filter=Q(category=category))
+            for category, field in INITIATIVE_COUNT_FIELDS.items()
+        })
+    
+    def calculate_workplace_initiatives_count(self, commit=True):
         """職場環境等要件の区分別取り組み数を計算"""
-        initiatives = self.workplace_initiatives.all()
-        self.qualification_initiatives_count = initiatives.filter(category='qualification').count()
-        self.work_style_initiatives_count = initiatives.filter(category='work_style').count()
-        self.balance_initiatives_count = initiatives.filter(category='balance').count()
-        self.save()
+        for field, count in self.count_initiatives_by_category().items():
+            setattr(self, field, count)
+        if commit:
+            self.save()
     
     def determine_eligible_tier(self):
         """取得可能な加算区分を判定"""
-        # 加算I: キャリアパス要件I+II+III、職場環境等要件（各区分1つ以上）
-        if (self.meets_career_path_1 and self.meets_career_path_2 and self.meets_career_path_3 and
-            self.qualification_initiatives_count >= 1 and 
-            self.work_style_initiatives_count >= 1 and 
-            self.balance_initiatives_count >= 1):
-            return 'I'
-        
-        # 加算II: キャリアパス要件I+II、職場環境等要件（各区分1つ以上）
-        elif (self.meets_career_path_1 and self.meets_career_path_2 and
-              self.qualification_initiatives_count >= 1 and 
-              self.work_style_initiatives_count >= 1 and 
-              self.balance_initiatives_count >= 1):
-            return 'II'
-        
-        # 加算III: キャリアパス要件I+II
-        elif self.meets_career_path_1 and self.meets_career_path_2:
-            return 'III'
-        
-        # 加算IV: キャリアパス要件I または II のいずれか
-        elif self.meets_career_path_1 or self.meets_career_path_2:
-            return 'IV'
-        
-        else:
-            return None
-    
-    def calculate_addition_rate(self):
+        return determine_tier(
+            self.meets_career_path_1, self.meets_career_path_2, self.meets_career_path_3,
+            self.qualification_initiatives_count, self.work_style_initiatives_count, self.balance_initiatives_count,
+        )
+    
+    def calculate_addition_rate(self, tier_rates=None):
         """加算率を計算"""
-        tier_rates = {
-            'I': 16.5,   # 加算I: 16.5%
-            'II': 13.7,  # 加算II: 13.7%
-            'III': 5.9,  # 加算III: 5.9%
-            'IV': 3.3,   # 加算IV: 3.3%
-        }
         tier = self.determined_addition_tier or self.target_addition_tier
-        return tier_rates.get(tier, 0)
+        return resolve_tier_rates(tier_rates).get(tier, 0)
     
-    def calculate_estimated_amount(self):
+    def calculate_estimated_amount(self, commit=True, tier_rates=None):
         """加算見込額を計算（簡易版）"""
-        rate = self.calculate_addition_rate()
+        rate = self.calculate_addition_rate(tier_rates)
         self.addition_rate = rate
         # 単位数 × 加算率 × 10円（単位単価の概算）
-        self.estimated_addition_amount = int(self.total_service_units * rate / 100 * 10)
-        self.save()
+        self.estimated_addition_amount = estimate_addition_amount(self.total_service_units, rate)
+        if commit:
+            self.save()
         return self.estimated_addition_amount
+
+
+class PlanWizardDraft(models.Model):
+    """計画書作成ウィザードの入力途中データ（全ステップの入力を1レコードにまとめて保持）"""
+    data = models.JSONField("入力内容", default=dict)
+    created_at = models.DateTimeField("作成日時", auto_now_add=True)
+    updated_at = models.DateTimeField("更新日時", auto_now=True)
+
+    class Meta:
+        verbose_name = "計画書作成ウィザード下書き"
+        verbose_name_plural = "計画書作成ウィザード下書き"
+
+    def __str__(self):
+        return f"ウィザード下書き #{self.pk}"
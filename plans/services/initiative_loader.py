@@ -0,0 +1,34 @@
+"""
+職場環境等要件の取り組み項目の投入
+
+seed_data/workplace_initiatives.json の項目を項目番号（自然キー）で一括登録・更新する。
+既存の項目は削除しないため、計画書で選択済みの取り組みが外れることはない。
+"""
+import json
+from pathlib import Path
+
+from django.db import transaction
+
+from shogu_kaizen_system.bulk_upsert import bulk_upsert
+from shogu_kaizen_system.master_cache import bump_version
+from ..models import ImprovementPlan, WorkplaceInitiative
+from .plan_recompute import refresh_initiative_counts
+
+SEED_FILE = Path(__file__).resolve().parent.parent / 'seed_data' / 'workplace_initiatives.json'
+
+
+def load_workplace_initiatives(path=SEED_FILE):
+    """取り組み項目を1トランザクションで登録・更新し、件数を返す"""
+    with open(path, encoding='utf-8') as f:
+        rows = json.load(f)
+    with transaction.atomic():
+        initiatives = bulk_upsert(WorkplaceInitiative, [WorkplaceInitiative(**row) for row in rows], ['item_number'])
+        # 区分が変わった項目を選択している計画書があれば取り組み数を更新する
+        plan_ids = (
+            ImprovementPlan.workplace_initiatives.through.objects
+            .filter(workplaceinitiative_id__in=[initiative.pk for initiative in initiatives.values()])
+            .values_list('improvementplan_id', flat=True).distinct()
+        )
+        refresh_initiative_counts(plan_ids)
+    bump_version('workplace_initiatives')
+    return len(initiatives)
@@ -0,0 +1,89 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from ..models import ImprovementPlan
+
+PAGE_SIZE = 50
+
+# 一覧の並び順（Meta.indexes の plans_list_keyset_idx と揃える）
+LIST_ORDERING = ['-fiscal_year', '-created_at', '-id']
+
+
+@dataclass
+class PlanPage:
+    """計画書一覧の1ページ分"""
+    plans: list
+    next_cursor: str = None
+    is_first: bool = True
+
+
+def encode_cursor(plan):
+    """ページ末尾の計画書から次ページのカーソルを作る"""
+    payload = json.dumps([plan.fiscal_year, plan.created_at.isoformat(), plan.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """カーソルを (年度, 作成日時, ID) に戻す（不正な値は None）"""
+    try:
+        fiscal_year, created_at, plan_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return int(fiscal_year), datetime.fromisoformat(created_at), int(plan_id)
+    except (ValueError, TypeError, binascii.Error):
+        return None
+
+
+def _through_count(through):
+    """中間テーブルの計画書ごとの件数を返す相関サブクエリ"""
+    counts = (
+        through.objects.filter(improvementplan_id=OuterRef('pk'))
+        .order_by()
+        .values('improvementplan_id')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def plan_list_queryset():
+    """一覧表示用：事業者を結合し、対象事業所数・取り組み数を付けた計画書"""
+    return ImprovementPlan.objects.select_related('provider').annotate(
+        facility_count=_through_count(ImprovementPlan.target_facilities.through),
+        initiative_count=_through_count(ImprovementPlan.workplace_initiatives.through),
+    ).order_by(*LIST_ORDERING)
+
+
+def _page_queryset(queryset, cursor, page_size):
+    """カーソル位置より後ろの1ページ分（次ページ判定用に1件多く）のクエリセット"""
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        fiscal_year, created_at, plan_id = position
+        # 先頭の fiscal_year__lte は OR だけでは使われないインデックスの範囲検索（SEARCH）のための条件
+        queryset = queryset.filter(fiscal_year__lte=fiscal_year).filter(
+            Q(fiscal_year__lt=fiscal_year)
+            | Q(fiscal_year=fiscal_year, created_at__lt=created_at)
+            | Q(fiscal_year=fiscal_year, created_at=created_at, id__lt=plan_id)
+        )
+    return queryset[:page_size + 1], position is None
+
+
+def _make_page(plans, page_size, is_first):
+    next_cursor = encode_cursor(plans[page_size - 1]) if len(plans) > page_size else None
+    return PlanPage(plans[:page_size], next_cursor, is_first)
+
+
+def paginate_plans(queryset, cursor=None, page_size=PAGE_SIZE):
+    """(年度, 作成日時, ID) の降順でカーソル位置の次から1ページ分を取得する"""
+    queryset, is_first = _page_queryset(queryset, cursor, page_size)
+    return _make_page(list(queryset), page_size, is_first)
+
+
+async def apaginate_plans(queryset, cursor=None, page_size=PAGE_SIZE):
+    """paginate_plans の非同期版"""
+    queryset, is_first = _page_queryset(queryset, cursor, page_size)
+    return _make_page([plan async for plan in queryset], page_size, is_first)
@@ -0,0 +1,84 @@
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from ..models import (
+    ImprovementPlan, INITIATIVE_COUNT_FIELDS, determine_tier, estimate_addition_amount, resolve_tier_rates,
+)
+
+# 再計算で更新する項目
+RECOMPUTED_FIELDS = [
+    'qualification_initiatives_count',
+    'work_style_initiatives_count',
+    'balance_initiatives_count',
+    'determined_addition_tier',
+    'addition_rate',
+    'estimated_addition_amount',
+    'updated_at',
+]
+
+
+def initiative_counts(plan_ids):
+    """計画書ID → (資質の向上, 労働環境・処遇の改善, やりがい・働きがいの醸成) の取り組み数"""
+    through = ImprovementPlan.workplace_initiatives.through
+    rows = (
+        through.objects.filter(improvementplan_id__in=plan_ids)
+        .values('improvementplan_id')
+        .annotate(**{
+            category: Count('pk', filter=Q(workplaceinitiative__category=category))
+            for category in INITIATIVE_COUNT_FIELDS
+        })
+        .order_by()
+    )
+    return {
+        row['improvementplan_id']: tuple(row[category] for category in INITIATIVE_COUNT_FIELDS)
+        for row in rows
+    }
+
+
+def refresh_initiative_counts(plan_ids):
+    """指定した計画書の取り組み数だけを集計し直して保存する"""
+    plan_ids = list(plan_ids)
+    counts = initiative_counts(plan_ids)
+    plans = []
+    for plan_id in plan_ids:
+        plan = ImprovementPlan(pk=plan_id)
+        for field, count in zip(INITIATIVE_COUNT_FIELDS.values(), counts.get(plan_id, (0, 0, 0))):
+            setattr(plan, field, count)
+        plans.append(plan)
+    ImprovementPlan.objects.bulk_update(plans, list(INITIATIVE_COUNT_FIELDS.values()))
+    return counts
+
+
+def recompute_plans(queryset=None, tier_rates=None, batch_size=1000):
+    """
+    計画書の取り組み数・判定区分・加算率・加算見込額をまとめて再計算する。
+    取り組み数は中間テーブルの1回の集計で求め、更新は bulk_update で行う。
+    """
+    queryset = ImprovementPlan.objects.all() if queryset is None else queryset
+    tier_rates = resolve_tier_rates(tier_rates)
+    plans = list(queryset.only(
+        'id', 'target_addition_tier', 'total_service_units',
+        'meets_career_path_1', 'meets_career_path_2', 'meets_career_path_3',
+    ).order_by())
+    counts = initiative_counts(queryset.values('id'))
+
+    now = timezone.now()
+    for plan in plans:
+        qualification, work_style, balance = counts.get(plan.id, (0, 0, 0))
+        plan.qualification_initiatives_count = qualification
+        plan.work_style_initiatives_count = work_style
+        plan.balance_initiatives_count = balance
+        plan.determined_addition_tier = determine_tier(
+            plan.meets_career_path_1, plan.meets_career_path_2, plan.meets_career_path_3,
+            qualification, work_style, balance,
+        ) or ''
+        rate = plan.calculate_addition_rate(tier_rates)
+        plan.addition_rate = rate
+        plan.estimated_addition_amount = estimate_addition_amount(plan.total_service_units, rate)
+        # bulk_update では auto_now が効かないため明示的に設定する
+        plan.updated_at = now
+
+    with transaction.atomic():
+        ImprovementPlan.objects.bulk_update(plans, RECOMPUTED_FIELDS, batch_size=batch_size)
+    return len(plans)
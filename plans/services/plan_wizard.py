@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from facility_management.models import Provider, Facility
+from ..models import ImprovementPlan, PlanWizardDraft, WorkplaceInitiative, INITIATIVE_COUNT_FIELDS, estimate_addition_amount
+
+# セッションには下書きのIDだけを保存する
+SESSION_KEY = 'plan_wizard_draft_id'
+
+
+def draft_expiry():
+    """
+    この日時より前に更新された下書きは期限切れとする。
+    セッションの有効期限（SESSION_COOKIE_AGE）を過ぎた下書きは、もう誰からも開かれないため。
+    """
+    return timezone.now() - timedelta(seconds=settings.SESSION_COOKIE_AGE)
+
+
+def prune_drafts():
+    """期限切れの下書きを削除し、件数を返す"""
+    deleted, _ = PlanWizardDraft.objects.filter(updated_at__lt=draft_expiry()).delete()
+    return deleted
+
+
+def load_draft(request):
+    """セッションに紐づく下書きを返す（なければ、または期限切れなら未保存の下書き）"""
+    draft_id = request.session.get(SESSION_KEY)
+    if draft_id is not None:
+        draft = PlanWizardDraft.objects.filter(pk=draft_id, updated_at__gte=draft_expiry()).first()
+        if draft is not None:
+            return draft
+    return PlanWizardDraft()
+
+
+def save_step(request, draft, values):
+    """ステップの入力内容を下書きに反映して1回で保存する"""
+    draft.data.update(values)
+    if draft.pk is None:
+        draft.save()
+        # セッションの書き込みは下書き作成時の1回だけ
+        request.session[SESSION_KEY] = draft.pk
+    else:
+        draft.save(update_fields=['data', 'updated_at'])
+
+
+def commit_draft(draft):
+    """
+    下書きから計画書を作成する。
+    事業所・取り組みは中間テーブルへ bulk_create で登録し、全体を1トランザクションで行う。
+    """
+    data = draft.data
+    provider = Provider.objects.get(id=data.get('provider_id'))
+    facility_ids = list(Facility.objects.filter(id__in=data.get('facility_ids', [])).values_list('id', flat=True))
+    initiatives = list(
+        WorkplaceInitiative.objects.filter(id__in=data.get('workplace_initiative_ids', [])).values_list('id', 'category')
+    )
+
+    plan = ImprovementPlan(
+        provider=provider,
+        fiscal_year=int(data.get('fiscal_year') or 2025),
+        target_addition_tier=data.get('target_tier') or 'I',
+        meets_career_path_1=data.get('career_path_1', False),
+        meets_career_path_2=data.get('career_path_2', False),
+        meets_career_path_3=data.get('career_path_3', False),
+        meets_career_path_4=data.get('career_path_4', False),
+        meets_career_path_5=data.get('career_path_5', False),
+        total_service_units=int(data.get('total_service_units') or 0),
+    )
+    # bulk_create では m2m_changed が発生しないため、取り組み数はここで数える
+    for field in INITIATIVE_COUNT_FIELDS.values():
+        setattr(plan, field, 0)
+    for _, category in initiatives:
+        field = INITIATIVE_COUNT_FIELDS[category]
+        setattr(plan, field, getattr(plan, field) + 1)
+    plan.determined_addition_tier = plan.determine_eligible_tier() or ''
+    rate = plan.calculate_addition_rate()
+    plan.addition_rate = rate
+    plan.estimated_addition_amount = estimate_addition_amount(plan.total_service_units, rate)
+
+    facility_through = ImprovementPlan.target_facilities.through
+    initiative_through = ImprovementPlan.workplace_initiatives.through
+    with transaction.atomic():
+        plan.save()
+        facility_through.objects.bulk_create([
+            facility_through(improvementplan_id=plan.id, facility_id=facility_id) for facility_id in facility_ids
+        ])
+        initiative_through.objects.bulk_create([
+            initiative_through(improvementplan_id=plan.id, workplaceinitiative_id=initiative_id)
+            for initiative_id, _ in initiatives
+        ])
+        if draft.pk is not None:
+            draft.delete()
+    return plan
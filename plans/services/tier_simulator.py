@@ -0,0 +1,110 @@
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+from ..models import ImprovementPlan, determine_tier, estimate_addition_amount, resolve_tier_rates
+
+# 判定条件のビット（キャリアパス要件I・II・III、職場環境等要件の全区分充足）
+CAREER_PATH_BITS = {1: 0b0001, 2: 0b0010, 3: 0b0100}
+WORKPLACE_BIT = 0b1000
+
+
+def _tier_for_mask(mask):
+    workplace = 1 if mask & WORKPLACE_BIT else 0
+    return determine_tier(
+        bool(mask & CAREER_PATH_BITS[1]), bool(mask & CAREER_PATH_BITS[2]), bool(mask & CAREER_PATH_BITS[3]),
+        workplace, workplace, workplace,
+    )
+
+
+# 16通りの条件の組み合わせ → 加算区分（determine_tier の結果を先に表にしておく）
+TIER_TABLE = [_tier_for_mask(mask) for mask in range(16)]
+
+
+@dataclass
+class Scenario:
+    """シミュレーションの条件"""
+    name: str
+    # キャリアパス要件番号 → 全計画で満たす(True)/満たさない(False)
+    career_path: dict = field(default_factory=dict)
+    # 職場環境等要件（各区分1つ以上）を全計画で満たす(True)/満たさない(False)
+    workplace: bool = None
+    # 加算率表の上書き
+    tier_rates: dict = None
+
+
+@dataclass
+class ScenarioResult:
+    """シミュレーション結果"""
+    name: str
+    total_amount: int
+    tier_counts: dict
+    delta: int = 0
+
+
+class TierSimulator:
+    """全計画書の加算区分・加算見込額をシナリオごとに一括試算するサービス"""
+
+    def __init__(self, queryset=None):
+        queryset = ImprovementPlan.objects.all() if queryset is None else queryset
+        rows = queryset.order_by().values_list(
+            'meets_career_path_1', 'meets_career_path_2', 'meets_career_path_3',
+            'qualification_initiatives_count', 'work_style_initiatives_count', 'balance_initiatives_count',
+            'total_service_units', 'target_addition_tier',
+        )
+        # 計画書を列ごとの配列として1回だけ読み込む
+        self.masks = []
+        self.units = []
+        self.target_tiers = []
+        for cp1, cp2, cp3, qualification, work_style, balance, units, target_tier in rows:
+            mask = (
+                (CAREER_PATH_BITS[1] if cp1 else 0)
+                | (CAREER_PATH_BITS[2] if cp2 else 0)
+                | (CAREER_PATH_BITS[3] if cp3 else 0)
+                | (WORKPLACE_BIT if qualification >= 1 and work_style >= 1 and balance >= 1 else 0)
+            )
+            self.masks.append(mask)
+            self.units.append(units)
+            self.target_tiers.append(target_tier)
+
+    def __len__(self):
+        return len(self.masks)
+
+    def _evaluate(self, scenario):
+        set_bits = 0
+        clear_bits = 0
+        for number, met in scenario.career_path.items():
+            if met:
+                set_bits |= CAREER_PATH_BITS[number]
+            else:
+                clear_bits |= CAREER_PATH_BITS[number]
+        if scenario.workplace is True:
+            set_bits |= WORKPLACE_BIT
+        elif scenario.workplace is False:
+            clear_bits |= WORKPLACE_BIT
+
+        # 条件の組み合わせ × 申請区分ごとに単位数をまとめ、区分判定は組み合わせ単位で1回だけ行う
+        groups = defaultdict(list)
+        keep_bits = ~clear_bits
+        for mask, units, target_tier in zip(self.masks, self.units, self.target_tiers):
+            groups[((mask | set_bits) & keep_bits, target_tier)].append(units)
+
+        tier_rates = resolve_tier_rates(scenario.tier_rates)
+        total = 0
+        tier_counts = Counter()
+        for (mask, target_tier), units_list in groups.items():
+            tier = TIER_TABLE[mask]
+            # 判定区分がない場合は申請区分の加算率（ImprovementPlan.calculate_addition_rate と同じ）
+            rate = tier_rates.get(tier or target_tier, 0)
+            total += sum(estimate_addition_amount(units, rate) for units in units_list)
+            tier_counts[tier or '-'] += len(units_list)
+        return ScenarioResult(scenario.name, total, dict(tier_counts))
+
+    def run(self, scenarios):
+        """現状と各シナリオを試算し、現状との差額を付けて返す"""
+        baseline = self._evaluate(Scenario('現状'))
+        results = [baseline]
+        for scenario in scenarios:
+            result = self._evaluate(scenario)
+            result.delta = result.total_amount - baseline.total_amount
+            results.append(result)
+        return results
@@ -0,0 +1,73 @@
+from django.db.models.signals import m2m_changed, pre_delete, pre_save, post_delete, post_save
+from django.dispatch import receiver
+
+from shogu_kaizen_system.master_cache import bump_version
+from .models import ImprovementPlan, WorkplaceInitiative, INITIATIVE_COUNT_FIELDS
+from .services.plan_recompute import refresh_initiative_counts
+
+
+@receiver(m2m_changed, sender=ImprovementPlan.workplace_initiatives.through)
+def refresh_counts_on_initiatives_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """取り組みの追加・削除時に計画書の区分別取り組み数を更新する"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        counts = refresh_initiative_counts([instance.pk]).get(instance.pk, (0, 0, 0))
+        # 呼び出し元のインスタンスにも反映し、後続の save() で古い値に戻らないようにする
+        for field, count in zip(INITIATIVE_COUNT_FIELDS.values(), counts):
+            setattr(instance, field, count)
+    elif action == 'post_clear':
+        refresh_initiative_counts(getattr(instance, '_affected_plan_ids', []))
+    else:
+        refresh_initiative_counts(pk_set)
+
+
+@receiver(m2m_changed, sender=ImprovementPlan.workplace_initiatives.through)
+def remember_plans_before_clear(sender, instance, action, reverse, **kwargs):
+    """取り組み側から clear() される場合に対象の計画書を控えておく"""
+    if reverse and action == 'pre_clear':
+        instance._affected_plan_ids = list(instance.improvementplan_set.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=WorkplaceInitiative)
+def remember_plans_before_delete(sender, instance, **kwargs):
+    """取り組み項目の削除前に、選択している計画書を控えておく"""
+    instance._affected_plan_ids = list(instance.improvementplan_set.values_list('pk', flat=True))
+
+
+@receiver(pre_save, sender=WorkplaceInitiative)
+def remember_category_before_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """区分が変わったかを判定するため、保存前の区分を控えておく"""
+    instance._previous_category = None
+    if raw or instance.pk is None or (update_fields is not None and 'category' not in update_fields):
+        return
+    instance._previous_category = sender.objects.filter(pk=instance.pk).values_list('category', flat=True).first()
+
+
+def _refresh_plans_of(instance):
+    """取り組み項目を選択している計画書（削除時は削除前に控えたもの）の取り組み数を更新する"""
+    plan_ids = getattr(instance, '_affected_plan_ids', None)
+    if plan_ids is None:
+        plan_ids = list(instance.improvementplan_set.values_list('pk', flat=True))
+    if plan_ids:
+        refresh_initiative_counts(plan_ids)
+
+
+@receiver(post_save, sender=WorkplaceInitiative)
+def refresh_counts_on_category_change(sender, instance, **kwargs):
+    """取り組み項目の区分変更時に、選択している計画書の取り組み数を更新する（説明文だけの変更では何もしない）"""
+    previous = getattr(instance, '_previous_category', None)
+    if previous is not None and previous != instance.category:
+        _refresh_plans_of(instance)
+
+
+@receiver(post_delete, sender=WorkplaceInitiative)
+def refresh_counts_on_initiative_delete(sender, instance, **kwargs):
+    """取り組み項目の削除時に、選択していた計画書の取り組み数を更新する"""
+    _refresh_plans_of(instance)
+
+
+@receiver([post_save, post_delete], sender=WorkplaceInitiative)
+def invalidate_initiative_master_cache(sender, instance, **kwargs):
+    """取り組み項目の変更時にマスタデータのキャッシュを破棄する"""
+    bump_version('workplace_initiatives')
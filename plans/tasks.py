@@ -0,0 +1,52 @@
+"""
+バックグラウンド処理（jobs のワーカーが実行する）
+"""
+from django.urls import reverse
+
+from jobs.registry import task
+from .models import ImprovementPlan, PlanWizardDraft
+from .services.plan_recompute import recompute_plans
+from .services.plan_wizard import commit_draft
+
+# 再計算の進捗を記録する単位（計画書の件数）
+RECOMPUTE_BATCH_SIZE = 1000
+
+
+@task('plans.commit_wizard_draft', label='処遇改善計画書の作成', back_url='/plan-wizard/?step=5')
+def commit_wizard_draft(job, draft_id):
+    """
+    ウィザードの下書きから計画書を作成する。
+    下書きは作成に成功した時点で削除されるため、失敗した場合は入力画面から続けられる。
+    """
+    plan = commit_draft(PlanWizardDraft.objects.get(pk=draft_id))
+    return {
+        'message': '処遇改善計画書を作成しました。',
+        'url': reverse('plan_detail', args=[plan.id]),
+        'link_label': '計画書を表示',
+        'plan_id': plan.id,
+    }
+
+
+@task('plans.recompute_plans', label='計画書の再計算')
+def recompute(job, plan_ids=None, fiscal_year=None, provider_id=None, tier_rates=None):
+    """計画書の取り組み数・加算区分・加算見込額を、一定件数ずつ再計算する"""
+    plans = ImprovementPlan.objects.order_by('id')
+    if plan_ids is not None:
+        plans = plans.filter(pk__in=plan_ids)
+    if fiscal_year:
+        plans = plans.filter(fiscal_year=fiscal_year)
+    if provider_id:
+        plans = plans.filter(provider_id=provider_id)
+    ids = list(plans.values_list('id', flat=True))
+
+    count = 0
+    for start in range(0, len(ids), RECOMPUTE_BATCH_SIZE):
+        batch = ids[start:start + RECOMPUTE_BATCH_SIZE]
+        count += recompute_plans(ImprovementPlan.objects.filter(pk__in=batch), tier_rates=tier_rates)
+        job.report_progress(start + len(batch), len(ids), f'{start + len(batch)} / {len(ids)} 件')
+    return {
+        'message': f'{count}件の計画書を再計算しました。',
+        'url': reverse('plan_list'),
+        'link_label': '計画書一覧へ',
+        'count': count,
+    }
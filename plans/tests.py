@@ -1,3 +1,328 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from facility_management.models import Provider, Facility
+from jobs.services.queue import run_pending
+from shogu_kaizen_system.testing import QueryPlanAssertionsMixin
+from .models import ImprovementPlan, PlanWizardDraft, WorkplaceInitiative, parse_tier_rates
+from .services.initiative_loader import load_workplace_initiatives
+from .services.plan_recompute import recompute_plans
+from .services.tier_simulator import TierSimulator, Scenario
+from .services.plan_wizard import SESSION_KEY
+from .services.plan_listing import plan_list_queryset, paginate_plans
+
+
+class PlanRecomputeTests(TestCase):
+    """計画書の一括再計算が個別計算と同じ結果になることを確認する"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        cls.initiatives = {
+            category: WorkplaceInitiative.objects.create(category=category, item_number=f'{i}-1', description='-')
+            for i, (category, _) in enumerate(WorkplaceInitiative.CATEGORY_CHOICES, start=1)
+        }
+
+    def _plan(self, categories, **flags):
+        plan = ImprovementPlan.objects.create(
+            provider=self.provider, target_addition_tier='I', total_service_units=1000000, **flags
+        )
+        plan.workplace_initiatives.set([self.initiatives[category] for category in categories])
+        return plan
+
+    def test_bulk_recompute_matches_per_plan_logic(self):
+        full = self._plan(['qualification', 'work_style', 'balance'],
+                          meets_career_path_1=True, meets_career_path_2=True, meets_career_path_3=True)
+        partial = self._plan(['qualification'], meets_career_path_1=True, meets_career_path_2=True)
+        none = self._plan([])
+
+        # 読み込み・集計・更新の3クエリ（＋トランザクションのセーブポイント2つ）
+        with self.assertNumQueries(5):
+            self.assertEqual(recompute_plans(), 3)
+
+        full.refresh_from_db()
+        partial.refresh_from_db()
+        none.refresh_from_db()
+        self.assertEqual((full.determined_addition_tier, full.estimated_addition_amount), ('I', 1650000))
+        self.assertEqual((partial.qualification_initiatives_count, partial.determined_addition_tier), (1, 'III'))
+        self.assertEqual(partial.estimated_addition_amount, 590000)
+        # 要件を満たさない場合は申請区分の加算率で見込額を出す（従来の計算と同じ）
+        self.assertEqual((none.determined_addition_tier, none.estimated_addition_amount), ('', 1650000))
+
+    def test_rate_override(self):
+        plan = self._plan(['qualification', 'work_style', 'balance'],
+                          meets_career_path_1=True, meets_career_path_2=True, meets_career_path_3=True)
+        recompute_plans(ImprovementPlan.objects.filter(pk=plan.pk), tier_rates={'I': 20.0})
+        plan.refresh_from_db()
+        self.assertEqual(plan.estimated_addition_amount, 2000000)
+
+    def test_partial_rate_override_keeps_other_tiers(self):
+        full = self._plan(['qualification', 'work_style', 'balance'],
+                          meets_career_path_1=True, meets_career_path_2=True, meets_career_path_3=True)
+        partial = self._plan(['qualification'], meets_career_path_1=True, meets_career_path_2=True)
+        recompute_plans(tier_rates={'I': 17.0})
+        full.refresh_from_db()
+        partial.refresh_from_db()
+        self.assertEqual((full.addition_rate, full.estimated_addition_amount), (Decimal('17.00'), 1700000))
+        # 上書きしていない区分は標準の加算率のまま
+        self.assertEqual((partial.addition_rate, partial.estimated_addition_amount), (Decimal('5.90'), 590000))
+
+
+class TierSimulatorTests(TestCase):
+    """加算区分シミュレーションが計画書ごとの計算と一致することを確認する"""
+
+    def test_scenarios_match_per_plan_calculation(self):
+        provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        ImprovementPlan.objects.create(
+            provider=provider, target_addition_tier='I', total_service_units=1000000,
+            meets_career_path_1=True, meets_career_path_2=True,
+            qualification_initiatives_count=1, work_style_initiatives_count=1, balance_initiatives_count=1,
+        )
+        ImprovementPlan.objects.create(provider=provider, target_addition_tier='IV', total_service_units=500000)
+
+        with self.assertNumQueries(1):
+            simulator = TierSimulator()
+        baseline, all_cp3, new_rate, partial_rate = simulator.run([
+            Scenario('要件III', career_path={3: True}),
+            Scenario('加算率', tier_rates={'I': 16.5, 'II': 14.0, 'IV': 7.0}),
+            Scenario('区分IVのみ変更', tier_rates={'IV': 7.0}),
+        ])
+
+        expected = 0
+        for plan in ImprovementPlan.objects.all():
+            plan.determined_addition_tier = plan.determine_eligible_tier() or ''
+            expected += plan.calculate_estimated_amount(commit=False)
+        self.assertEqual(baseline.total_amount, expected)
+        self.assertEqual(baseline.tier_counts, {'II': 1, '-': 1})
+        # 要件IIIを満たすと1件目は区分IIから区分Iに上がる
+        self.assertEqual(all_cp3.tier_counts, {'I': 1, '-': 1})
+        self.assertEqual(all_cp3.delta, 1650000 - 1370000)
+        self.assertEqual(new_rate.total_amount, 1400000 + 350000)
+        # 変更しなかった区分（II）は標準の加算率で試算する
+        self.assertEqual(partial_rate.total_amount, 1370000 + 350000)
+        self.assertEqual(partial_rate.delta, 350000 - 165000)
+
+    def test_rate_option_rejects_invalid_values(self):
+        self.assertEqual(parse_tier_rates(['IV=7.0'])['IV'], 7.0)
+        self.assertEqual(parse_tier_rates(['IV=7.0'])['I'], 16.5)
+        for command in ('simulate_tiers', 'recompute_plans'):
+            for value in ('V=1', 'I=abc', 'I=nan', 'I=inf', 'I=-1'):
+                with self.subTest(command=command, value=value), self.assertRaises(CommandError):
+                    call_command(command, rate=[value], stdout=StringIO())
+
+
+class InitiativeCountSignalTests(TestCase):
+    """取り組みの選択変更に区分別取り組み数が追従することを確認する"""
+
+    def setUp(self):
+        provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        self.plan = ImprovementPlan.objects.create(provider=provider, target_addition_tier='I')
+        self.qualification = WorkplaceInitiative.objects.create(category='qualification', item_number='1-1', description='-')
+        self.balance = WorkplaceInitiative.objects.create(category='balance', item_number='3-1', description='-')
+
+    def _stored_counts(self):
+        return ImprovementPlan.objects.values_list(
+            'qualification_initiatives_count', 'work_style_initiatives_count', 'balance_initiatives_count'
+        ).get(pk=self.plan.pk)
+
+    def test_counts_follow_m2m_changes(self):
+        self.plan.workplace_initiatives.add(self.qualification, self.balance)
+        self.assertEqual(self._stored_counts(), (1, 0, 1))
+        self.assertEqual(self.plan.balance_initiatives_count, 1)
+
+        self.balance.improvementplan_set.remove(self.plan)
+        self.assertEqual(self._stored_counts(), (1, 0, 0))
+
+        self.qualification.delete()
+        self.assertEqual(self._stored_counts(), (0, 0, 0))
+
+    def test_counts_follow_category_change_only(self):
+        self.plan.workplace_initiatives.add(self.qualification, self.balance)
+
+        # 説明文だけの変更では計画書を再集計しない（保存前の区分の取得と UPDATE のみ）
+        self.balance.description = '面談の実施'
+        with self.assertNumQueries(2):
+            self.balance.save()
+        with self.assertNumQueries(1):
+            self.balance.save(update_fields=['description'])
+
+        self.balance.category = 'work_style'
+        self.balance.save()
+        self.assertEqual(self._stored_counts(), (1, 1, 0))
+
+    def test_count_by_category_is_one_query(self):
+        self.plan.workplace_initiatives.add(self.qualification, self.balance)
+        with self.assertNumQueries(1):
+            counts = self.plan.count_initiatives_by_category()
+        self.assertEqual(counts, {
+            'qualification_initiatives_count': 1,
+            'work_style_initiatives_count': 0,
+            'balance_initiatives_count': 1,
+        })
+
+    def test_seed_loader_keeps_selections_and_refreshes_counts(self):
+        # 項目番号 3-1 の区分を変えておき、投入で正しい区分に戻ることを確認する
+        WorkplaceInitiative.objects.filter(pk=self.balance.pk).update(category='work_style')
+        self.plan.workplace_initiatives.add(self.qualification, self.balance)
+        self.assertEqual(self._stored_counts(), (1, 1, 0))
+
+        # 項目数によらず、upsert・再取得・対象計画書の抽出・取り組み数の集計と更新（＋セーブポイント）
+        with self.assertNumQueries(7):
+            count = load_workplace_initiatives()
+        self.assertEqual(WorkplaceInitiative.objects.count(), count)
+        self.assertEqual(self.plan.workplace_initiatives.count(), 2)
+        self.assertEqual(self._stored_counts(), (1, 0, 1))
+
+
+class PlanWizardDraftTests(TestCase):
+    """ウィザードの入力が下書き1件に保存され、最後に一括登録されることを確認する"""
+
+    def _fill_draft(self):
+        provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        facilities = [
+            Facility.objects.create(
+                provider=provider, name=f'事業所{i}', service_type='day_service',
+                facility_number=f'13000000{i}', address='東京都千代田区1-1',
+            )
+            for i in range(3)
+        ]
+        initiatives = [
+            WorkplaceInitiative.objects.create(category=category, item_number=f'{i}-1', description='-')
+            for i, (category, _) in enumerate(WorkplaceInitiative.CATEGORY_CHOICES, start=1)
+        ]
+
+        self.client.post('/plan-wizard/?step=1', {
+            'provider_id': provider.id, 'fiscal_year': '2025', 'target_tier': 'I',
+            'facility_ids': [facility.id for facility in facilities],
+        })
+        self.client.post('/plan-wizard/?step=2', {'career_path_1': 'on', 'career_path_2': 'on'})
+        self.client.post('/plan-wizard/?step=3', {'workplace_initiatives': [i.id for i in initiatives]})
+        self.client.post('/plan-wizard/?step=4', {'total_service_units': '1000000'})
+
+    @override_settings(JOBS_WORKER_ENABLED=True)
+    def test_wizard_keeps_single_draft_and_commits_in_bulk(self):
+        self._fill_draft()
+        self.assertEqual(PlanWizardDraft.objects.count(), 1)
+        self.assertEqual(self.client.session[SESSION_KEY], PlanWizardDraft.objects.get().pk)
+
+        response = self.client.post('/plan-wizard/?step=5')
+        # 計画書の作成はワーカーで行う
+        self.assertFalse(ImprovementPlan.objects.exists())
+        self.assertEqual(run_pending(), 1)
+        status = self.client.get(response['Location'])
+        self.assertContains(status, '処遇改善計画書を作成しました。')
+        plan = ImprovementPlan.objects.get()
+        self.assertEqual(plan.target_facilities.count(), 3)
+        self.assertEqual(plan.count_initiatives_by_category(), {
+            'qualification_initiatives_count': 1, 'work_style_initiatives_count': 1, 'balance_initiatives_count': 1,
+        })
+        self.assertEqual((plan.balance_initiatives_count, plan.determined_addition_tier), (1, 'II'))
+        self.assertEqual(plan.estimated_addition_amount, 1370000)
+        self.assertFalse(PlanWizardDraft.objects.exists())
+        # 次に開いたときは新しい下書きから始まる
+        self.assertEqual(self.client.get('/plan-wizard/?step=1').status_code, 200)
+        self.client.post('/plan-wizard/?step=4', {'total_service_units': '500'})
+        self.assertEqual(PlanWizardDraft.objects.get().data, {'total_service_units': '500'})
+
+    def test_expired_drafts_are_ignored_and_pruned(self):
+        self.client.post('/plan-wizard/?step=4', {'total_service_units': '1000'})
+        expired = PlanWizardDraft.objects.get()
+        fresh = PlanWizardDraft.objects.create(data={'total_service_units': '2000'})
+        PlanWizardDraft.objects.filter(pk=expired.pk).update(
+            updated_at=timezone.now() - timedelta(seconds=settings.SESSION_COOKIE_AGE + 60),
+        )
+
+        # 期限切れの下書きは開かず、新しい下書きから始める
+        self.client.post('/plan-wizard/?step=4', {'total_service_units': '3000'})
+        self.assertNotEqual(self.client.session[SESSION_KEY], expired.pk)
+        call_command('prune_wizard_drafts', stdout=StringIO())
+        units = sorted(draft.data['total_service_units'] for draft in PlanWizardDraft.objects.all())
+        self.assertEqual(units, ['2000', '3000'])
+        self.assertTrue(PlanWizardDraft.objects.filter(pk=fresh.pk).exists())
+
+    def test_failed_commit_keeps_draft(self):
+        self._fill_draft()
+        draft = PlanWizardDraft.objects.get()
+        with mock.patch('plans.tasks.commit_draft', side_effect=ValueError('入力内容が不正です')):
+            response = self.client.post('/plan-wizard/?step=5')
+        # ワーカーなしではその場で実行され、再実行しても変わらない例外はすぐに失敗になる
+        status = self.client.get(response['Location'])
+        self.assertContains(status, 'href="/plan-wizard/?step=5"')
+        self.assertEqual(self.client.session[SESSION_KEY], draft.pk)
+        self.assertEqual(PlanWizardDraft.objects.get().data, draft.data)
+        self.assertFalse(ImprovementPlan.objects.exists())
+
+
+class PlanListPaginationTests(TestCase):
+    """計画書一覧のキーセットページングを確認する"""
+
+    def test_pages_follow_list_ordering_without_gaps(self):
+        provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        for fiscal_year in [2024, 2025, 2025, 2026, 2024]:
+            ImprovementPlan.objects.create(provider=provider, fiscal_year=fiscal_year, target_addition_tier='I')
+        expected = list(ImprovementPlan.objects.order_by('-fiscal_year', '-created_at', '-id').values_list('id', flat=True))
+
+        seen = []
+        cursor = None
+        while True:
+            # 事業者名・件数を含めて1ページ1クエリ
+            with self.assertNumQueries(1):
+                page = paginate_plans(plan_list_queryset(), cursor, page_size=2)
+                names = [plan.provider.name for plan in page.plans]
+            self.assertEqual(names, ['テスト法人'] * len(page.plans))
+            seen.extend(plan.id for plan in page.plans)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, expected)
+
+        self.assertContains(self.client.get(f'/plans/{seen[0]}/'), 'テスト法人')
+
+        # 不正なカーソルは先頭ページとして扱う
+        self.assertTrue(paginate_plans(plan_list_queryset(), 'broken').is_first)
+        response = self.client.get('/plans/', {'cursor': 'broken'})
+        self.assertEqual(response.status_code, 200)
+
+
+class PlanQueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    """計画書の主な絞り込みが全件走査にならないことを実行計画で確認する"""
+
+    def test_provider_and_year_filter_uses_index(self):
+        self.assertNoFullScan(ImprovementPlan.objects.filter(provider_id=1, fiscal_year=2025))
+
+    def test_list_page_uses_keyset_index(self):
+        through_models = [ImprovementPlan.target_facilities.through, ImprovementPlan.workplace_initiatives.through]
+        self.assertNoFullScan(plan_list_queryset()[:50], ImprovementPlan, *through_models)
+
+        # 2ページ目以降は、実際のカーソルから組み立てたクエリがカーソル位置からインデックスを引く
+        provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        for fiscal_year in [2024, 2025, 2025, 2026]:
+            ImprovementPlan.objects.create(provider=provider, fiscal_year=fiscal_year, target_addition_tier='I')
+        first = paginate_plans(plan_list_queryset(), page_size=2)
+        with CaptureQueriesContext(connection) as context:
+            paginate_plans(plan_list_queryset(), first.next_cursor, page_size=2)
+        self.assertSearchesIndex(context.captured_queries[-1]['sql'], ImprovementPlan, 'plans_list_keyset_idx')
+
+
+class WizardMasterCacheTests(TestCase):
+    """ウィザードのマスタデータがキャッシュされ、変更時に更新されることを確認する"""
+
+    def test_initiative_list_is_cached_until_changed(self):
+        WorkplaceInitiative.objects.create(category='qualification', item_number='1-1', description='研修の実施')
+        self.client.get('/plan-wizard/?step=3')
+        with self.assertNumQueries(0):
+            response = self.client.get('/plan-wizard/?step=3')
+        self.assertContains(response, '研修の実施')
+
+        WorkplaceInitiative.objects.create(category='balance', item_number='3-1', description='面談の実施')
+        self.assertContains(self.client.get('/plan-wizard/?step=3'), '面談の実施')
 
-# Create your tests here.
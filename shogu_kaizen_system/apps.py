@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class ShoguKaizenSystemConfig(AppConfig):
+    """プロジェクト全体の設定（アプリに属さない DB 接続の設定などを登録する）"""
+    name = 'shogu_kaizen_system'
+    verbose_name = '処遇改善システム'
+
+    def ready(self):
+        from .sqlite_tuning import tune_sqlite_connection
+        connection_created.connect(tune_sqlite_connection, dispatch_uid='tune_sqlite_connection')
@@ -5,12 +5,37 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+WhiteNoise のミドルウェアは同期専用で、MIDDLEWARE に含めると全リクエスト（非同期ビューを含む）が
+スレッドで処理される。ASGI では settings からミドルウェアを外し、/static/ へのリクエストだけを
+WhiteNoise（WSGI アプリをスレッドで実行）に振り分ける。
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
-
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'shogu_kaizen_system.settings')
+os.environ['DJANGO_SERVER_INTERFACE'] = 'asgi'
+
+from asgiref.wsgi import WsgiToAsgi  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.core.asgi import get_asgi_application  # noqa: E402
+from whitenoise import WhiteNoise  # noqa: E402
+
+django_application = get_asgi_application()
+
+
+def _static_not_found(environ, start_response):
+    start_response('404 Not Found', [('Content-Type', 'text/plain; charset=utf-8')])
+    return [b'Not Found']
+
+
+static_application = WsgiToAsgi(
+    WhiteNoise(_static_not_found, root=settings.STATIC_ROOT, prefix=settings.STATIC_URL)
+)
+
 
-application = get_asgi_application()
+async def application(scope, receive, send):
+    """静的ファイルは WhiteNoise、それ以外は Django（非同期のまま）で処理する"""
+    if scope['type'] == 'http' and scope['path'].startswith(settings.STATIC_URL):
+        return await static_application(scope, receive, send)
+    return await django_application(scope, receive, send)
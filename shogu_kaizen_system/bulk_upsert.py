@@ -0,0 +1,81 @@
+"""
+自然キーによる一括登録・更新（upsert）
+
+自然キーに一意制約がある場合は bulk_create(update_conflicts=True) の1文で登録・更新する。
+一意制約がない場合（事業者名・研修名など）は、登録済みの行を1回のクエリで照合し、
+bulk_update と bulk_create に振り分ける。
+いずれも bulk 操作のためシグナルは発火しない。呼び出し元で索引やキャッシュを更新すること。
+"""
+from django.db.models import Q
+
+
+def _has_unique_constraint(model, unique_fields):
+    """unique_fields の組み合わせにデータベースの一意制約があるか"""
+    opts = model._meta
+    wanted = set(unique_fields)
+    if len(wanted) == 1 and opts.get_field(unique_fields[0]).unique:
+        return True
+    if any(set(fields) == wanted for fields in opts.unique_together):
+        return True
+    return any(
+        set(getattr(constraint, 'fields', ())) == wanted and getattr(constraint, 'condition', None) is None
+        for constraint in opts.constraints
+    )
+
+
+def _key(obj, attnames):
+    return tuple(getattr(obj, attname) for attname in attnames)
+
+
+def _fetch(model, objs, attnames):
+    """自然キー → 登録済みインスタンス（1クエリ）"""
+    if len(attnames) == 1:
+        condition = Q(**{f'{attnames[0]}__in': {getattr(obj, attnames[0]) for obj in objs}})
+    else:
+        condition = Q()
+        for obj in objs:
+            condition |= Q(**dict(zip(attnames, _key(obj, attnames))))
+    return {_key(obj, attnames): obj for obj in model.objects.filter(condition).order_by()}
+
+
+def bulk_upsert(model, objs, unique_fields, update_fields=None):
+    """
+    objs を自然キー unique_fields で登録・更新し、自然キー（attname の値のタプル）→ 保存済みインスタンスを返す。
+    update_fields を省略した場合は、自然キーと作成日時以外のすべての列を更新する。
+    """
+    objs = list(objs)
+    if not objs:
+        return {}
+    opts = model._meta
+    attnames = [opts.get_field(name).attname for name in unique_fields]
+    if update_fields is None:
+        update_fields = [
+            field.name for field in opts.concrete_fields
+            if not field.primary_key and field.name not in unique_fields and not getattr(field, 'auto_now_add', False)
+        ]
+
+    if _has_unique_constraint(model, unique_fields):
+        model.objects.bulk_create(
+            objs, update_conflicts=True, unique_fields=unique_fields, update_fields=update_fields,
+        )
+        return _fetch(model, objs, attnames)
+
+    existing = _fetch(model, objs, attnames)
+    to_update = []
+    to_create = []
+    for obj in objs:
+        current = existing.get(_key(obj, attnames))
+        if current is None:
+            to_create.append(obj)
+        else:
+            obj.pk = current.pk
+            to_update.append(obj)
+    for field in opts.concrete_fields:
+        # bulk_update では auto_now が効かないため明示的に設定する
+        if getattr(field, 'auto_now', False) and field.name in update_fields:
+            for obj in to_update:
+                field.pre_save(obj, add=False)
+    if to_update:
+        model.objects.bulk_update(to_update, update_fields)
+    model.objects.bulk_create(to_create)
+    return {**existing, **{_key(obj, attnames): obj for obj in objs}}
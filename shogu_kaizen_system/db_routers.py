@@ -0,0 +1,105 @@
+"""
+データベースルーター
+
+DATABASE_REPLICA_URL が設定されている場合に settings.DATABASE_ROUTERS へ登録され、
+読み込みを 'replica'、書き込み・マイグレーションを 'default' に振り分ける。
+書き込みを行ったクライアントは PrimaryPinningMiddleware により DATABASE_REPLICA_PIN_SECONDS 秒間
+プライマリから読み、レプリケーション遅延で直前に保存した内容が見えなくなることを防ぐ。
+"""
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+REPLICA_ALIAS = 'replica'
+
+# 書き込み直後に読み直すため、レプリケーション遅延の影響を受けないよう常にプライマリから読むモデル
+PRIMARY_READ_MODELS = {
+    'sessions.session',
+    'plans.planwizarddraft',
+}
+
+# 書き込み後、プライマリから読む期間を示すクッキー
+PIN_COOKIE = 'db_pin_primary'
+
+# 処理中のリクエストの状態（プライマリに固定するか、書き込みを行ったか）
+_request_state = ContextVar('db_router_request_state', default=None)
+
+
+class PrimaryReplicaRouter:
+    """読み込みをレプリカへ振り分けるルーター"""
+
+    def db_for_read(self, model, **hints):
+        # レプリカが設定されていない場合は単一DBとして動く
+        if REPLICA_ALIAS not in connections.settings:
+            return 'default'
+        if model._meta.label_lower in PRIMARY_READ_MODELS:
+            return 'default'
+        # トランザクション中はプライマリで書いた内容をそのまま読む
+        if connections['default'].in_atomic_block:
+            return 'default'
+        state = _request_state.get()
+        if state is not None and state['pinned']:
+            return 'default'
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            # このリクエストの残りと、以降の一定時間のリクエストはプライマリから読む
+            state['pinned'] = state['wrote'] = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # レプリカはプライマリの複製なので同一DBとして扱う
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class PrimaryPinningMiddleware:
+    """
+    書き込みを行ったクライアントの読み込みを、一定時間プライマリに固定するミドルウェア。
+    ASGI で非同期ビューをスレッドに移さないよう、同期・非同期の両方に対応する。
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state, token = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self._finish(state, response)
+
+    async def __acall__(self, request):
+        state, token = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self._finish(state, response)
+
+    def _start(self, request):
+        # ORM を実行するスレッドからも更新できるよう、状態は辞書で共有する
+        state = {'pinned': PIN_COOKIE in request.COOKIES, 'wrote': False}
+        return state, _request_state.set(state)
+
+    def _finish(self, state, response):
+        if state['wrote']:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.DATABASE_REPLICA_PIN_SECONDS, httponly=True,
+                secure=settings.SESSION_COOKIE_SECURE, samesite='Lax',
+            )
+        return response
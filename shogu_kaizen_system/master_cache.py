@@ -0,0 +1,34 @@
+"""
+マスタデータのキャッシュ
+
+キャッシュキーにバージョンを含め、データの保存・削除時（signals）にバージョンを更新して
+古いキャッシュを参照しないようにする。バージョンには時刻を使うため、
+バージョンのキーが追い出されても過去のキーと衝突しない。
+"""
+import time
+
+from django.core.cache import cache
+
+VERSION_KEY = 'cache_version:{}'
+MASTER_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_version(name):
+    """キャッシュのバージョンを返す（未設定なら新しく採番する）"""
+    return cache.get_or_set(VERSION_KEY.format(name), time.time_ns, None)
+
+
+def bump_version(*names):
+    """キャッシュのバージョンを更新し、既存のキャッシュを参照されないようにする"""
+    version = time.time_ns()
+    cache.set_many({VERSION_KEY.format(name): version for name in names}, None)
+
+
+def versioned_key(name, *parts):
+    """バージョンを含むキャッシュキー"""
+    return ':'.join(str(part) for part in (name, get_version(name), *parts))
+
+
+def cached_list(name, queryset, timeout=MASTER_CACHE_TIMEOUT):
+    """クエリセットの結果をリストとしてキャッシュする（キャッシュがない場合のみクエリを実行）"""
+    return cache.get_or_set(versioned_key(name), lambda: list(queryset), timeout)
@@ -0,0 +1,239 @@
+"""
+リクエスト単位のプロファイリング
+
+settings.REQUEST_PROFILING が有効な場合に MIDDLEWARE へ追加され、リクエストごとに
+SQL の件数・時間、テンプレート描画時間、それ以外の Python 処理時間を計測する。
+結果は Server-Timing ヘッダーと、スタッフ向けの集計画面（直近のリクエスト）で確認できる。
+"""
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.shortcuts import render
+from django.template.base import Template
+
+# 集計画面に残す直近のリクエスト数
+HISTORY_SIZE = 200
+# 同じSQLがこの回数以上実行されたら N+1 の疑いとして扱う
+DUPLICATE_THRESHOLD = 3
+
+_current = ContextVar('request_profile', default=None)
+_history = deque(maxlen=HISTORY_SIZE)
+_history_lock = threading.Lock()
+
+
+@dataclass
+class RequestProfile:
+    """1リクエスト分の計測結果"""
+    method: str
+    path: str
+    started: float = field(default_factory=time.perf_counter)
+    view_name: str = ''
+    status_code: int = 0
+    total_ms: float = 0.0
+    sql_ms: float = 0.0
+    template_ms: float = 0.0
+    # テンプレート描画中に実行されたSQLの時間（Python時間の計算で二重に引かないため）
+    template_sql_ms: float = 0.0
+    template_depth: int = 0
+    queries: Counter = field(default_factory=Counter)
+
+    @property
+    def sql_count(self):
+        return sum(self.queries.values())
+
+    @property
+    def python_ms(self):
+        return max(self.total_ms - self.sql_ms - (self.template_ms - self.template_sql_ms), 0.0)
+
+    @property
+    def duplicates(self):
+        """N+1 の疑いがあるSQL（SQL文, 実行回数）"""
+        return [(sql, count) for sql, count in self.queries.most_common() if count >= DUPLICATE_THRESHOLD]
+
+    def server_timing(self):
+        """Server-Timing ヘッダーの値（ヘッダーは ASCII のみのため説明は英語）"""
+        return ', '.join([
+            f'sql;dur={self.sql_ms:.1f};desc="{self.sql_count} queries, {len(self.duplicates)} duplicated"',
+            f'tpl;dur={self.template_ms:.1f};desc="templates"',
+            f'py;dur={self.python_ms:.1f};desc="python"',
+            f'total;dur={self.total_ms:.1f}',
+        ])
+
+
+def _record_query(execute, sql, params, many, context):
+    """connection.execute_wrapper から呼ばれ、SQLの実行時間を記録する"""
+    profile = _current.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if profile is not None:
+            elapsed = (time.perf_counter() - started) * 1000
+            profile.sql_ms += elapsed
+            if profile.template_depth:
+                profile.template_sql_ms += elapsed
+            # パラメータを除いたSQL文で数え、同じ形のクエリの繰り返しを検出する
+            profile.queries[sql] += 1
+
+
+# 計測中のリクエストがある間だけ Template._render を差し替える（差し替え前の関数と計測中のリクエスト数）
+_original_template_render = Template._render
+_template_patch_count = 0
+_template_patch_lock = threading.Lock()
+
+
+def _profiled_template_render(self, context):
+    """Template._render を包み、最も外側のテンプレートの描画時間を記録する"""
+    profile = _current.get()
+    if profile is None:
+        return _original_template_render(self, context)
+    profile.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_template_render(self, context)
+    finally:
+        profile.template_depth -= 1
+        if not profile.template_depth:
+            profile.template_ms += (time.perf_counter() - started) * 1000
+
+
+def recent_profiles():
+    """直近のリクエストの計測結果（新しい順）"""
+    with _history_lock:
+        return list(reversed(_history))
+
+
+class RequestProfilingMiddleware:
+    """
+    リクエストごとの SQL・テンプレート・Python 時間を計測するミドルウェア。
+    ASGI では非同期ビューをスレッドに移さずに処理できるよう、同期・非同期の両方に対応する。
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        profile = RequestProfile(method=request.method, path=request.path)
+        token = _current.set(profile)
+        try:
+            with _wrap_all_connections(), _profile_templates():
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, profile, response)
+
+    async def __acall__(self, request):
+        profile = RequestProfile(method=request.method, path=request.path)
+        token = _current.set(profile)
+        # 非同期ビューの ORM はリクエスト専用のスレッドで実行されるため、そのスレッドの接続に設定する
+        wrapper = _wrap_all_connections()
+        await sync_to_async(wrapper.__enter__)()
+        try:
+            with _profile_templates():
+                response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrapper.__exit__)(None, None, None)
+            _current.reset(token)
+        return self._finish(request, profile, response)
+
+    def _finish(self, request, profile, response):
+        profile.total_ms = (time.perf_counter() - profile.started) * 1000
+        profile.status_code = response.status_code
+        match = getattr(request, 'resolver_match', None)
+        profile.view_name = match.view_name if match else ''
+        response['Server-Timing'] = profile.server_timing()
+        with _history_lock:
+            _history.append(profile)
+        return response
+
+
+class _wrap_all_connections:
+    """全DB接続に execute_wrapper を設定するコンテキストマネージャー"""
+
+    def __enter__(self):
+        self._contexts = [connection.execute_wrapper(_record_query) for connection in connections.all()]
+        for context in self._contexts:
+            context.__enter__()
+
+    def __exit__(self, *exc_info):
+        for context in reversed(self._contexts):
+            context.__exit__(*exc_info)
+
+
+class _profile_templates:
+    """
+    計測中のリクエストがある間だけ Template._render を計測用に差し替えるコンテキストマネージャー。
+    同時に処理中の計測対象リクエストを数え、最後のリクエストが終わったら元に戻す。
+    """
+
+    def __enter__(self):
+        global _original_template_render, _template_patch_count
+        with _template_patch_lock:
+            if not _template_patch_count:
+                _original_template_render = Template._render
+                Template._render = _profiled_template_render
+            _template_patch_count += 1
+
+    def __exit__(self, *exc_info):
+        global _template_patch_count
+        with _template_patch_lock:
+            _template_patch_count -= 1
+            if not _template_patch_count:
+                Template._render = _original_template_render
+
+
+@staff_member_required
+def profiling_summary(request):
+    """直近のリクエストの計測結果をビュー単位で集計する（スタッフのみ）"""
+    profiles = recent_profiles()
+    by_view = {}
+    for profile in profiles:
+        row = by_view.setdefault(profile.view_name or profile.path, {
+            'name': profile.view_name or profile.path, 'count': 0,
+            'total_ms': 0.0, 'sql_ms': 0.0, 'template_ms': 0.0, 'python_ms': 0.0, 'sql_count': 0,
+            'max_ms': 0.0, 'duplicates': Counter(),
+        })
+        row['count'] += 1
+        row['total_ms'] += profile.total_ms
+        row['sql_ms'] += profile.sql_ms
+        row['template_ms'] += profile.template_ms
+        row['python_ms'] += profile.python_ms
+        row['sql_count'] += profile.sql_count
+        row['max_ms'] = max(row['max_ms'], profile.total_ms)
+        for sql, count in profile.duplicates:
+            row['duplicates'][sql] = max(row['duplicates'][sql], count)
+
+    views = []
+    for row in by_view.values():
+        count = row['count']
+        views.append({
+            'name': row['name'],
+            'count': count,
+            'avg_ms': row['total_ms'] / count,
+            'max_ms': row['max_ms'],
+            'avg_sql_ms': row['sql_ms'] / count,
+            'avg_sql_count': row['sql_count'] / count,
+            'avg_template_ms': row['template_ms'] / count,
+            'avg_python_ms': row['python_ms'] / count,
+            'duplicates': row['duplicates'].most_common(5),
+        })
+    views.sort(key=lambda view: view['avg_ms'], reverse=True)
+    return render(request, 'profiling/summary.html', {
+        'views': views,
+        'recent': profiles[:50],
+        'history_size': HISTORY_SIZE,
+        'duplicate_threshold': DUPLICATE_THRESHOLD,
+    })
@@ -0,0 +1,37 @@
+"""
+SQLite の性能設定
+
+settings.SQLITE_PERFORMANCE_MODE が有効な場合、接続ごとに以下の PRAGMA を設定する。
+  - journal_mode=WAL: 書き込み中も読み込みをブロックしない
+  - synchronous=NORMAL: WAL と組み合わせてコミットごとの fsync を減らす
+  - busy_timeout: ロック中は即エラーにせず待機する
+  - mmap_size / cache_size: 読み込みをメモリマップ・ページキャッシュで高速化する
+"""
+from django.conf import settings
+
+BUSY_TIMEOUT_MS = 5000
+MMAP_SIZE = 256 * 1024 * 1024
+# 負の値は KiB 単位（64MB）
+CACHE_SIZE = -64 * 1024
+
+PERFORMANCE_PRAGMAS = [
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}',
+    f'PRAGMA mmap_size={MMAP_SIZE}',
+    f'PRAGMA cache_size={CACHE_SIZE}',
+]
+
+
+def apply_pragmas(cursor):
+    """性能設定の PRAGMA を実行する（DB-API のカーソル）"""
+    for statement in PERFORMANCE_PRAGMAS:
+        cursor.execute(statement)
+
+
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """connection_created で呼ばれ、SQLite 接続に性能設定を適用する"""
+    if connection.vendor != 'sqlite' or not getattr(settings, 'SQLITE_PERFORMANCE_MODE', False):
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor)
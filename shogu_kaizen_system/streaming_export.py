@@ -0,0 +1,183 @@
+"""
+CSV・XLSX のストリーミング生成
+
+行のイテラブルを少しずつバイト列に変換するジェネレーターを返す。全行をメモリに載せないため、
+大量の行でもメモリ使用量はほぼ一定になる。XLSX は標準ライブラリの zipfile を seek できない
+書き込み先で使い（データ記述子付きの ZIP になる）、シートはインライン文字列で書き出す。
+"""
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Excel で文字化けしないよう CSV の先頭に付ける BOM
+UTF8_BOM = '\ufeff'
+# 圧縮済みデータがこの大きさを超えたら送出する（バイト）
+FLUSH_SIZE = 64 * 1024
+
+# XML 1.0 で使えない制御文字
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '{overrides}</Types>'
+)
+_SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{index}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{rels}</Relationships>'
+)
+_WORKBOOK_REL = (
+    '<Relationship Id="rId{index}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{index}.xml"/>'
+)
+_SHEET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_FOOTER = '</sheetData></worksheet>'
+
+
+class _Echo:
+    """csv.writer の書き込み先（書かれた文字列をそのまま返す）"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    """行のイテラブルを CSV（UTF-8・BOM 付き）のバイト列として少しずつ返す"""
+    writer = csv.writer(_Echo())
+    yield UTF8_BOM.encode('utf-8')
+    for row in rows:
+        yield writer.writerow(['' if value is None else value for value in row]).encode('utf-8')
+
+
+class _ChunkBuffer:
+    """zipfile の書き込み先。書かれたバイト列を溜め、drain() で取り出す（seek できない）"""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+def _column_letter(index):
+    """0始まりの列番号 → Excel の列名（A, B, ..., AA）"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell_xml(reference, value):
+    if value is None or value == '':
+        return ''
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{reference}"><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS.sub('', str(value)))
+    return f'<c r="{reference}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row_xml(row_number, row):
+    cells = ''.join(
+        _cell_xml(f'{_column_letter(index)}{row_number}', value) for index, value in enumerate(row)
+    )
+    return f'<row r="{row_number}">{cells}</row>'
+
+
+def stream_xlsx(sheets):
+    """
+    sheets（シート名, 行のイテラブル）のリストを XLSX のバイト列として少しずつ返す。
+    シート名は先に書き出すため、リストで渡す（行は遅延評価のままでよい）。
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES.format(overrides=''.join(
+            _SHEET_CONTENT_TYPE.format(index=index) for index in range(1, len(sheets) + 1)
+        )))
+        archive.writestr('_rels/.rels', _ROOT_RELS)
+        archive.writestr('xl/workbook.xml', _WORKBOOK.format(sheets=''.join(
+            f'<sheet name={quoteattr(name[:31])} sheetId="{index}" r:id="rId{index}"/>'
+            for index, (name, _) in enumerate(sheets, start=1)
+        )))
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS.format(rels=''.join(
+            _WORKBOOK_REL.format(index=index) for index in range(1, len(sheets) + 1)
+        )))
+        yield buffer.drain()
+
+        for index, (_, rows) in enumerate(sheets, start=1):
+            with archive.open(f'xl/worksheets/sheet{index}.xml', 'w') as sheet:
+                sheet.write(_SHEET_HEADER.encode('utf-8'))
+                for row_number, row in enumerate(rows, start=1):
+                    sheet.write(_row_xml(row_number, row).encode('utf-8'))
+                    if buffer.size >= FLUSH_SIZE:
+                        yield buffer.drain()
+                sheet.write(_SHEET_FOOTER.encode('utf-8'))
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+async def _aiterate(chunks):
+    """同期ジェネレーターを1チャンクずつスレッドで進める（ASGI で全体を先読みさせないため）"""
+    iterator = iter(chunks)
+    advance = sync_to_async(next)
+    while True:
+        chunk = await advance(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def streaming_response(request, chunks, content_type, filename):
+    """チャンクのジェネレーターをダウンロード用の StreamingHttpResponse にする"""
+    if isinstance(request, ASGIRequest):
+        # ASGI では同期イテレーターが一括で読み込まれるため、非同期イテレーターで渡す
+        chunks = _aiterate(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
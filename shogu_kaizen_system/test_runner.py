@@ -0,0 +1,28 @@
+"""
+テストランナー
+
+settings の CACHES は既定でファイル（開発サーバー・ワーカーと共有）のため、テスト実行中は
+override_settings で実行ごとに空のプロセス内メモリのキャッシュに差し替える。
+"""
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shogu-kaizen-test',
+    }
+}
+
+
+class ProjectTestRunner(DiscoverRunner):
+    """キャッシュをテスト用に差し替えて実行するテストランナー"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_override = override_settings(CACHES=TEST_CACHES)
+        self._cache_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache_override.disable()
+        super().teardown_test_environment(**kwargs)
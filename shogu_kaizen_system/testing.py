@@ -0,0 +1,80 @@
+"""テスト用の共通ヘルパー"""
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+
+# SQLite: インデックスを使わない "SCAN <table>"（3.36 より前は "SCAN TABLE <table>"）
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(.*)')
+
+
+@contextmanager
+def _seqscan_disabled():
+    """PostgreSQL では小さなテーブルでもインデックスが使えるかを見るため seq scan を抑止する"""
+    if connection.vendor != 'postgresql':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('SET enable_seqscan = off')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute('RESET enable_seqscan')
+
+
+def full_scans(queryset, *models):
+    """クエリの実行計画のうち、指定モデルのテーブルを全件走査している行を返す"""
+    tables = {model._meta.db_table for model in models}
+    with _seqscan_disabled():
+        plan = queryset.explain()
+
+    scans = []
+    for line in plan.splitlines():
+        if connection.vendor == 'postgresql':
+            match = re.search(r'Seq Scan on (\w+)', line)
+            if match and match.group(1) in tables:
+                scans.append(line.strip())
+        else:
+            match = SQLITE_SCAN.search(line)
+            if match and match.group(1) in tables and 'USING' not in match.group(2):
+                scans.append(line.strip())
+    return scans
+
+
+def explain_sql(sql):
+    """実行済みの SQL 文（CaptureQueriesContext で取得したもの）の実行計画を返す"""
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    with _seqscan_disabled(), connection.cursor() as cursor:
+        cursor.execute(prefix + sql)
+        return '\n'.join(' '.join(str(value) for value in row) for row in cursor.fetchall())
+
+
+def searches_index(plan, table, index_name):
+    """
+    実行計画でテーブルを1つのインデックスの範囲検索で引き、並び順もそのインデックスから得ているか。
+    SQLite は小さなテーブルでは OR の条件ごとに検索して後から並べ替える（MULTI-INDEX OR と
+    TEMP B-TREE）ことがあり、その場合はページが進むほど読む行が増えるため不合格とする。
+    """
+    if connection.vendor == 'postgresql':
+        pattern = rf'Index (?:Only )?Scan(?: Backward)? using {index_name} on {table}.*\n\s*Index Cond'
+        return re.search(pattern, plan) is not None and 'Sort' not in plan
+    if 'MULTI-INDEX OR' in plan or re.search(r'TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY', plan):
+        return False
+    return re.search(rf'\bSEARCH {table} USING (?:COVERING )?INDEX {index_name} \(', plan) is not None
+
+
+class QueryPlanAssertionsMixin:
+    """EXPLAIN の結果で、よく使う絞り込みがインデックスを使うことを確認する"""
+
+    def assertSearchesIndex(self, sql, model, index_name):
+        """SQL 文の実行計画で、指定インデックスを範囲検索（SEARCH）に使っていることを確認する"""
+        plan = explain_sql(sql)
+        self.assertTrue(
+            searches_index(plan, model._meta.db_table, index_name),
+            f'{index_name} による範囲検索になっていません:\n{plan}',
+        )
+
+    def assertNoFullScan(self, queryset, *models):
+        scans = full_scans(queryset, *(models or [queryset.model]))
+        self.assertEqual(scans, [], f'全件走査になっています:\n{queryset.explain()}')
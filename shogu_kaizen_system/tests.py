@@ -0,0 +1,197 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.http import HttpResponse
+from django.template.base import Template
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils.module_loading import import_string
+
+from career_management.models import StaffMember
+from facility_management.models import Provider
+from plans.models import ImprovementPlan, PlanWizardDraft
+from .db_routers import PIN_COOKIE, REPLICA_ALIAS, PrimaryPinningMiddleware, PrimaryReplicaRouter
+from .profiling import RequestProfilingMiddleware, profiling_summary, recent_profiles
+from .sqlite_tuning import BUSY_TIMEOUT_MS
+
+
+@override_settings(MIDDLEWARE=['shogu_kaizen_system.profiling.RequestProfilingMiddleware', *settings.MIDDLEWARE])
+class RequestProfilingTests(TestCase):
+    """リクエスト計測ミドルウェアの記録内容を確認する"""
+
+    def test_records_sql_template_time_and_duplicates(self):
+        provider = Provider.objects.create(name='テスト法人', address='東京都千代田区1-1')
+        plan = ImprovementPlan.objects.create(provider=provider, target_addition_tier='I')
+
+        response = self.client.get(f'/plans/{plan.id}/')
+        self.assertIn('sql;dur=', response['Server-Timing'])
+        profile = recent_profiles()[0]
+        self.assertEqual((profile.view_name, profile.status_code), ('plan_detail', 200))
+        self.assertGreater(profile.sql_count, 0)
+        self.assertGreater(profile.template_ms, 0)
+
+        # 同じ形のクエリの繰り返しは N+1 の疑いとして記録される
+        def n_plus_one(request):
+            for _ in range(3):
+                list(ImprovementPlan.objects.filter(pk=plan.pk))
+            return HttpResponse()
+        RequestProfilingMiddleware(n_plus_one)(RequestFactory().get('/n-plus-one/'))
+        self.assertEqual([count for _, count in recent_profiles()[0].duplicates], [3])
+
+        request = RequestFactory().get('/__profiling__/')
+        request.user = User.objects.create(username='staff', is_staff=True)
+        self.assertContains(profiling_summary(request), 'plan_detail')
+
+    async def test_async_view_is_profiled_without_thread_adaptation(self):
+        provider = await Provider.objects.acreate(name='テスト法人', address='東京都千代田区1-1')
+
+        async def view(request):
+            await ImprovementPlan.objects.filter(provider=provider).acount()
+            return HttpResponse()
+        middleware = RequestProfilingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get('/async/'))
+        self.assertIn('1 queries', response['Server-Timing'])
+
+    def test_template_render_is_patched_only_during_profiled_request(self):
+        original = Template._render
+        patched = []
+
+        def view(request):
+            patched.append(Template._render is not original)
+            return HttpResponse()
+        middleware = RequestProfilingMiddleware(view)
+        # ミドルウェアを組み込んだだけでは差し替えない
+        self.assertIs(Template._render, original)
+        middleware(RequestFactory().get('/'))
+        self.assertEqual(patched, [True])
+        self.assertIs(Template._render, original)
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    """読み込み・書き込み・マイグレーションの振り分けを確認する"""
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        # テスト環境にはレプリカがないため、設定済みとして扱う
+        patcher = mock.patch.dict(connections.settings, {REPLICA_ALIAS: connections.settings['default']})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_go_to_replica_and_writes_to_default(self):
+        self.assertEqual(self.router.db_for_read(StaffMember), REPLICA_ALIAS)
+        self.assertEqual(self.router.db_for_read(PlanWizardDraft), 'default')
+        self.assertEqual(self.router.db_for_write(StaffMember), 'default')
+        with mock.patch.object(connections['default'], 'in_atomic_block', True):
+            self.assertEqual(self.router.db_for_read(StaffMember), 'default')
+
+    def test_migrations_run_only_on_default(self):
+        self.assertTrue(self.router.allow_migrate('default', 'career_management'))
+        self.assertFalse(self.router.allow_migrate(REPLICA_ALIAS, 'career_management'))
+
+    def test_single_database_falls_back_to_default(self):
+        del connections.settings[REPLICA_ALIAS]
+        self.assertEqual(self.router.db_for_read(StaffMember), 'default')
+
+    @override_settings(DATABASE_REPLICA_PIN_SECONDS=10)
+    def test_reads_are_pinned_to_primary_after_write(self):
+        reads = []
+
+        def view(request):
+            reads.append(self.router.db_for_read(StaffMember))
+            if request.method == 'POST':
+                self.router.db_for_write(StaffMember)
+                reads.append(self.router.db_for_read(StaffMember))
+            return HttpResponse()
+        middleware = PrimaryPinningMiddleware(view)
+        factory = RequestFactory()
+
+        response = middleware(factory.get('/'))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        response = middleware(factory.post('/'))
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 10)
+        self.assertEqual(reads, [REPLICA_ALIAS, REPLICA_ALIAS, 'default'])
+
+        # クッキーが残っている間はプライマリから読む
+        request = factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        middleware(request)
+        self.assertEqual(reads[-1], 'default')
+        # リクエストの外では固定しない
+        self.assertEqual(self.router.db_for_read(StaffMember), REPLICA_ALIAS)
+
+
+class AsyncMiddlewareTests(SimpleTestCase):
+    """ASGI で非同期ビューがスレッドに移されないよう、ミドルウェアが非同期に対応していることを確認する"""
+
+    def test_project_middlewares_support_async(self):
+        for middleware in [RequestProfilingMiddleware, PrimaryPinningMiddleware]:
+            self.assertTrue(middleware.sync_capable and middleware.async_capable)
+
+    def test_asgi_middleware_has_no_sync_only_entries(self):
+        # WhiteNoise（同期専用）は asgi.py で起動した場合に外され、静的ファイルは asgi.py が配信する
+        sync_only = [
+            path for path in settings.MIDDLEWARE
+            if not getattr(import_string(path), 'async_capable', False)
+        ]
+        self.assertEqual(sync_only, ['whitenoise.middleware.WhiteNoiseMiddleware'])
+
+    async def test_pinning_works_with_async_views(self):
+        router = PrimaryReplicaRouter()
+
+        async def view(request):
+            await sync_to_async(router.db_for_write)(StaffMember)
+            return HttpResponse()
+        middleware = PrimaryPinningMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        with self.settings(DATABASE_REPLICA_PIN_SECONDS=10):
+            response = await middleware(RequestFactory().post('/'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+
+class SqliteTuningTests(SimpleTestCase):
+    """SQLITE_PERFORMANCE_MODE で新しい接続に PRAGMA が設定されることを確認する"""
+
+    def _pragmas(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_dict = {**connections['default'].settings_dict, 'NAME': str(Path(directory.name) / 'tuning.sqlite3')}
+        wrapper = DatabaseWrapper(settings_dict, alias='sqlite_tuning_test')
+        self.addCleanup(wrapper.close)
+        with wrapper.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+            cursor.execute('PRAGMA busy_timeout')
+            busy_timeout = cursor.fetchone()[0]
+        return journal_mode, busy_timeout
+
+    @override_settings(SQLITE_PERFORMANCE_MODE=True)
+    def test_pragmas_are_applied_to_new_connections(self):
+        self.assertEqual(self._pragmas(), ('wal', BUSY_TIMEOUT_MS))
+
+    @override_settings(SQLITE_PERFORMANCE_MODE=False)
+    def test_pragmas_are_not_applied_when_disabled(self):
+        self.assertEqual(self._pragmas()[0], 'delete')
+
+
+class TestCacheSettingsTests(SimpleTestCase):
+    """テスト実行時のキャッシュ設定"""
+
+    def test_tests_use_process_local_cache(self):
+        from django.core.cache import caches
+        from django.core.cache.backends.locmem import LocMemCache
+
+        self.assertIsInstance(caches['default'], LocMemCache)
+
+    def test_shared_caches_are_sized_for_all_facilities(self):
+        from . import settings as project_settings
+
+        for alias in project_settings.CACHES.values():
+            if alias['BACKEND'].endswith('RedisCache'):
+                continue
+            self.assertGreaterEqual(alias['OPTIONS']['MAX_ENTRIES'], 10000)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
@@ -5,4 +6,10 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('plans.urls')),
     path('career/', include('career_management.urls')),
+    path('jobs/', include('jobs.urls')),
 ]
+
+if settings.REQUEST_PROFILING:
+    from .profiling import profiling_summary
+
+    urlpatterns.insert(0, path('__profiling__/', profiling_summary, name='profiling_summary'))
@@ -0,0 +1,33 @@
+#!/usr/bin/env bash
+# Web とバックグラウンド処理のワーカーを起動する（Render の Start Command: ./start.sh）
+# SQLite の場合はワーカーも同じディスクのデータベースを使うため、Web と同じサービスで起動する
+set -o errexit
+
+export JOBS_WORKER_ENABLED=1
+
+# ワーカーが異常終了した場合は起動し直す
+(
+    while true; do
+        python manage.py run_jobs --processes "${JOBS_WORKER_PROCESSES:-1}" || true
+        sleep 5
+    done
+) &
+worker=$!
+
+gunicorn shogu_kaizen_system.asgi:application -c gunicorn_asgi.conf.py &
+web=$!
+
+# 停止の合図は Web とワーカーの両方に伝え、ワーカーは実行中の処理の終了を待って停止する
+stop() {
+    children=$(pgrep -P "$worker" || true)
+    kill -TERM "$worker" "$web" 2>/dev/null || true
+    [ -n "$children" ] && kill -TERM $children 2>/dev/null || true
+    wait
+}
+trap 'stop; exit 143' TERM INT
+
+# Web が終了した場合はワーカーも停止する
+status=0
+wait "$web" || status=$?
+stop
+exit "$status"